@@ -1,10 +1,26 @@
 import asyncio
 import os
+from pathlib import Path
+from typing import Any, List, Optional, get_args
 import pydantic
 import typer
 import uvicorn
 from ._private.pydantic import Config as _PydanticConfig
-from .commands import random_populate, runserver
+from .commands import (
+    benchmark,
+    explain,
+    export_catalog,
+    import_catalog,
+    loadtest,
+    migrate,
+    random_populate,
+    rebuild_stats,
+    runserver,
+)
+from .commands.benchmark import DEFAULT_REPEAT, DEFAULT_SCAN_REPEAT, DEFAULT_SIZES
+from .commands.loadtest import DEFAULT_MIX
+from .commands.catalog import DEFAULT_CHUNK_SIZE, CatalogFormat, CatalogTable
+from .commands.random_populate import DEFAULT_BATCH_SIZE
 
 __all__: list[str] = []
 
@@ -25,9 +41,41 @@ class StandardsCLI(pydantic.BaseModel):
         db_url: str = typer.Option(
             os.getenv("DB_URL", ""), help="URL to access database"
         ),
+        cache_size: int = typer.Option(
+            0, "--cache-size", help="Number of cached lookups (0 to disable)"
+        ),
+        cache_ttl: float = typer.Option(
+            60, "--cache-ttl", help="Number of seconds a lookup stays cached"
+        ),
+        single_flight: bool = typer.Option(
+            False, "--single-flight", help="Share identical concurrent queries"
+        ),
+        debug_queries: bool = typer.Option(
+            False, "--debug-queries", help="Account for the queries of every request"
+        ),
+        query_budget: Optional[int] = typer.Option(
+            50, "--query-budget", help="Number of queries before flagging a request"
+        ),
+        max_repeats: Optional[int] = typer.Option(
+            10, "--max-repeats", help="Number of identical queries before flagging"
+        ),
+        replica_url: Optional[List[str]] = typer.Option(
+            None, "--replica-url", help="URL of a read replica (repeatable)"
+        ),
     ) -> None:
         uvicorn.run(
-            asyncio.run(runserver(db_url=db_url)),
+            asyncio.run(
+                runserver(
+                    db_url=db_url,
+                    cache_size=cache_size,
+                    cache_ttl=cache_ttl,
+                    single_flight=single_flight,
+                    debug_queries=debug_queries,
+                    query_budget=query_budget,
+                    max_repeats=max_repeats,
+                    replica_urls=replica_url,
+                )
+            ),
             host=host,
             port=port,
         )
@@ -40,8 +88,208 @@ class StandardsCLI(pydantic.BaseModel):
         amount: int = typer.Option(
             10, "--amount", help="Number of records to populate"
         ),
+        batch_size: int = typer.Option(
+            DEFAULT_BATCH_SIZE,
+            "--batch-size",
+            min=1,
+            help="Number of records per batch",
+        ),
+        seed: Optional[int] = typer.Option(
+            None, "--seed", help="Seed of the random generators"
+        ),
+        workers: int = typer.Option(
+            1, "--workers", min=1, help="Number of processes generating the records"
+        ),
+    ) -> None:
+        asyncio.run(
+            random_populate(
+                db_url=db_url,
+                amount=amount,
+                batch_size=batch_size,
+                seed=seed,
+                workers=workers,
+            )
+        )
+
+    def export(
+        self,
+        table: str = typer.Argument(..., help="Table to export: standards or files"),
+        path: Path = typer.Argument(..., help="File to write (.csv or .ndjson)"),
+        db_url: str = typer.Option(
+            os.getenv("DB_URL", ""), "--db-url", help="Database URL"
+        ),
+        file_format: Optional[str] = typer.Option(
+            None, "--format", help="csv or ndjson (default: guessed from the path)"
+        ),
+        chunk_size: int = typer.Option(
+            DEFAULT_CHUNK_SIZE, "--chunk-size", help="Number of rows fetched at once"
+        ),
+    ) -> None:
+        asyncio.run(
+            export_catalog(
+                db_url=db_url,
+                table=_choice(table, CatalogTable),
+                path=path,
+                file_format=_choice(file_format, CatalogFormat),
+                chunk_size=chunk_size,
+            )
+        )
+
+    def import_(
+        self,
+        table: str = typer.Argument(..., help="Table to import: standards or files"),
+        path: Path = typer.Argument(
+            ..., exists=True, dir_okay=False, help="File to read (.csv or .ndjson)"
+        ),
+        db_url: str = typer.Option(
+            os.getenv("DB_URL", ""), "--db-url", help="Database URL"
+        ),
+        file_format: Optional[str] = typer.Option(
+            None, "--format", help="csv or ndjson (default: guessed from the path)"
+        ),
+        chunk_size: int = typer.Option(
+            DEFAULT_CHUNK_SIZE, "--chunk-size", help="Number of rows per transaction"
+        ),
+    ) -> None:
+        try:
+            asyncio.run(
+                import_catalog(
+                    db_url=db_url,
+                    table=_choice(table, CatalogTable),
+                    path=path,
+                    file_format=_choice(file_format, CatalogFormat),
+                    chunk_size=chunk_size,
+                )
+            )
+        except ValueError as error:
+            typer.echo(str(error), err=True)
+            raise typer.Exit(1)
+
+    def benchmark(
+        self,
+        sizes: List[int] = typer.Option(
+            list(DEFAULT_SIZES), "--size", help="Number of standards (repeatable)"
+        ),
+        repeat: int = typer.Option(
+            DEFAULT_REPEAT, "--repeat", help="Number of timed runs per case"
+        ),
+        scan_repeat: int = typer.Option(
+            DEFAULT_SCAN_REPEAT,
+            "--scan-repeat",
+            help="Number of timed runs of the full table reads (0 to skip them)",
+        ),
+        data_dir: Path = typer.Option(
+            Path(".benchmarks"), "--data-dir", help="Directory of the seeded databases"
+        ),
+        output: Optional[Path] = typer.Option(
+            None, "--output", "-o", help="JSON file to save the results to"
+        ),
+        seed: int = typer.Option(0, "--seed", help="Seed of the datasets"),
+        only: str = typer.Option(
+            "", "--only", help="Only run the cases whose name contains this"
+        ),
     ) -> None:
-        asyncio.run(random_populate(db_url=db_url, amount=amount))
+        asyncio.run(
+            benchmark(
+                sizes=tuple(sizes),
+                repeat=repeat,
+                scan_repeat=scan_repeat,
+                data_dir=data_dir,
+                output=output,
+                seed=seed,
+                only=only,
+            )
+        )
+
+    def loadtest(
+        self,
+        url: Optional[str] = typer.Option(
+            None, "--url", help="URL of the API (default: the app in-process)"
+        ),
+        db_url: str = typer.Option(
+            os.getenv("DB_URL", ""), "--db-url", help="Database URL of the app"
+        ),
+        duration: float = typer.Option(
+            10, "--duration", help="Number of seconds requests are sent for"
+        ),
+        concurrency: int = typer.Option(
+            10, "--concurrency", "-c", help="Number of clients / requests in flight"
+        ),
+        rate: Optional[float] = typer.Option(
+            None, "--rate", help="Mean number of requests per second"
+        ),
+        mix: str = typer.Option(
+            DEFAULT_MIX, "--mix", help="Weights of the scenarios (name=weight,...)"
+        ),
+        seed: Optional[int] = typer.Option(
+            None, "--seed", help="Seed of the choices of scenarios and keys"
+        ),
+        output: Optional[Path] = typer.Option(
+            None, "--output", "-o", help="JSON file to save the report to"
+        ),
+    ) -> None:
+        try:
+            asyncio.run(
+                loadtest(
+                    url=url,
+                    db_url=db_url,
+                    duration=duration,
+                    concurrency=concurrency,
+                    rate=rate,
+                    mix=mix,
+                    seed=seed,
+                    output=output,
+                )
+            )
+        except ValueError as error:
+            typer.echo(str(error), err=True)
+            raise typer.Exit(1)
+
+    def explain(
+        self,
+        db_url: str = typer.Option(
+            os.getenv("DB_URL", ""), "--db-url", help="Database URL"
+        ),
+        only: str = typer.Option(
+            "", "--only", help="Only explain the access paths whose name contains this"
+        ),
+        output: Optional[Path] = typer.Option(
+            None, "--output", "-o", help="JSON file to save the plans to"
+        ),
+    ) -> None:
+        try:
+            plans = asyncio.run(explain(db_url=db_url, only=only, output=output))
+        except ValueError as error:
+            typer.echo(str(error), err=True)
+            raise typer.Exit(1)
+        if any(f.is_regression for plan in plans for f in plan.findings):
+            raise typer.Exit(1)
+
+    def migrate(
+        self,
+        db_url: str = typer.Option(
+            os.getenv("DB_URL", ""), "--db-url", help="Database URL"
+        ),
+        target: Optional[int] = typer.Option(
+            None, "--to", help="Schema version to migrate to (default: the latest)"
+        ),
+        dry_run: bool = typer.Option(
+            False, "--dry-run", help="Only list the pending migrations"
+        ),
+    ) -> None:
+        try:
+            asyncio.run(migrate(db_url=db_url, target=target, dry_run=dry_run))
+        except ValueError as error:
+            typer.echo(str(error), err=True)
+            raise typer.Exit(1)
+
+    def rebuild_stats(
+        self,
+        db_url: str = typer.Option(
+            os.getenv("DB_URL", ""), "--db-url", help="Database URL"
+        ),
+    ) -> None:
+        asyncio.run(rebuild_stats(db_url=db_url))
 
     def callback(self) -> None:
         pass
@@ -49,10 +297,25 @@ class StandardsCLI(pydantic.BaseModel):
     def run(self):
         self.app.command()(self.runserver)
         self.app.command()(self.random_populate)
+        self.app.command()(self.export)
+        self.app.command(name="import")(self.import_)
+        self.app.command()(self.benchmark)
+        self.app.command()(self.loadtest)
+        self.app.command()(self.explain)
+        self.app.command()(self.migrate)
+        self.app.command()(self.rebuild_stats)
         self.app.callback()(self.callback)
         self.app()
 
 
+def _choice(value: str | None, choices: Any) -> Any:
+    if value is not None and value not in get_args(choices):
+        raise typer.BadParameter(
+            f"{value} is not one of {', '.join(get_args(choices))}"
+        )
+    return value
+
+
 if __name__ == "__main__":
     cli = StandardsCLI()
     cli.run()
@@ -0,0 +1,11 @@
+__all__: list[str] = ["percentile"]
+
+
+def percentile(ordered: list[float], rank: float) -> float:
+    """
+    The percentile of sorted values, interpolated between the closest ranks.
+    """
+    position: float = (len(ordered) - 1) * rank / 100
+    lower: int = int(position)
+    upper: int = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
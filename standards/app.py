@@ -1,12 +1,29 @@
 from __future__ import annotations
-from typing import Any
+import hashlib
+import json
+from functools import partial
+from operator import attrgetter
+from typing import Any, AsyncIterator, Awaitable, Callable
 import pydantic
-from fastapi import FastAPI
+from fastapi import Body, Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import strawberry
-from strawberry.fastapi import GraphQLRouter
+from ._private.enum import FileFormat, FileLanguage
 from ._private.pydantic import Config as _PydanticConfig
-from .db import MyDb
+from .db import DEFAULT_YIELD_PER, FileStats, MyDb, Page, QueryAccounting
 from .db.models import File, Standard
+from .db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .graphql.loaders import Loaders
+from .graphql.persisted import PersistedQueries, PersistedQueryRouter
+from .metrics import CONTENT_TYPE, Metrics, MetricsMiddleware
+from .schemas import (
+    FileKeys,
+    FileWithStandardOut,
+    NumdosList,
+    StandardOut,
+)
 
 
 __all__: list[str] = ["MyApp"]
@@ -20,11 +37,17 @@ class MyApp(pydantic.BaseModel):
         api: The FastAPI instance.
         db: The MyDb instance for database operations.
         graphql_schema: The Strawberry GraphQL schema.
+        metrics: The latency metrics of the requests, resolvers and queries.
+        persisted_queries: The GraphQL queries registered by the clients.
     """
 
     api: FastAPI
     db: MyDb
     graphql_schema: strawberry.Schema
+    metrics: Metrics = pydantic.Field(default_factory=Metrics)
+    persisted_queries: PersistedQueries = pydantic.Field(
+        default_factory=PersistedQueries
+    )
 
     Config = _PydanticConfig
 
@@ -61,6 +84,9 @@ class MyApp(pydantic.BaseModel):
         Setup the application by adding event handlers, routes, and GraphQL endpoint.
         """
         await self._setup_handlers()
+        await self._setup_metrics()
+        await self._setup_accounting()
+        await self._setup_dependencies()
         await self._setup_routes()
         await self._setup_graphql()
 
@@ -70,6 +96,60 @@ class MyApp(pydantic.BaseModel):
         """
         self.api.add_event_handler("startup", self._startup)
         self.api.add_event_handler("shutdown", self._shutdown)
+        self.api.add_exception_handler(_NotModified, _not_modified)
+
+    async def _setup_metrics(self) -> None:
+        """
+        Setup the metrics: time every HTTP request and SQL statement.
+        """
+        self.api.add_middleware(MetricsMiddleware, metrics=self.metrics)
+        for engine in self.db.engines:
+            self.metrics.instrument_engine(engine)
+
+    async def _setup_accounting(self) -> None:
+        """
+        Setup the accounting of the SQL statements of every request, if the
+        database has one: their number and duration are sent in the X-DB-Queries
+        and X-DB-Time (milliseconds) headers, and the requests going over the
+        budget are flagged in the X-DB-Warnings header and logged.
+        """
+        if self.db.accounting is not None:
+            self.api.add_middleware(
+                _AccountingMiddleware, accounting=self.db.accounting
+            )
+
+    async def _setup_dependencies(self) -> None:
+        """
+        Setup dependencies shared by every route, including the GraphQL endpoint.
+        Each request gets its own database session, released once it is over.
+        """
+        self.api.router.dependencies.append(Depends(self.db.request_session))
+
+    def _conditional(self, *tables: str) -> Callable[..., Awaitable[None]]:
+        """
+        Build a dependency handling conditional GET requests on the given tables.
+
+        The strong ETag of the response is derived from the URL and the versions
+        of the tables, so that If-None-Match requests are answered with 304 Not
+        Modified without querying nor serialising anything.
+
+        Args:
+            tables: The names of the tables the response is built from.
+
+        Returns:
+            The dependency.
+        """
+
+        async def conditional(request: Request, response: Response) -> None:
+            versions: tuple[int, ...] | None = await self.db.get_table_versions(tables)
+            if versions is None:
+                return
+            etag: str = _etag(request.url.path, request.url.query, versions)
+            if _if_none_match(request, etag):
+                raise _NotModified(etag)
+            response.headers["ETag"] = etag
+
+        return conditional
 
     async def _setup_routes(self) -> None:
         """
@@ -91,8 +171,12 @@ class MyApp(pydantic.BaseModel):
             """
             return f"Hello {name.title()}!"
 
-        @self.api.get(r"/standard/{numdos}")
-        async def get_standard(numdos: str) -> dict[str, Any]:
+        @self.api.get(
+            r"/standard/{numdos}",
+            dependencies=[Depends(self._conditional("standards", "files"))],
+            response_model=StandardOut,
+        )
+        async def get_standard(numdos: str, response: Response) -> Response:
             """
             Endpoint: /standard/{numdos}
 
@@ -100,29 +184,92 @@ class MyApp(pydantic.BaseModel):
 
             Args:
                 numdos: The numdos parameter in the path.
+                response: The response, holding the headers to send.
 
             Returns:
-                A dictionary containing the attributes of the standard, or an
-                empty dictionary if not found.
+                The JSON response containing the attributes of the standard, or
+                an empty object if not found.
             """
             standard: Standard | None = await self.db.get_standard(numdos)
-            return {**standard} if standard else {}
-
-        @self.api.get(r"/standards")
-        async def get_standards() -> list[dict[str, Any]]:
+            return _json_response(
+                _standard_as_json(standard) if standard else {}, response
+            )
+
+        @self.api.get(
+            r"/standards",
+            dependencies=[Depends(self._conditional("standards", "files"))],
+            response_model=list[StandardOut],
+        )
+        async def get_standards(
+            response: Response,
+            numdos_prefix: str | None = None,
+            limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+            cursor: str | None = None,
+        ) -> Response:
             """
             Endpoint: /standards
 
-            Retrieve all standards.
+            Retrieve all standards, or a page of them ordered by numdos if limit
+            or cursor is given.
+
+            Args:
+                response: The response, whose X-Next-Cursor header is set to the
+                    cursor of the next page (if any).
+                numdos_prefix: The prefix the numdos of the standards must start
+                    with.
+                limit: The maximum number of standards to retrieve.
+                cursor: The X-Next-Cursor header of the previous page.
 
             Returns:
-                A list of dictionaries containing the attributes of the standards.
+                The JSON response containing the list of the attributes of the
+                standards.
             """
-            standards: list[Standard] = await self.db.get_standards()
-            return [{**standard} for standard in standards]
+            standards: list[Standard]
+            if limit is None and cursor is None:
+                standards = await self.db.get_standards(numdos_prefix=numdos_prefix)
+            else:
+                page: Page[Standard] = await _get_page(
+                    partial(self.db.get_standards_page, numdos_prefix=numdos_prefix),
+                    response,
+                    limit,
+                    cursor,
+                )
+                standards = page.items
+            return _json_response(list(map(_standard_as_json, standards)), response)
+
+        @self.api.post(r"/standards/batch", response_model=list[StandardOut | None])
+        async def get_standards_batch(
+            response: Response,
+            numdos: NumdosList = Body(...),
+        ) -> Response:
+            """
+            Endpoint: /standards/batch
+
+            Retrieve many standards by their numdos values at once.
+
+            Args:
+                response: The response, holding the headers to send.
+                numdos: The list of numdos in the request body.
 
-        @self.api.get(r"/file")
-        async def get_file(numdos: str, numdosvl: str) -> dict[str, Any]:
+            Returns:
+                The JSON response containing a list with, in the same order as
+                numdos, the attributes of the standards, or None for the ones not
+                found.
+            """
+            standards: list[Standard | None] = await self.db.get_standards_by_numdos(
+                numdos
+            )
+            return _json_response(
+                [_standard_as_json(std) if std else None for std in standards],
+                response,
+            )
+
+        @self.api.get(
+            r"/file",
+            dependencies=[Depends(self._conditional("standards", "files"))],
+            response_model=FileWithStandardOut,
+        )
+        async def get_file(numdos: str, numdosvl: str, response: Response) -> Response:
             """
             Endpoint: /file
 
@@ -131,41 +278,277 @@ class MyApp(pydantic.BaseModel):
             Args:
                 numdos: The numdos parameter in the query.
                 numdosvl: The numdosvl parameter in the query.
+                response: The response, holding the headers to send.
 
             Returns:
-                A dictionary containing the attributes of the file, or an empty dictionary if not found.
+                The JSON response containing the attributes of the file, or an
+                empty object if not found.
             """
             file: File | None = await self.db.get_file(numdos, numdosvl)
-            return {**file} if file else {}
+            return _json_response(_file_as_json(file) if file else {}, response)
 
-        @self.api.get(r"/files")
-        async def get_files() -> list[dict[str, Any]]:
+        @self.api.get(
+            r"/files",
+            dependencies=[Depends(self._conditional("standards", "files"))],
+            response_model=list[FileWithStandardOut],
+        )
+        async def get_files(
+            response: Response,
+            formats: list[FileFormat] | None = Query(None, alias="format"),
+            languages: list[FileLanguage] | None = Query(None, alias="language"),
+            numdos_prefix: str | None = None,
+            limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+            cursor: str | None = None,
+        ) -> Response:
             """
             Endpoint: /files
 
-            Retrieve all files.
+            Retrieve all files, or a page of them ordered by id if limit or
+            cursor is given, filtered by the database.
+
+            Args:
+                response: The response, whose X-Next-Cursor header is set to the
+                    cursor of the next page (if any).
+                formats: The formats the files must have one of (repeatable).
+                languages: The languages the files must have one of (repeatable).
+                numdos_prefix: The prefix the numdos of the files must start
+                    with.
+                limit: The maximum number of files to retrieve.
+                cursor: The X-Next-Cursor header of the previous page.
 
             Returns:
-                A list of dictionaries containing the attributes of the files.
+                The JSON response containing the list of the attributes of the
+                files.
+            """
+            filters: dict[str, Any] = {
+                "formats": formats,
+                "languages": languages,
+                "numdos_prefix": numdos_prefix,
+            }
+            files: list[File]
+            if limit is None and cursor is None:
+                files = await self.db.get_files(**filters)
+            else:
+                page: Page[File] = await _get_page(
+                    partial(self.db.get_files_page, **filters), response, limit, cursor
+                )
+                files = page.items
+            return _json_response(list(map(_file_as_json, files)), response)
+
+        @self.api.post(r"/files/batch", response_model=list[FileWithStandardOut | None])
+        async def get_files_batch(
+            response: Response,
+            keys: FileKeys = Body(...),
+        ) -> Response:
             """
-            files: list[File] = await self.db.get_files()
-            return [{**file} for file in files]
+            Endpoint: /files/batch
+
+            Retrieve many files by their numdos and numdosvl values at once.
+
+            Args:
+                response: The response, holding the headers to send.
+                keys: The list of numdos and numdosvl in the request body.
+
+            Returns:
+                The JSON response containing a list with, in the same order as
+                keys, the attributes of the files, or None for the ones not found.
+            """
+            files: list[File | None] = await self.db.get_files_by_keys(
+                [(key.numdos, key.numdosvl) for key in keys]
+            )
+            return _json_response(
+                [_file_as_json(file) if file else None for file in files], response
+            )
+
+        @self.api.get(
+            r"/search",
+            dependencies=[Depends(self._conditional("standards", "files"))],
+            response_model=list[FileWithStandardOut],
+        )
+        async def search(
+            response: Response,
+            q: str = Query(..., min_length=1),
+            formats: list[FileFormat] | None = Query(None, alias="format"),
+            languages: list[FileLanguage] | None = Query(None, alias="language"),
+            limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+            cursor: str | None = None,
+        ) -> Response:
+            """
+            Endpoint: /search
+
+            Search the files by the words of their name and of their numdos and
+            numdosvl, the best matches first.
+
+            Args:
+                response: The response, whose X-Next-Cursor header is set to the
+                    cursor of the next page (if any).
+                q: The search query, whose terms must all match (whole words, or
+                    prefixes for the terms ending with *, e.g. NF12*).
+                formats: The formats the files must have one of (repeatable).
+                languages: The languages the files must have one of (repeatable).
+                limit: The maximum number of files to retrieve.
+                cursor: The X-Next-Cursor header of the previous page.
+
+            Returns:
+                The JSON response containing the list of the attributes of the
+                files found.
+            """
+            search: Callable[..., Awaitable[Page[File]]] = partial(
+                self.db.search, q, formats=formats, languages=languages
+            )
+            try:
+                page: Page[File] = await _get_page(search, response, limit, cursor)
+            except NotImplementedError as e:
+                raise HTTPException(status_code=501, detail=str(e)) from e
+            return _json_response(list(map(_file_as_json, page.items)), response)
+
+        @self.api.get(
+            r"/stats",
+            dependencies=[Depends(self._conditional("files"))],
+            response_model=FileStats,
+        )
+        async def get_stats(response: Response) -> Response:
+            """
+            Endpoint: /stats
+
+            Retrieve the numbers of files by format, language and prefix of the
+            numdos of their standard, maintained along with the files.
+
+            Args:
+                response: The response, holding the headers to send.
+
+            Returns:
+                The JSON response containing the total number of files and their
+                numbers by format, language and prefix.
+            """
+            stats: FileStats = await self.db.get_stats()
+            return _json_response(stats.dict(), response)
+
+        @self.api.get(r"/standards.ndjson")
+        async def stream_standards(
+            batch_size: int = Query(DEFAULT_YIELD_PER, ge=1),
+        ) -> StreamingResponse:
+            """
+            Endpoint: /standards.ndjson
+
+            Stream all standards as newline-delimited JSON, without loading
+            them all in memory.
+
+            Args:
+                batch_size: The number of standards fetched at once.
+
+            Returns:
+                A streaming response with one JSON document per standard.
+            """
+            return StreamingResponse(
+                _to_ndjson(
+                    self.db.stream_standards(yield_per=batch_size), _standard_as_json
+                ),
+                media_type="application/x-ndjson",
+            )
+
+        @self.api.get(r"/files.ndjson")
+        async def stream_files(
+            batch_size: int = Query(DEFAULT_YIELD_PER, ge=1),
+        ) -> StreamingResponse:
+            """
+            Endpoint: /files.ndjson
+
+            Stream all files as newline-delimited JSON, without loading them all
+            in memory.
+
+            Args:
+                batch_size: The number of files fetched at once.
+
+            Returns:
+                A streaming response with one JSON document per file.
+            """
+            return StreamingResponse(
+                _to_ndjson(self.db.stream_files(yield_per=batch_size), _file_as_json),
+                media_type="application/x-ndjson",
+            )
+
+        @self.api.get(r"/pool")
+        async def get_pool() -> dict[str, int]:
+            """
+            Endpoint: /pool
+
+            Retrieve the statistics of the database connection pool.
+
+            Returns:
+                A dictionary containing the pool size, the checked in and checked
+                out connections and the current overflow.
+            """
+            return self.db.pool_stats()
+
+        @self.api.get(r"/cache")
+        async def get_cache() -> dict[str, int]:
+            """
+            Endpoint: /cache
+
+            Retrieve the statistics of the lookup cache.
+
+            Returns:
+                A dictionary containing the size of the cache and its hit, miss,
+                eviction, expiration and invalidation counters, or an empty
+                dictionary if there is no cache.
+            """
+            return self.db.cache.stats() if self.db.cache is not None else {}
+
+        @self.api.get(r"/metrics")
+        async def get_metrics() -> Response:
+            """
+            Endpoint: /metrics
+
+            Retrieve the metrics of the application in the Prometheus text format:
+            the latency histograms of the HTTP requests (by route), of the GraphQL
+            Query fields and of the SQL statements, the number of requests in
+            flight and the connection pool gauges.
+
+            Returns:
+                The text exposition of the metrics.
+            """
+            gauges: dict[str, float] = {
+                f"db_pool_{name}": value for name, value in self.db.pool_stats().items()
+            }
+            return Response(self.metrics.render(gauges), media_type=CONTENT_TYPE)
 
     async def _setup_graphql(self):
         """
-        Setup the GraphQL endpoint using Strawberry and FastAPI.
+        Setup the GraphQL endpoint using Strawberry and FastAPI, supporting the
+        automatic persisted queries.
         """
         self.api.include_router(
-            GraphQLRouter(self.graphql_schema, context_getter=lambda: {"db": self.db}),
+            PersistedQueryRouter(
+                self.graphql_schema,
+                context_getter=self._graphql_context,
+                persisted_queries=self.persisted_queries,
+            ),
             prefix=r"/graphql",
         )
 
+    async def _graphql_context(self) -> dict[str, Any]:
+        """
+        Build the context of a GraphQL request, with its own DataLoaders.
+
+        Returns:
+            A dictionary containing the MyDb instance, the DataLoaders and the
+            metrics.
+        """
+        return {
+            "db": self.db,
+            "loaders": Loaders.create(self.db),
+            "metrics": self.metrics,
+        }
+
     async def _startup(self) -> None:
         """
         Perform startup tasks when a HTTP request comes in.
         Connect to the database.
         """
         await self.db.connect()
+        for engine in self.db.engines:
+            self.metrics.instrument_engine(engine)
 
     async def _shutdown(self) -> None:
         """
@@ -173,3 +556,151 @@ class MyApp(pydantic.BaseModel):
         Close to connection to the database.
         """
         await self.db.close()
+
+
+class _AccountingMiddleware:
+    """
+    ASGI middleware accounting for the SQL statements of every HTTP request.
+    """
+
+    def __init__(self, app: ASGIApp, accounting: QueryAccounting) -> None:
+        self.app: ASGIApp = app
+        self.accounting: QueryAccounting = accounting
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with self.accounting.track() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers: MutableHeaders = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.queries)
+                    headers["X-DB-Time"] = f"{stats.time * 1000:.3f}"
+                    problems: list[str] = self.accounting.check(
+                        stats, f"{scope['method']} {scope['path']}"
+                    )
+                    if problems:
+                        headers["X-DB-Warnings"] = "; ".join(problems)
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+
+class _NotModified(Exception):
+    """
+    Raised to answer a conditional GET request with 304 Not Modified.
+    """
+
+    def __init__(self, etag: str) -> None:
+        super().__init__(etag)
+        self.etag: str = etag
+
+
+async def _not_modified(request: Request, exc: _NotModified) -> Response:
+    return Response(status_code=304, headers={"ETag": exc.etag})
+
+
+def _etag(path: str, query: str, versions: tuple[int, ...]) -> str:
+    """
+    Compute the strong ETag of a response from its URL and the versions of the
+    tables it is built from.
+    """
+    key: str = f"{path}?{query}@{'.'.join(map(str, versions))}"
+    return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+def _if_none_match(request: Request, etag: str) -> bool:
+    """
+    Check whether the If-None-Match header of a request matches the current
+    ETag of the response: it is *, or one of its ETags is, weak ones included
+    (as If-None-Match uses the weak comparison).
+    """
+    header: str = request.headers.get("If-None-Match", "")
+    etags: set[str] = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in etags or etag in etags
+
+
+async def _get_page(
+    get_page: Callable[..., Awaitable[Page]],
+    response: Response,
+    limit: int | None,
+    cursor: str | None,
+) -> Page:
+    """
+    Retrieve a page through one of the MyDb.get_*_page methods, setting the
+    X-Next-Cursor header of the response if there is a next page.
+
+    Raises:
+        HTTPException: If the cursor is invalid (400 Bad Request).
+    """
+    try:
+        page: Page = await get_page(limit=limit or DEFAULT_PAGE_SIZE, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page
+
+
+_FILE_COLUMNS: tuple[str, ...] = ("id", "name", "numdos", "numdosvl")
+_file_columns: Callable[[File], tuple[Any, ...]] = attrgetter(*_FILE_COLUMNS)
+
+
+def _file_columns_as_json(file: File) -> dict[str, Any]:
+    columns: dict[str, Any] = dict(zip(_FILE_COLUMNS, _file_columns(file)))
+    columns["format"] = file.format.value
+    columns["language"] = file.language.value
+    return columns
+
+
+def _standard_as_json(standard: Standard) -> dict[str, Any]:
+    """
+    Convert a standard into a JSON-compatible dictionary, in the same shape as
+    /standards, without following the File.standard back-reference.
+    """
+    return {
+        "numdos": standard.numdos,
+        "files": [_file_columns_as_json(file) for file in standard.files],
+    }
+
+
+def _file_as_json(file: File) -> dict[str, Any]:
+    """
+    Convert a file into a JSON-compatible dictionary, in the same shape as
+    /files, without following the Standard.files back-reference.
+    """
+    return {**_file_columns_as_json(file), "standard": {"numdos": file.numdos}}
+
+
+def _json_response(content: Any, response: Response) -> Response:
+    """
+    Serialize a JSON-compatible content (built by the *_as_json functions) with
+    orjson, bypassing the validation and the generic jsonable_encoder walk of
+    FastAPI, along with the headers set on the response by the route and its
+    dependencies (e.g. ETag, X-Next-Cursor).
+    """
+    json_response: ORJSONResponse = ORJSONResponse(
+        content, status_code=response.status_code or 200
+    )
+    json_response.raw_headers.extend(response.headers.raw)
+    return json_response
+
+
+async def _to_ndjson(
+    items: AsyncIterator[Any], as_json: Callable[[Any], dict[str, Any]]
+) -> AsyncIterator[str]:
+    """
+    Serialize database instances into newline-delimited JSON.
+
+    Args:
+        items: The database instances to serialize.
+        as_json: The function converting an instance into a JSON-compatible
+            dictionary.
+
+    Yields:
+        One line of JSON per instance.
+    """
+    async for item in items:
+        yield json.dumps(as_json(item)) + "\n"
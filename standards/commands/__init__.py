@@ -1,2 +1,8 @@
+from .benchmark import benchmark
+from .catalog import export_catalog, import_catalog
+from .explain import explain
+from .loadtest import loadtest
+from .migrate import migrate
 from .random_populate import random_populate
+from .rebuild_stats import rebuild_stats
 from .runserver import runserver
@@ -0,0 +1,520 @@
+import json
+import platform
+import sqlite3
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Literal
+import httpx
+import pydantic
+import sqlalchemy
+from fastapi import FastAPI
+from rich.console import Console
+from rich.table import Table
+from .random_populate import random_populate
+from .._private.enum import FileFormat, FileLanguage
+from .._private.pydantic import Config as _PydanticConfig
+from .._private.stats import percentile
+from ..app import MyApp
+from ..db import MyDb
+from ..graphql import get_schema
+
+__all__: list[str] = ["DEFAULT_REPEAT", "DEFAULT_SIZES", "benchmark"]
+
+
+DEFAULT_SIZES: tuple[int, ...] = (1_000,)
+DEFAULT_REPEAT: int = 50
+DEFAULT_SCAN_REPEAT: int = 3
+SAMPLE_SIZE: int = 100
+PERCENTILES: tuple[int, ...] = (50, 90, 95, 99)
+_COLUMNS: tuple[str, ...] = (
+    "min",
+    "mean",
+    *(f"p{rank}" for rank in PERCENTILES),
+    "max",
+)
+
+
+class Case(pydantic.BaseModel):
+    """
+    Represents a benchmarked operation.
+
+    Attributes:
+        name: The name of the case.
+        kind: The layer the operation goes through.
+        run: The operation, given the number of the run.
+        scan: Whether the operation reads whole tables (and is run fewer times).
+    """
+
+    name: str
+    kind: Literal["db", "rest", "graphql"]
+    run: Callable[[int], Awaitable[Any]]
+    scan: bool = False
+
+    Config = _PydanticConfig
+
+
+class Timings(pydantic.BaseModel):
+    """
+    Represents the timings of a case, in milliseconds.
+
+    Attributes:
+        name: The name of the case.
+        kind: The layer the operation goes through.
+        runs: The number of timed runs.
+        min: The fastest run.
+        mean: The mean of the runs.
+        p50: The median of the runs.
+        p90: The 90th percentile of the runs.
+        p95: The 95th percentile of the runs.
+        p99: The 99th percentile of the runs.
+        max: The slowest run.
+    """
+
+    name: str
+    kind: str
+    runs: int
+    min: float
+    mean: float
+    p50: float
+    p90: float
+    p95: float
+    p99: float
+    max: float
+
+    @classmethod
+    def from_durations(cls, case: Case, durations: list[float]) -> "Timings":
+        """
+        Summarize the durations of the runs of a case.
+
+        Args:
+            case: The benchmarked case.
+            durations: The durations of the runs, in seconds.
+
+        Returns:
+            The timings, in milliseconds.
+        """
+        ordered: list[float] = sorted(duration * 1000 for duration in durations)
+        return cls(
+            name=case.name,
+            kind=case.kind,
+            runs=len(ordered),
+            min=ordered[0],
+            mean=sum(ordered) / len(ordered),
+            max=ordered[-1],
+            **{f"p{rank}": percentile(ordered, rank) for rank in PERCENTILES},
+        )
+
+
+async def benchmark(
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    repeat: int = DEFAULT_REPEAT,
+    scan_repeat: int = DEFAULT_SCAN_REPEAT,
+    data_dir: Path = Path(".benchmarks"),
+    output: Path | None = None,
+    seed: int = 0,
+    only: str = "",
+) -> dict[str, Any]:
+    """
+    Benchmark the MyDb methods, the REST routes and GraphQL queries against
+    SQLite databases seeded with random_populate.
+
+    The databases are kept in data_dir and reused by the next runs with the
+    same size and seed.
+
+    Args:
+        sizes: The numbers of standards of the benchmarked databases.
+        repeat: The number of timed runs of every case (after a warm-up run).
+        scan_repeat: The number of timed runs of the cases reading whole tables,
+            0 to skip them.
+        data_dir: The directory of the seeded databases.
+        output: The path of the JSON report, if any.
+        seed: The seed of the datasets.
+        only: Only run the cases whose name contains this string.
+
+    Returns:
+        The report, with the timings of every case for every size.
+    """
+    report: dict[str, Any] = {"meta": _meta(repeat, scan_repeat, seed), "results": {}}
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for size in sizes:
+        path: Path = data_dir / f"standards-{size}-{seed}.sqlite"
+        db_url: str = f"sqlite+aiosqlite:///{path}"
+        if not path.exists():
+            await random_populate(db_url, amount=size, seed=seed)
+        timings: list[Timings] = await _benchmark_db(db_url, repeat, scan_repeat, only)
+        _print(size, timings)
+        report["results"][str(size)] = [timing.dict() for timing in timings]
+    if output is not None:
+        output.write_text(json.dumps(report, indent=2))
+    return report
+
+
+async def _benchmark_db(
+    db_url: str, repeat: int, scan_repeat: int, only: str
+) -> list[Timings]:
+    db: MyDb = await MyDb.start(db_url=db_url)
+    app: MyApp = await MyApp.start(FastAPI(), db, get_schema())
+    timings: list[Timings] = []
+    try:
+        async with httpx.AsyncClient(
+            app=app.api, base_url="http://benchmark"
+        ) as client:
+            for case in await _cases(db, client):
+                runs: int = scan_repeat if case.scan else repeat
+                if only in case.name and runs > 0:
+                    timings.append(await _time(case, runs))
+    finally:
+        await db.close()
+    return timings
+
+
+async def _time(case: Case, runs: int) -> Timings:
+    await case.run(0)  # Warm-up
+    durations: list[float] = []
+    for run in range(1, runs + 1):
+        start: float = time.perf_counter()
+        await case.run(run)
+        durations.append(time.perf_counter() - start)
+    return Timings.from_durations(case, durations)
+
+
+async def _cases(db: MyDb, client: httpx.AsyncClient) -> list[Case]:
+    """
+    Build the benchmarked cases, looking up their arguments in a sample of the
+    standards and files of the database.
+    """
+    numdos: list[str] = [
+        standard.numdos
+        for standard in (await db.get_standards_page(limit=SAMPLE_SIZE)).items
+    ]
+    keys: list[tuple[str, str]] = [
+        (file.numdos, file.numdosvl)
+        for file in (await db.get_files_page(limit=SAMPLE_SIZE)).items
+    ]
+    if not numdos or not keys:
+        raise ValueError("Cannot benchmark an empty database")
+
+    def standard(run: int) -> str:
+        return numdos[run % len(numdos)]
+
+    def file(run: int) -> tuple[str, str]:
+        return keys[run % len(keys)]
+
+    async def get(url: str, **params: Any) -> None:
+        _check(await client.get(url, params=params))
+
+    async def post(url: str, body: Any) -> None:
+        _check(await client.post(url, json=body))
+
+    async def query(document: str, **variables: Any) -> None:
+        response: httpx.Response = await client.post(
+            "/graphql", json={"query": document, "variables": variables}
+        )
+        _check(response)
+        if response.json().get("errors"):
+            raise RuntimeError(f"GraphQL errors: {response.json()['errors']}")
+
+    async def stream(iterator: Any) -> None:
+        async for _ in iterator:
+            pass
+
+    file_keys: list[dict[str, str]] = [
+        {"numdos": key, "numdosvl": keyvl} for key, keyvl in keys
+    ]
+    return [
+        # MyDb
+        Case(
+            name="db.get_standard",
+            kind="db",
+            run=lambda run: db.get_standard(standard(run)),
+        ),
+        Case(name="db.get_file", kind="db", run=lambda run: db.get_file(*file(run))),
+        Case(
+            name="db.get_standards_page",
+            kind="db",
+            run=lambda run: db.get_standards_page(),
+        ),
+        Case(name="db.get_files_page", kind="db", run=lambda run: db.get_files_page()),
+        Case(
+            name="db.get_standards_by_numdos",
+            kind="db",
+            run=lambda run: db.get_standards_by_numdos(numdos),
+        ),
+        Case(
+            name="db.get_files_by_numdos",
+            kind="db",
+            run=lambda run: db.get_files_by_numdos(numdos),
+        ),
+        Case(
+            name="db.get_files_by_keys",
+            kind="db",
+            run=lambda run: db.get_files_by_keys(keys),
+        ),
+        Case(
+            name="db.get_table_versions",
+            kind="db",
+            run=lambda run: db.get_table_versions(("standards", "files")),
+        ),
+        Case(name="db.get_stats", kind="db", run=lambda run: db.get_stats()),
+        Case(
+            name="db.search",
+            kind="db",
+            run=lambda run: db.search(standard(run)),
+        ),
+        Case(
+            name="db.search.prefix",
+            kind="db",
+            run=lambda run: db.search(f"{standard(run)[:4]}*"),
+        ),
+        Case(
+            name="db.get_standards",
+            kind="db",
+            run=lambda run: db.get_standards(),
+            scan=True,
+        ),
+        Case(name="db.get_files", kind="db", run=lambda run: db.get_files(), scan=True),
+        Case(
+            name="db.get_files.filtered",
+            kind="db",
+            run=lambda run: db.get_files(
+                formats=[FileFormat.PDF],
+                languages=[FileLanguage.FR],
+                numdos_prefix=standard(run)[:2],
+            ),
+        ),
+        Case(
+            name="db.stream_standards",
+            kind="db",
+            run=lambda run: stream(db.stream_standards()),
+            scan=True,
+        ),
+        Case(
+            name="db.stream_files",
+            kind="db",
+            run=lambda run: stream(db.stream_files()),
+            scan=True,
+        ),
+        # REST
+        Case(
+            name="GET /hello/{name}",
+            kind="rest",
+            run=lambda run: get("/hello/benchmark"),
+        ),
+        Case(
+            name="GET /standard/{numdos}",
+            kind="rest",
+            run=lambda run: get(f"/standard/{standard(run)}"),
+        ),
+        Case(
+            name="GET /file",
+            kind="rest",
+            run=lambda run: get("/file", numdos=file(run)[0], numdosvl=file(run)[1]),
+        ),
+        Case(
+            name="GET /standards?limit",
+            kind="rest",
+            run=lambda run: get("/standards", limit=SAMPLE_SIZE),
+        ),
+        Case(
+            name="GET /files?limit",
+            kind="rest",
+            run=lambda run: get("/files", limit=SAMPLE_SIZE),
+        ),
+        Case(
+            name="GET /files?format&language&numdos_prefix&limit",
+            kind="rest",
+            run=lambda run: get(
+                "/files",
+                format="pdf",
+                language="fr",
+                numdos_prefix=standard(run)[:2],
+                limit=SAMPLE_SIZE,
+            ),
+        ),
+        Case(
+            name="POST /standards/batch",
+            kind="rest",
+            run=lambda run: post("/standards/batch", numdos),
+        ),
+        Case(
+            name="POST /files/batch",
+            kind="rest",
+            run=lambda run: post("/files/batch", file_keys),
+        ),
+        Case(
+            name="GET /search",
+            kind="rest",
+            run=lambda run: get("/search", q=f"{standard(run)[:4]}*"),
+        ),
+        Case(name="GET /pool", kind="rest", run=lambda run: get("/pool")),
+        Case(name="GET /cache", kind="rest", run=lambda run: get("/cache")),
+        Case(name="GET /stats", kind="rest", run=lambda run: get("/stats")),
+        Case(name="GET /metrics", kind="rest", run=lambda run: get("/metrics")),
+        Case(
+            name="GET /standards",
+            kind="rest",
+            run=lambda run: get("/standards"),
+            scan=True,
+        ),
+        Case(name="GET /files", kind="rest", run=lambda run: get("/files"), scan=True),
+        Case(
+            name="GET /standards.ndjson",
+            kind="rest",
+            run=lambda run: get("/standards.ndjson"),
+            scan=True,
+        ),
+        Case(
+            name="GET /files.ndjson",
+            kind="rest",
+            run=lambda run: get("/files.ndjson"),
+            scan=True,
+        ),
+        # GraphQL
+        Case(
+            name="graphql.standard",
+            kind="graphql",
+            run=lambda run: query(_STANDARD, numdos=standard(run)),
+        ),
+        Case(
+            name="graphql.file",
+            kind="graphql",
+            run=lambda run: query(_FILE, numdos=file(run)[0], numdosvl=file(run)[1]),
+        ),
+        Case(
+            name="graphql.standards_connection.flat",
+            kind="graphql",
+            run=lambda run: query(_STANDARDS_FLAT, first=SAMPLE_SIZE),
+        ),
+        Case(
+            name="graphql.standards_connection.nested",
+            kind="graphql",
+            run=lambda run: query(_STANDARDS_NESTED, first=SAMPLE_SIZE),
+        ),
+        Case(
+            name="graphql.files_connection.nested",
+            kind="graphql",
+            run=lambda run: query(_FILES_NESTED, first=SAMPLE_SIZE),
+        ),
+        Case(
+            name="graphql.standards_by_numdos.nested",
+            kind="graphql",
+            run=lambda run: query(_STANDARDS_BY_NUMDOS, numdos=numdos),
+        ),
+        Case(
+            name="graphql.search.nested",
+            kind="graphql",
+            run=lambda run: query(_SEARCH, query=f"{standard(run)[:4]}*"),
+        ),
+        Case(name="graphql.stats", kind="graphql", run=lambda run: query(_STATS)),
+        Case(
+            name="graphql.standards.nested",
+            kind="graphql",
+            run=lambda run: query(_STANDARDS),
+            scan=True,
+        ),
+    ]
+
+
+_STANDARD: str = """
+query ($numdos: String!) {
+  standard(numdos: $numdos) { numdos files { name format language } }
+}
+"""
+_FILE: str = """
+query ($numdos: String!, $numdosvl: String!) {
+  file(numdos: $numdos, numdosvl: $numdosvl) { id name format language }
+}
+"""
+_STANDARDS_FLAT: str = """
+query ($first: Int!) {
+  standardsConnection(first: $first) { edges { node { numdos } } }
+}
+"""
+_STANDARDS_NESTED: str = """
+query ($first: Int!) {
+  standardsConnection(first: $first) {
+    edges { node { numdos files { name format language } } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+_FILES_NESTED: str = """
+query ($first: Int!) {
+  filesConnection(first: $first) {
+    edges { node { name numdosvl standard { numdos files { name } } } }
+  }
+}
+"""
+_STANDARDS_BY_NUMDOS: str = """
+query ($numdos: [String!]!) {
+  standardsByNumdos(numdos: $numdos) { numdos files { name format } }
+}
+"""
+_STANDARDS: str = """
+{ standards { numdos files { name format language } } }
+"""
+_SEARCH: str = """
+query ($query: String!) {
+  search(query: $query) {
+    edges { node { name format language standard { numdos } } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+_STATS: str = """
+{
+  stats {
+    files
+    formats { value count }
+    languages { value count }
+    prefixes { value count }
+  }
+}
+"""
+
+
+def _check(response: httpx.Response) -> None:
+    if response.status_code != 200:
+        raise RuntimeError(
+            f"{response.request.method} {response.request.url} answered "
+            f"{response.status_code}: {response.text[:200]}"
+        )
+
+
+def _meta(repeat: int, scan_repeat: int, seed: int) -> dict[str, Any]:
+    """
+    The context of the benchmark, to compare reports between commits.
+    """
+    try:
+        commit: str | None = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "sqlite": sqlite3.sqlite_version,
+        "repeat": repeat,
+        "scan_repeat": scan_repeat,
+        "seed": seed,
+    }
+
+
+def _print(size: int, timings: list[Timings]) -> None:
+    table: Table = Table(title=f"{size} standards (ms)")
+    table.add_column("case", no_wrap=True)
+    table.add_column("runs", justify="right")
+    for column in _COLUMNS:
+        table.add_column(column, justify="right")
+    for timing in timings:
+        table.add_row(
+            timing.name,
+            str(timing.runs),
+            *(f"{getattr(timing, column):.2f}" for column in _COLUMNS),
+        )
+    Console().print(table)
@@ -0,0 +1,271 @@
+import csv
+import json
+from enum import Enum
+from pathlib import Path
+from typing import IO, Any, Callable, Iterator, Literal, cast
+import pydantic
+from rich.progress import Progress
+from sqlalchemy import Column, Table, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from ..db.migrations import upgrade
+from ..db.models import File, Standard
+from ..schemas import FileRow, StandardRow
+
+__all__: list[str] = ["DEFAULT_CHUNK_SIZE", "export_catalog", "import_catalog"]
+
+
+DEFAULT_CHUNK_SIZE: int = 10_000
+MAX_REPORTED_ERRORS: int = 20
+
+CatalogTable = Literal["standards", "files"]
+CatalogFormat = Literal["csv", "ndjson"]
+
+_ROWS: dict[str, type[pydantic.BaseModel]] = {
+    "standards": StandardRow,
+    "files": FileRow,
+}
+_TABLES: dict[str, Table] = {
+    "standards": cast(Table, Standard.__table__),
+    "files": cast(Table, File.__table__),
+}
+
+
+async def export_catalog(
+    db_url: str,
+    table: CatalogTable,
+    path: Path,
+    file_format: CatalogFormat | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Export the rows of a table to a CSV or NDJSON file, streaming them from the
+    database in chunks.
+
+    Args:
+        db_url: The URL of the database.
+        table: The table to export.
+        path: The path of the file to write.
+        file_format: The format of the file, guessed from its suffix if None.
+        chunk_size: The number of rows fetched at once.
+
+    Returns:
+        The number of exported rows.
+    """
+    file_format = file_format or _guess_format(path)
+    columns: list[str] = list(_ROWS[table].__fields__)
+    db_table: Table = _TABLES[table]
+    engine: AsyncEngine = create_async_engine(db_url)
+    exported: int = 0
+    try:
+        async with engine.connect() as conn:
+            total: int = (
+                await conn.execute(select(func.count()).select_from(db_table))
+            ).scalar() or 0
+            result = await conn.stream(
+                select(*(db_table.c[column] for column in columns))
+                .order_by(*db_table.primary_key.columns)
+                .execution_options(yield_per=chunk_size)
+            )
+            with path.open("w", newline="") as file, Progress() as progress:
+                task_id = progress.add_task(f"Exporting {table}...", total=total)
+                write: Callable[[dict[str, Any]], Any] = _writer(
+                    file, file_format, columns
+                )
+                async for rows in result.mappings().partitions():
+                    for row in rows:
+                        write(
+                            {
+                                key: value.value if isinstance(value, Enum) else value
+                                for key, value in row.items()
+                            }
+                        )
+                    exported += len(rows)
+                    progress.advance(task_id, len(rows))
+    finally:
+        await engine.dispose()
+    print(f"{exported} exported {table.capitalize()} to {path}.")
+    return exported
+
+
+async def import_catalog(
+    db_url: str,
+    table: CatalogTable,
+    path: Path,
+    file_format: CatalogFormat | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Import the rows of a CSV or NDJSON file into a table, upserting them in one
+    transaction per chunk.
+
+    The whole file is validated before anything is written, then read again to
+    be imported, so that only one chunk is held in memory at once. The
+    standards of the imported files are created if they do not exist yet.
+
+    Args:
+        db_url: The URL of the database.
+        table: The table to import into.
+        path: The path of the file to read.
+        file_format: The format of the file, guessed from its suffix if None.
+        chunk_size: The number of rows upserted per transaction.
+
+    Returns:
+        The number of imported rows.
+
+    Raises:
+        ValueError: If some rows of the file are not valid.
+    """
+    file_format = file_format or _guess_format(path)
+    model: type[pydantic.BaseModel] = _ROWS[table]
+    total: int = _validate(path, file_format, model)
+    engine: AsyncEngine = create_async_engine(db_url)
+    imported: int = 0
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(upgrade)
+        with Progress() as progress:
+            task_id = progress.add_task(f"Importing {table}...", total=total)
+            for chunk in _chunks(_read(path, file_format), chunk_size):
+                rows: list[dict[str, Any]] = [model(**row).dict() for row in chunk]
+                async with engine.begin() as conn:
+                    if table == "files":
+                        await _upsert_files(conn, rows)
+                    else:
+                        await _upsert_standards(conn, rows)
+                imported += len(rows)
+                progress.advance(task_id, len(rows))
+    finally:
+        await engine.dispose()
+    print(f"{imported} imported {table.capitalize()} from {path}.")
+    return imported
+
+
+def _guess_format(path: Path) -> CatalogFormat:
+    if path.suffix == ".csv":
+        return "csv"
+    if path.suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    raise ValueError(f"Cannot guess the format of {path}, use csv or ndjson")
+
+
+def _writer(
+    file: IO[str], file_format: CatalogFormat, columns: list[str]
+) -> Callable[[dict[str, Any]], Any]:
+    if file_format == "csv":
+        writer: csv.DictWriter = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        return writer.writerow
+    return lambda row: file.write(json.dumps(row) + "\n")
+
+
+def _read(path: Path, file_format: CatalogFormat) -> Iterator[dict[str, Any]]:
+    """
+    Read the rows of a file one at a time, the empty CSV values being missing
+    values.
+    """
+    with path.open(newline="") as file:
+        if file_format == "csv":
+            for row in csv.DictReader(file):
+                yield {key: value for key, value in row.items() if value != ""}
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _validate(
+    path: Path, file_format: CatalogFormat, model: type[pydantic.BaseModel]
+) -> int:
+    """
+    Validate every row of a file.
+
+    Returns:
+        The number of rows.
+
+    Raises:
+        ValueError: If some rows are not valid, listing the first ones.
+    """
+    errors: list[str] = []
+    invalid: int = 0
+    count: int = 0
+    for count, row in enumerate(_read(path, file_format), start=1):
+        try:
+            model(**row)
+        except pydantic.ValidationError as error:
+            invalid += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"Row {count}: {_describe(error)}")
+    if invalid:
+        raise ValueError(f"{invalid} invalid rows in {path}:\n" + "\n".join(errors))
+    return count
+
+
+def _describe(error: pydantic.ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _chunks(
+    rows: Iterator[dict[str, Any]], size: int
+) -> Iterator[list[dict[str, Any]]]:
+    chunk: list[dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(conn: AsyncConnection, table: Table) -> Any:
+    """
+    Build an INSERT statement supporting ON CONFLICT clauses, for the dialects
+    having one.
+    """
+    if conn.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    if conn.dialect.name == "sqlite":
+        return sqlite.insert(table)
+    raise ValueError(f"Upserts are not supported by {conn.dialect.name}")
+
+
+async def _upsert_standards(conn: AsyncConnection, rows: list[dict[str, Any]]) -> None:
+    await conn.execute(
+        _insert(conn, _TABLES["standards"]).on_conflict_do_nothing(
+            index_elements=[Standard.numdos]
+        ),
+        rows,
+    )
+
+
+async def _upsert_files(conn: AsyncConnection, rows: list[dict[str, Any]]) -> None:
+    # The standards of the files are created if they do not exist yet
+    await _upsert_standards(
+        conn, [{"numdos": numdos} for numdos in sorted({row["numdos"] for row in rows})]
+    )
+    identified: list[dict[str, Any]] = [row for row in rows if row["id"] is not None]
+    new: list[dict[str, Any]] = [
+        {key: value for key, value in row.items() if key != "id"}
+        for row in rows
+        if row["id"] is None
+    ]
+    if identified:
+        statement = _insert(conn, _TABLES["files"])
+        updated: list[Column] = [
+            column for column in _TABLES["files"].columns if column.name != "id"
+        ]
+        await conn.execute(
+            statement.on_conflict_do_update(
+                index_elements=[File.id],
+                set_={
+                    column.name: statement.excluded[column.name] for column in updated
+                },
+            ),
+            identified,
+        )
+    if new:
+        await conn.execute(insert(File), new)
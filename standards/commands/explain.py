@@ -0,0 +1,529 @@
+import json
+import re
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Literal
+import httpx
+import pydantic
+from fastapi import FastAPI
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Dialect
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from .._private.pydantic import Config as _PydanticConfig
+from ..app import MyApp
+from ..db import MyDb, Page
+from ..db.accounting import shape_of
+from ..db.models import File, Standard
+from ..db.pagination import encode_cursor
+from ..graphql import CostLimits, get_schema
+
+__all__: list[str] = ["ACCESS_PATHS", "AccessPath", "Finding", "QueryPlan", "explain"]
+
+
+SAMPLE_SIZE: int = 20
+
+FindingKind = Literal["full_scan", "temp_sort", "not_covering"]
+
+
+class Sample(pydantic.BaseModel):
+    """
+    Represents the keys the access paths are run with, read from the database.
+
+    Attributes:
+        numdos: The numdos of some standards.
+        files: The numdos and numdosvl of some files.
+        file_ids: The IDs of the same files.
+    """
+
+    numdos: list[str]
+    files: list[tuple[str, str]]
+    file_ids: list[int]
+
+
+class AccessPath(pydantic.BaseModel):
+    """
+    Represents a way the API reads the database, whose statements are explained.
+
+    Attributes:
+        request: The function sending the request(s) of the access path.
+        allow: The findings expected from the access path (e.g. the full scan of
+            a table it lists), as "kind:table" or "kind", which are reported but
+            are not regressions.
+    """
+
+    request: Callable[[httpx.AsyncClient, Sample], Awaitable[httpx.Response]]
+    allow: frozenset[str] = frozenset()
+
+    Config = _PydanticConfig
+
+
+class Finding(pydantic.BaseModel):
+    """
+    Represents a step of a query plan that does not scale with the size of the
+    tables.
+
+    Attributes:
+        kind: full_scan (the whole table, or index, is read), temp_sort (the
+            rows are sorted in a temporary B-tree) or not_covering (an index is
+            searched, then the table for the other columns).
+        table: The table (or index) of the step, if any.
+        detail: The step of the plan.
+        allowed: Whether the finding is expected from its access path.
+    """
+
+    kind: FindingKind
+    table: str | None = None
+    detail: str
+    allowed: bool = False
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}:{self.table}" if self.table else self.kind
+
+    @property
+    def is_regression(self) -> bool:
+        # The lookups by index are expected to read the rows of the table
+        return not self.allowed and self.kind != "not_covering"
+
+
+class QueryPlan(pydantic.BaseModel):
+    """
+    Represents the plan of a statement issued by an access path.
+
+    Attributes:
+        path: The name of the access path.
+        statement: The statement, with its parameters collapsed.
+        plan: The steps of the plan, as reported by the database.
+        findings: The steps of the plan that do not scale.
+    """
+
+    path: str
+    statement: str
+    plan: list[str]
+    findings: list[Finding] = []
+
+
+async def _graphql(
+    client: httpx.AsyncClient, document: str, **variables: Any
+) -> httpx.Response:
+    response: httpx.Response = await client.post(
+        "/graphql", json={"query": document, "variables": variables}
+    )
+    if response.is_success and response.json().get("errors"):
+        raise ValueError(f"GraphQL errors: {response.json()['errors']}")
+    return response
+
+
+_STANDARD_FIELDS: str = "numdos files { name format standard { numdos } }"
+_FILE_FIELDS: str = "name numdosvl standard { numdos files { name } }"
+
+ACCESS_PATHS: dict[str, AccessPath] = {
+    "standard": AccessPath(
+        request=lambda client, sample: client.get(f"/standard/{sample.numdos[0]}")
+    ),
+    "standards": AccessPath(
+        request=lambda client, sample: client.get("/standards"),
+        allow=frozenset({"full_scan:standards"}),
+    ),
+    "standards_page": AccessPath(
+        request=lambda client, sample: client.get(
+            "/standards", params={"limit": SAMPLE_SIZE}
+        ),
+        # The scan in numdos order stops at the end of the page
+        allow=frozenset({"full_scan:standards"}),
+    ),
+    "standards_next_page": AccessPath(
+        request=lambda client, sample: client.get(
+            "/standards",
+            params={"limit": SAMPLE_SIZE, "cursor": encode_cursor(sample.numdos[0])},
+        )
+    ),
+    "standards_prefix": AccessPath(
+        request=lambda client, sample: client.get(
+            "/standards", params={"numdos_prefix": sample.numdos[0][:3]}
+        )
+    ),
+    "standards_batch": AccessPath(
+        request=lambda client, sample: client.post(
+            "/standards/batch", json=sample.numdos
+        )
+    ),
+    "standards_ndjson": AccessPath(
+        request=lambda client, sample: client.get("/standards.ndjson"),
+        allow=frozenset({"full_scan:standards"}),
+    ),
+    "file": AccessPath(
+        request=lambda client, sample: client.get(
+            "/file",
+            params={"numdos": sample.files[0][0], "numdosvl": sample.files[0][1]},
+        )
+    ),
+    "files": AccessPath(
+        request=lambda client, sample: client.get("/files"),
+        allow=frozenset({"full_scan:files"}),
+    ),
+    "files_page": AccessPath(
+        request=lambda client, sample: client.get(
+            "/files", params={"limit": SAMPLE_SIZE}
+        ),
+        # The scan in id order stops at the end of the page
+        allow=frozenset({"full_scan:files"}),
+    ),
+    "files_next_page": AccessPath(
+        request=lambda client, sample: client.get(
+            "/files",
+            params={"limit": SAMPLE_SIZE, "cursor": encode_cursor(sample.file_ids[0])},
+        )
+    ),
+    "files_filtered": AccessPath(
+        request=lambda client, sample: client.get(
+            "/files", params={"format": ["pdf", "xml"], "language": "fr"}
+        )
+    ),
+    "files_filtered_page": AccessPath(
+        request=lambda client, sample: client.get(
+            "/files", params={"language": "en", "limit": SAMPLE_SIZE}
+        )
+    ),
+    "files_prefix": AccessPath(
+        request=lambda client, sample: client.get(
+            "/files", params={"numdos_prefix": sample.files[0][0][:3]}
+        )
+    ),
+    "files_batch": AccessPath(
+        request=lambda client, sample: client.post(
+            "/files/batch",
+            json=[
+                {"numdos": numdos, "numdosvl": numdosvl}
+                for numdos, numdosvl in sample.files
+            ],
+        ),
+        # The files found are sorted by id
+        allow=frozenset({"temp_sort"}),
+    ),
+    "files_ndjson": AccessPath(
+        request=lambda client, sample: client.get("/files.ndjson"),
+        allow=frozenset({"full_scan:files"}),
+    ),
+    "search": AccessPath(
+        request=lambda client, sample: client.get(
+            "/search",
+            params={"q": f"{sample.files[0][0][:3]}*", "format": ["pdf", "xml"]},
+        ),
+        # The files found are sorted by rank
+        allow=frozenset({"temp_sort"}),
+    ),
+    "stats": AccessPath(
+        request=lambda client, sample: client.get("/stats"),
+        # The counts are read whole, one row by value
+        allow=frozenset({"full_scan:file_counts"}),
+    ),
+    "graphql_standard": AccessPath(
+        request=lambda client, sample: _graphql(
+            client,
+            f"query ($numdos: String!) {{ standard(numdos: $numdos) {{"
+            f" {_STANDARD_FIELDS} }} }}",
+            numdos=sample.numdos[0],
+        )
+    ),
+    "graphql_standards": AccessPath(
+        request=lambda client, sample: _graphql(
+            client, f"{{ standards {{ {_STANDARD_FIELDS} }} }}"
+        ),
+        allow=frozenset({"full_scan:standards"}),
+    ),
+    "graphql_standards_by_numdos": AccessPath(
+        request=lambda client, sample: _graphql(
+            client,
+            f"query ($numdos: [String!]!) {{ standardsByNumdos(numdos: $numdos) {{"
+            f" {_STANDARD_FIELDS} }} }}",
+            numdos=sample.numdos,
+        )
+    ),
+    "graphql_standards_connection": AccessPath(
+        request=lambda client, sample: _graphql(
+            client,
+            f"query ($first: Int!, $after: String) {{"
+            f" standardsConnection(first: $first, after: $after) {{"
+            f" edges {{ node {{ {_STANDARD_FIELDS} }} }} }} }}",
+            first=SAMPLE_SIZE,
+            after=encode_cursor(sample.numdos[0]),
+        )
+    ),
+    "graphql_file": AccessPath(
+        request=lambda client, sample: _graphql(
+            client,
+            f"query ($numdos: String!, $numdosvl: String!) {{"
+            f" file(numdos: $numdos, numdosvl: $numdosvl) {{ {_FILE_FIELDS} }} }}",
+            numdos=sample.files[0][0],
+            numdosvl=sample.files[0][1],
+        )
+    ),
+    "graphql_files": AccessPath(
+        request=lambda client, sample: _graphql(
+            client, f"{{ files {{ {_FILE_FIELDS} }} }}"
+        ),
+        allow=frozenset({"full_scan:files"}),
+    ),
+    "graphql_files_filtered": AccessPath(
+        request=lambda client, sample: _graphql(
+            client,
+            f"query ($prefix: String!) {{ files(formats: [PDF, PDFRL],"
+            f" languages: [EN], numdosPrefix: $prefix) {{ {_FILE_FIELDS} }} }}",
+            prefix=sample.files[0][0][:3],
+        )
+    ),
+    "graphql_files_by_keys": AccessPath(
+        request=lambda client, sample: _graphql(
+            client,
+            f"query ($keys: [FileKeyInput!]!) {{ filesByKeys(keys: $keys) {{"
+            f" {_FILE_FIELDS} }} }}",
+            keys=[
+                {"numdos": numdos, "numdosvl": numdosvl}
+                for numdos, numdosvl in sample.files
+            ],
+        ),
+        # The files found are sorted by id
+        allow=frozenset({"temp_sort"}),
+    ),
+    "graphql_files_connection": AccessPath(
+        request=lambda client, sample: _graphql(
+            client,
+            f"query ($first: Int!, $after: String) {{"
+            f" filesConnection(first: $first, after: $after) {{"
+            f" edges {{ node {{ {_FILE_FIELDS} }} }} }} }}",
+            first=SAMPLE_SIZE,
+            after=encode_cursor(sample.file_ids[0]),
+        )
+    ),
+    "graphql_search": AccessPath(
+        request=lambda client, sample: _graphql(
+            client,
+            f"query ($query: String!) {{ search(query: $query, languages: [FR]) {{"
+            f" edges {{ node {{ {_FILE_FIELDS} }} }} }} }}",
+            query=f"{sample.files[0][0][:3]}*",
+        ),
+        # The files found are sorted by rank
+        allow=frozenset({"temp_sort"}),
+    ),
+    "graphql_stats": AccessPath(
+        request=lambda client, sample: _graphql(
+            client, "{ stats { files formats { value count } prefixes { value } } }"
+        ),
+        allow=frozenset({"full_scan:file_counts"}),
+    ),
+}
+
+
+async def explain(
+    db_url: str, only: str = "", output: Path | None = None
+) -> list[QueryPlan]:
+    """
+    Explain the statements issued by every access path of the API (the REST
+    endpoints and the GraphQL queries, started in-process), against the data
+    of a database, to catch the ones which do not scale: full table scans,
+    temporary sorts and index searches which do not cover the selected columns.
+
+    The full scans and temporary sorts which are not expected from their access
+    path are regressions.
+
+    Args:
+        db_url: The URL of the database, SQLite, PostgreSQL or MySQL.
+        only: Only explain the access paths whose name contains this.
+        output: The path of the JSON report, if any.
+
+    Returns:
+        The plans of the distinct statements of every access path.
+
+    Raises:
+        ValueError: If the database is empty or its dialect is not supported.
+    """
+    db: MyDb = await MyDb.start(db_url=db_url)
+    # The access paths select deeper and more than the clients may
+    unlimited: CostLimits = CostLimits(max_cost=None, max_depth=None)
+    app: MyApp = await MyApp.start(FastAPI(), db, get_schema(cost_limits=unlimited))
+    plans: list[QueryPlan] = []
+    try:
+        # The primary engine, which the statements are explained on
+        engine: AsyncEngine = app.db.engines[0]
+        explain_plan: Callable[
+            [AsyncConnection, str, Any], Awaitable[list[str]]
+        ] = _explainer(engine.dialect)
+        sample: Sample = await _sample(app.db)
+        statements: list[tuple[str, str, Any]] = await _statements(
+            app, sample, [name for name in ACCESS_PATHS if only in name]
+        )
+        async with engine.connect() as conn:
+            for name, statement, parameters in statements:
+                plan: list[str] = await explain_plan(conn, statement, parameters)
+                findings: list[Finding] = _findings(engine.dialect, plan)
+                for finding in findings:
+                    finding.allowed = finding.key in ACCESS_PATHS[name].allow
+                plans.append(
+                    QueryPlan(
+                        path=name,
+                        statement=shape_of(statement),
+                        plan=plan,
+                        findings=findings,
+                    )
+                )
+    finally:
+        await app.db.close()
+    _print(plans)
+    if output is not None:
+        output.write_text(json.dumps([plan.dict() for plan in plans], indent=2))
+    return plans
+
+
+async def _sample(db: MyDb) -> Sample:
+    standards: Page[Standard] = await db.get_standards_page(limit=SAMPLE_SIZE)
+    files: Page[File] = await db.get_files_page(limit=SAMPLE_SIZE)
+    if not standards.items or not files.items:
+        raise ValueError("Cannot explain the queries of an empty database")
+    return Sample(
+        numdos=[standard.numdos for standard in standards.items],
+        files=[(file.numdos, file.numdosvl) for file in files.items],
+        file_ids=[file.id for file in files.items],
+    )
+
+
+async def _statements(
+    app: MyApp, sample: Sample, names: list[str]
+) -> list[tuple[str, str, Any]]:
+    """
+    Run the access paths, recording the distinct statements (by shape) they
+    issue along with the parameters of their first execution.
+    """
+    current: ContextVar[str | None] = ContextVar("access_path", default=None)
+    statements: dict[tuple[str, str], tuple[str, str, Any]] = {}
+
+    def record(
+        conn: Connection, cursor: Any, statement: str, parameters: Any, *args: Any
+    ) -> None:
+        name: str | None = current.get()
+        if name is not None:
+            statements.setdefault(
+                (name, shape_of(statement)), (name, statement, parameters)
+            )
+
+    for engine in app.db.engines:
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with httpx.AsyncClient(app=app.api, base_url="http://explain") as client:
+            for name in names:
+                token = current.set(name)
+                try:
+                    response: httpx.Response = await ACCESS_PATHS[name].request(
+                        client, sample
+                    )
+                finally:
+                    current.reset(token)
+                response.raise_for_status()
+    finally:
+        for engine in app.db.engines:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+    return list(statements.values())
+
+
+def _explainer(
+    dialect: Dialect,
+) -> Callable[[AsyncConnection, str, Any], Awaitable[list[str]]]:
+    """
+    Get the function explaining a statement on a dialect, as the lines of its
+    plan.
+    """
+    if dialect.name == "sqlite":
+        prefix: str = "EXPLAIN QUERY PLAN "
+    elif dialect.name in ("postgresql", "mysql", "mariadb"):
+        prefix = "EXPLAIN "
+    else:
+        raise ValueError(f"Cannot explain the queries of a {dialect.name} database")
+
+    async def explain_plan(
+        conn: AsyncConnection, statement: str, parameters: Any
+    ) -> list[str]:
+        result = await conn.exec_driver_sql(prefix + statement, parameters)
+        if dialect.name == "sqlite":
+            return [row.detail for row in result]
+        if dialect.name == "postgresql":
+            return [row[0].strip() for row in result]
+        return [
+            " ".join(f"{key}={value}" for key, value in row.items() if value)
+            for row in result.mappings()
+        ]
+
+    return explain_plan
+
+
+# The full-text indexes (virtual tables) are searched, whatever SQLite says
+_SQLITE_SCAN: re.Pattern = re.compile(
+    r"^SCAN (?!CONSTANT |\d+ CONSTANT )(\w+)\b(?! VIRTUAL TABLE)"
+)
+_SQLITE_SEARCH: re.Pattern = re.compile(r"^SEARCH (\w+) USING INDEX (\w+)")
+_POSTGRESQL_SCAN: re.Pattern = re.compile(r"Seq Scan on (\w+)")
+_POSTGRESQL_SEARCH: re.Pattern = re.compile(
+    r"(?:(?<!Only )Index Scan using \w+|Bitmap Heap Scan) on (\w+)"
+)
+_POSTGRESQL_SORT: re.Pattern = re.compile(r"^(?:->\s+)?(?:Incremental )?Sort\s+\(")
+_MYSQL_TABLE: re.Pattern = re.compile(r"\btable=(\w+)")
+
+
+def _findings(dialect: Dialect, plan: list[str]) -> list[Finding]:
+    findings: list[Finding] = []
+    for line in plan:
+        if dialect.name == "sqlite":
+            if match := _SQLITE_SCAN.match(line):
+                findings.append(Finding(kind="full_scan", table=match[1], detail=line))
+            elif match := _SQLITE_SEARCH.match(line):
+                findings.append(
+                    Finding(kind="not_covering", table=match[1], detail=line)
+                )
+            if "TEMP B-TREE" in line:
+                findings.append(Finding(kind="temp_sort", detail=line))
+        elif dialect.name == "postgresql":
+            if match := _POSTGRESQL_SCAN.search(line):
+                findings.append(Finding(kind="full_scan", table=match[1], detail=line))
+            elif match := _POSTGRESQL_SEARCH.search(line):
+                findings.append(
+                    Finding(kind="not_covering", table=match[1], detail=line)
+                )
+            if _POSTGRESQL_SORT.match(line):
+                findings.append(Finding(kind="temp_sort", detail=line))
+        else:
+            table: re.Match | None = _MYSQL_TABLE.search(line)
+            name: str | None = table[1] if table else None
+            if "type=ALL" in line or "type=index " in line:
+                findings.append(Finding(kind="full_scan", table=name, detail=line))
+            elif re.search(r"\bkey=", line) and "Using index" not in line:
+                findings.append(Finding(kind="not_covering", table=name, detail=line))
+            if "Using temporary" in line or "Using filesort" in line:
+                findings.append(Finding(kind="temp_sort", detail=line))
+    return findings
+
+
+def _print(plans: list[QueryPlan]) -> None:
+    console: Console = Console()
+    regressions: int = sum(
+        finding.is_regression for plan in plans for finding in plan.findings
+    )
+    table: Table = Table(
+        title=f"{len(plans)} statements explained, {regressions} regressions"
+    )
+    for column in ("access path", "statement", "findings"):
+        table.add_column(column, overflow="fold")
+    for plan in plans:
+        table.add_row(
+            plan.path,
+            plan.statement[:200],
+            "\n".join(f"[{_color(f)}]{f.key}[/]: {f.detail}" for f in plan.findings)
+            or "-",
+        )
+    console.print(table)
+
+
+def _color(finding: Finding) -> str:
+    if finding.is_regression:
+        return "red"
+    return "green" if finding.allowed else "yellow"
@@ -0,0 +1,380 @@
+import asyncio
+import json
+import random
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable
+import httpx
+import pydantic
+from rich.console import Console
+from rich.table import Table
+from .runserver import runserver
+from .._private.stats import percentile
+from ..app import MyApp
+
+__all__: list[str] = ["DEFAULT_MIX", "SCENARIOS", "loadtest", "parse_mix"]
+
+
+DEFAULT_MIX: str = (
+    "standard=4,file=4,standards_page=1,files_page=1,"
+    "graphql_standard=2,graphql_connection=1"
+)
+SAMPLE_SIZE: int = 100
+# The upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS: tuple[float, ...] = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"),
+)  # fmt: skip
+
+
+class Sample(pydantic.BaseModel):
+    """
+    Represents the keys the requests are made with, fetched from the API.
+
+    Attributes:
+        numdos: The numdos of some standards.
+        files: The numdos and numdosvl of some files.
+    """
+
+    numdos: list[str]
+    files: list[tuple[str, str]]
+
+
+Scenario = Callable[[httpx.AsyncClient, Sample, random.Random], Awaitable[bool]]
+
+
+class ScenarioStats(pydantic.BaseModel):
+    """
+    Represents the outcome of the requests of a scenario.
+
+    Attributes:
+        name: The name of the scenario.
+        latencies: The latency of every request, in milliseconds.
+        errors: The number of failed requests.
+    """
+
+    name: str
+    latencies: list[float] = []
+    errors: int = 0
+
+    def summary(self, duration: float) -> dict[str, Any]:
+        """
+        Summarize the requests of the scenario.
+
+        Args:
+            duration: The duration of the load test, in seconds.
+
+        Returns:
+            A dictionary containing the number of requests, the throughput, the
+            error rate, the latency percentiles and histogram.
+        """
+        ordered: list[float] = sorted(self.latencies)
+        requests: int = len(ordered)
+        histogram: dict[str, int] = {f"le_{bound:g}": 0 for bound in HISTOGRAM_BUCKETS}
+        for latency in ordered:
+            bound: float = next(b for b in HISTOGRAM_BUCKETS if latency <= b)
+            histogram[f"le_{bound:g}"] += 1
+        return {
+            "name": self.name,
+            "requests": requests,
+            "throughput": requests / duration if duration else 0.0,
+            "errors": self.errors,
+            "error_rate": self.errors / requests if requests else 0.0,
+            **{
+                f"p{rank}": percentile(ordered, rank) if ordered else None
+                for rank in (50, 90, 99)
+            },
+            "max": ordered[-1] if ordered else None,
+            "histogram": histogram,
+        }
+
+
+async def _standard(
+    client: httpx.AsyncClient, sample: Sample, rng: random.Random
+) -> bool:
+    response = await client.get(f"/standard/{rng.choice(sample.numdos)}")
+    return response.is_success
+
+
+async def _file(client: httpx.AsyncClient, sample: Sample, rng: random.Random) -> bool:
+    numdos, numdosvl = rng.choice(sample.files)
+    response = await client.get(
+        "/file", params={"numdos": numdos, "numdosvl": numdosvl}
+    )
+    return response.is_success
+
+
+async def _standards_page(
+    client: httpx.AsyncClient, sample: Sample, rng: random.Random
+) -> bool:
+    response = await client.get("/standards", params={"limit": SAMPLE_SIZE})
+    return response.is_success
+
+
+async def _files_page(
+    client: httpx.AsyncClient, sample: Sample, rng: random.Random
+) -> bool:
+    response = await client.get("/files", params={"limit": SAMPLE_SIZE})
+    return response.is_success
+
+
+async def _standards_batch(
+    client: httpx.AsyncClient, sample: Sample, rng: random.Random
+) -> bool:
+    response = await client.post("/standards/batch", json=sample.numdos)
+    return response.is_success
+
+
+async def _graphql(client: httpx.AsyncClient, query: str, **variables: Any) -> bool:
+    response = await client.post(
+        "/graphql", json={"query": query, "variables": variables}
+    )
+    return response.is_success and not response.json().get("errors")
+
+
+async def _graphql_standard(
+    client: httpx.AsyncClient, sample: Sample, rng: random.Random
+) -> bool:
+    return await _graphql(
+        client,
+        "query ($numdos: String!) {"
+        " standard(numdos: $numdos) { numdos files { name format language } } }",
+        numdos=rng.choice(sample.numdos),
+    )
+
+
+async def _graphql_connection(
+    client: httpx.AsyncClient, sample: Sample, rng: random.Random
+) -> bool:
+    return await _graphql(
+        client,
+        "query ($first: Int!) { standardsConnection(first: $first) {"
+        " edges { node { numdos files { name format } } } } }",
+        first=SAMPLE_SIZE,
+    )
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "standard": _standard,
+    "file": _file,
+    "standards_page": _standards_page,
+    "files_page": _files_page,
+    "standards_batch": _standards_batch,
+    "graphql_standard": _graphql_standard,
+    "graphql_connection": _graphql_connection,
+}
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """
+    Parse a mix of scenarios.
+
+    Args:
+        mix: The comma separated scenarios along with their weights, e.g.
+            "standard=4,graphql_standard=1".
+
+    Returns:
+        The weights of the scenarios, by name.
+
+    Raises:
+        ValueError: If a scenario is unknown or a weight is not positive.
+    """
+    weights: dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in mix.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(
+                f"Unknown scenario {name}, use one of {', '.join(SCENARIOS)}"
+            )
+        weights[name] = float(weight or 1)
+        if weights[name] <= 0:
+            raise ValueError(f"The weight of {name} must be positive")
+    if not weights:
+        raise ValueError("The mix has no scenario")
+    return weights
+
+
+async def loadtest(
+    url: str | None = None,
+    db_url: str = "",
+    duration: float = 10.0,
+    concurrency: int = 10,
+    rate: float | None = None,
+    mix: str = DEFAULT_MIX,
+    seed: int | None = None,
+    output: Path | None = None,
+) -> dict[str, Any]:
+    """
+    Load test the API with a mix of REST and GraphQL requests.
+
+    With a rate, the requests arrive at random (Poisson) times at this mean
+    rate, whatever the response times, up to concurrency requests in flight;
+    their latency is measured from their arrival so that the queueing delay is
+    accounted for. Without a rate, concurrency clients send their requests one
+    after the other.
+
+    Args:
+        url: The URL of the API, None to start the app in-process.
+        db_url: The URL of the database of the in-process app.
+        duration: The number of seconds requests are sent for.
+        concurrency: The number of clients, or of requests in flight with a rate.
+        rate: The mean number of requests per second, if any.
+        mix: The weights of the scenarios, see parse_mix.
+        seed: The seed of the choices of scenarios and keys.
+        output: The path of the JSON report, if any.
+
+    Returns:
+        The report, with the overall and per scenario throughput, error rate and
+        latency percentiles and histogram.
+    """
+    weights: dict[str, float] = parse_mix(mix)
+    names: list[str] = list(weights)
+    rng: random.Random = random.Random(seed)
+    stats: dict[str, ScenarioStats] = {name: ScenarioStats(name=name) for name in names}
+    async with _client(url, db_url, concurrency) as client:
+        sample: Sample = await _sample(client)
+
+        async def send(arrival: float) -> None:
+            name: str = rng.choices(names, weights=[weights[n] for n in names])[0]
+            try:
+                ok: bool = await SCENARIOS[name](client, sample, rng)
+            except httpx.HTTPError:
+                ok = False
+            stats[name].latencies.append((time.perf_counter() - arrival) * 1000)
+            stats[name].errors += not ok
+
+        start: float = time.perf_counter()
+        if rate is None:
+            await _closed_loop(send, start + duration, concurrency)
+        else:
+            await _open_loop(send, start + duration, concurrency, rate, rng)
+        elapsed: float = time.perf_counter() - start
+
+    report: dict[str, Any] = {
+        "url": url,
+        "duration": elapsed,
+        "concurrency": concurrency,
+        "rate": rate,
+        "mix": weights,
+        "total": ScenarioStats(
+            name="total",
+            latencies=[lat for stat in stats.values() for lat in stat.latencies],
+            errors=sum(stat.errors for stat in stats.values()),
+        ).summary(elapsed),
+        "scenarios": [stat.summary(elapsed) for stat in stats.values()],
+    }
+    _print(report)
+    if output is not None:
+        output.write_text(json.dumps(report, indent=2))
+    return report
+
+
+@asynccontextmanager
+async def _client(
+    url: str | None, db_url: str, concurrency: int
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Create the client of the API, starting the app in-process if no URL is
+    given.
+    """
+    limits: httpx.Limits = httpx.Limits(max_connections=concurrency)
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, limits=limits) as client:
+            yield client
+        return
+    app: MyApp = await runserver(db_url=db_url)
+    try:
+        async with httpx.AsyncClient(
+            app=app.api, base_url="http://loadtest", limits=limits
+        ) as client:
+            yield client
+    finally:
+        await app.db.close()
+
+
+async def _sample(client: httpx.AsyncClient) -> Sample:
+    """
+    Fetch the keys of the first standards and files of the API.
+    """
+    standards = await client.get("/standards", params={"limit": SAMPLE_SIZE})
+    files = await client.get("/files", params={"limit": SAMPLE_SIZE})
+    standards.raise_for_status()
+    files.raise_for_status()
+    sample: Sample = Sample(
+        numdos=[standard["numdos"] for standard in standards.json()],
+        files=[(file["numdos"], file["numdosvl"]) for file in files.json()],
+    )
+    if not sample.numdos or not sample.files:
+        raise ValueError("Cannot load test an empty database")
+    return sample
+
+
+async def _closed_loop(
+    send: Callable[[float], Awaitable[None]], deadline: float, concurrency: int
+) -> None:
+    async def client() -> None:
+        while (now := time.perf_counter()) < deadline:
+            await send(now)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+
+
+async def _open_loop(
+    send: Callable[[float], Awaitable[None]],
+    deadline: float,
+    concurrency: int,
+    rate: float,
+    rng: random.Random,
+) -> None:
+    in_flight: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+    tasks: set[asyncio.Task] = set()
+
+    async def arrive(arrival: float) -> None:
+        async with in_flight:
+            await send(arrival)
+
+    arrival: float = time.perf_counter()
+    while arrival < deadline:
+        await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+        task: asyncio.Task = asyncio.create_task(arrive(arrival))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        arrival += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+
+
+def _print(report: dict[str, Any]) -> None:
+    console: Console = Console()
+    table: Table = Table(
+        title=f"{report['total']['requests']} requests in {report['duration']:.1f}s"
+    )
+    for column in (
+        "scenario",
+        "requests",
+        "req/s",
+        "errors",
+        "p50",
+        "p90",
+        "p99",
+        "max",
+    ):
+        table.add_column(
+            column, justify="left" if column == "scenario" else "right", no_wrap=True
+        )
+    for summary in (*report["scenarios"], report["total"]):
+        table.add_row(
+            summary["name"],
+            str(summary["requests"]),
+            f"{summary['throughput']:.1f}",
+            f"{summary['errors']} ({summary['error_rate']:.1%})",
+            *(
+                f"{summary[key]:.1f} ms" if summary[key] is not None else "-"
+                for key in ("p50", "p90", "p99", "max")
+            ),
+        )
+    console.print(table)
+    histogram: dict[str, int] = report["total"]["histogram"]
+    widest: int = max(histogram.values()) or 1
+    for bucket, count in histogram.items():
+        bar: str = "█" * (40 * count // widest)
+        console.print(f"{'<= ' + bucket[3:] + ' ms':>12} {count:>8} {bar}")
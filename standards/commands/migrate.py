@@ -0,0 +1,46 @@
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from ..db.migrations import Migration, pending_migrations, schema_version, upgrade
+
+
+__all__: list[str] = ["migrate"]
+
+
+async def migrate(
+    db_url: str, target: int | None = None, dry_run: bool = False
+) -> list[Migration]:
+    """
+    Bring the schema of a database to a version, applying the pending
+    migrations in one transaction.
+
+    Args:
+        db_url: The URL of the database.
+        target: The version to bring the schema to, the latest one if None.
+        dry_run: Whether to only list the pending migrations.
+
+    Returns:
+        The applied (or pending, for a dry run) migrations.
+
+    Raises:
+        ValueError: If the target version is unknown or older than the version
+            of the schema.
+    """
+    engine: AsyncEngine = create_async_engine(db_url)
+    try:
+        async with engine.begin() as conn:
+            current: int = await conn.run_sync(schema_version)
+            migrations: list[Migration] = await conn.run_sync(
+                pending_migrations if dry_run else upgrade, target
+            )
+    finally:
+        await engine.dispose()
+    for migration in migrations:
+        print(
+            f"{'Pending' if dry_run else 'Applied'} "
+            f"{migration.version}: {migration.description}"
+        )
+    version: int = migrations[-1].version if migrations else current
+    if dry_run:
+        print(f"Schema version {current}, {len(migrations)} pending migrations.")
+    else:
+        print(f"Schema version {current} -> {version}.")
+    return migrations
@@ -2,71 +2,215 @@
 MAINLY DEVELOPED BY CHATGPT (WHILE TESTING THE TOOL)
 """
 
+import asyncio
+import multiprocessing
 import random
-from random import randint
-from faker import Faker
-from rich.progress import track
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import (
-    async_sessionmaker,
-    create_async_engine,
-    AsyncEngine,
-    AsyncSession,
-)
-from .._private.types import AsyncSessionMaker
-from ..db.models import Base, File, FileFormat, FileLanguage, Standard
-
-__all__: list[str] = ["random_populate"]
+import string
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, AsyncIterator
+from faker.providers.file import Provider as FileProvider
+from faker.providers.lorem.en_US import Provider as LoremProvider
+from rich.progress import Progress
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from .._private.enum import FileFormat, FileLanguage
+from ..db import DEFAULT_IN_CHUNK_SIZE
+from ..db.migrations import upgrade
+from ..db.models import File, Standard
+
+__all__: list[str] = ["DEFAULT_BATCH_SIZE", "random_populate"]
+
+
+DEFAULT_BATCH_SIZE: int = 10_000
+
+# The numdos are two uppercase letters followed by a number (1 to 999999)
+_NUMBERS: int = 999_999
+_KEYSPACE: int = len(string.ascii_uppercase) ** 2 * _NUMBERS
+
+_WORDS: list[str] = list(LoremProvider.word_list)
+_EXTENSIONS: list[str] = [
+    extension
+    for extensions in FileProvider.file_extensions.values()
+    for extension in extensions
+]
+_FORMATS: list[FileFormat] = list(FileFormat)
+_LANGUAGES: list[FileLanguage] = list(FileLanguage)
+
+# A batch generation task: its seed, its range of the keyspace and its size
+_Task = tuple[str, int, int, int]
+_Batch = tuple[list[dict[str, Any]], list[dict[str, Any]]]
+
+
+def _numdos(key: int) -> str:
+    prefix, number = divmod(key, _NUMBERS)
+    first, second = divmod(prefix, len(string.ascii_uppercase))
+    return (
+        string.ascii_uppercase[first] + string.ascii_uppercase[second] + str(number + 1)
+    )
+
+
+def _tasks(amount: int, batch_size: int, seed: int) -> list[_Task]:
+    """
+    Split the generation into batches, each drawing its numdos from its own
+    range of the keyspace (so that batches never collide) with its own seed (so
+    that the dataset does not depend on the number of workers).
+    """
+    sizes: list[int] = [
+        min(batch_size, amount - start) for start in range(0, amount, batch_size)
+    ]
+    step: int = _KEYSPACE // max(len(sizes), 1)
+    return [
+        (f"{seed}:{index}", index * step, (index + 1) * step, size)
+        for index, size in enumerate(sizes)
+    ]
+
+
+def _generate_batch(seed: str, start: int, stop: int, size: int) -> _Batch:
+    """
+    Generate a batch of distinct standards, from a range of the keyspace, along
+    with their files.
+
+    The values are drawn a whole column at a time, from word and extension
+    pools, rather than row by row.
+
+    Returns:
+        The rows of the standards and of the files.
+    """
+    rng: random.Random = random.Random(seed)
+    numdos: list[str] = [_numdos(key) for key in rng.sample(range(start, stop), size)]
+    owners: list[str] = [
+        key
+        for key, count in zip(numdos, rng.choices(range(1, 6), k=size))
+        for _ in range(count)
+    ]
+    total: int = len(owners)
+    return [{"numdos": key} for key in numdos], [
+        {
+            "name": f"{word}.{extension}",
+            "numdosvl": key[0] + ("E" if revised else key[1]) + key[2:],
+            "numdos": key,
+            "format": file_format,
+            "language": language,
+        }
+        for key, word, extension, revised, file_format, language in zip(
+            owners,
+            rng.choices(_WORDS, k=total),
+            rng.choices(_EXTENSIONS, k=total),
+            rng.choices((False, True), k=total),
+            rng.choices(_FORMATS, k=total),
+            rng.choices(_LANGUAGES, k=total),
+        )
+    ]
+
+
+async def _generated_batches(tasks: list[_Task], workers: int) -> AsyncIterator[_Batch]:
+    """
+    Generate the batches, in order, in a pool of worker processes (or in the
+    current process for a single worker), keeping only a few batches ahead of
+    the consumer.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield _generate_batch(*task)
+        return
+    # Spawn the workers rather than forking this process and its threads
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        pending: deque[Future] = deque()
+        for task in tasks:
+            pending.append(executor.submit(_generate_batch, *task))
+            if len(pending) >= 2 * workers:
+                yield await asyncio.wrap_future(pending.popleft())
+        while pending:
+            yield await asyncio.wrap_future(pending.popleft())
+
+
+async def _existing_numdos(conn: AsyncConnection, numdos: list[str]) -> set[str]:
+    existing: set[str] = set()
+    for start in range(0, len(numdos), DEFAULT_IN_CHUNK_SIZE):
+        chunk: list[str] = numdos[start : start + DEFAULT_IN_CHUNK_SIZE]
+        result = await conn.execute(
+            select(Standard.numdos).where(Standard.numdos.in_(chunk))
+        )
+        existing.update(result.scalars().all())
+    return existing
+
+
+async def _insert_batch(engine: AsyncEngine, batch: _Batch) -> tuple[int, int]:
+    """
+    Insert a batch of standards along with their files with executemany
+    INSERTs, in one transaction.
+
+    Standards whose numdos is already in the database are skipped, along with
+    their files.
+
+    Returns:
+        The number of inserted standards and files.
+    """
+    standards, files = batch
+    async with engine.begin() as conn:
+        existing: set[str] = await _existing_numdos(
+            conn, [standard["numdos"] for standard in standards]
+        )
+        if existing:
+            standards = [row for row in standards if row["numdos"] not in existing]
+            files = [row for row in files if row["numdos"] not in existing]
+        if standards:
+            await conn.execute(insert(Standard), standards)
+            await conn.execute(insert(File), files)
+    return len(standards), len(files)
 
 
 async def _random_populate(
-    async_session: AsyncSessionMaker, amount: int, fake: Faker
+    engine: AsyncEngine, amount: int, batch_size: int, seed: int, workers: int
 ) -> None:
-    async with async_session() as session:
-        inserted: int = 0
-        for _ in track(range(amount), description="Inserting..."):
-            try:
-                standard = Standard(
-                    numdos=fake.random_letter().upper()
-                    + fake.random_letter().upper()
-                    + str(random.randint(1, 999999))
-                )
-                session.add(standard)
-                for _ in range(randint(1, 5)):
-                    try:
-                        file = File(
-                            name=fake.file_name(),
-                            numdosvl=standard.numdos[0]
-                            + random.choice([standard.numdos[1], "E"])
-                            + standard.numdos[2:],
-                            numdos=standard.numdos,
-                            format=random.choice(list(FileFormat)),
-                            language=random.choice(list(FileLanguage)),
-                        )
-                        standard.files.append(file)
-                    except:
-                        continue
-                inserted += 1
-                await session.flush()  # Flush to generate primary key IDs
-            except:
-                continue
-
-        await session.commit()
+    inserted: int = 0
+    inserted_files: int = 0
+    tasks: list[_Task] = _tasks(amount, batch_size, seed)
+    start: float = time.perf_counter()
+    with Progress() as progress:
+        task_id = progress.add_task("Inserting...", total=len(tasks))
+        # The workers only generate the rows, this process is the single writer
+        async for batch in _generated_batches(tasks, workers):
+            standards, files = await _insert_batch(engine, batch)
+            inserted += standards
+            inserted_files += files
+            progress.advance(task_id)
+    elapsed: float = time.perf_counter() - start
+
+    async with engine.connect() as conn:
         count_in_db: int = (
-            await session.execute(select(func.count()).select_from(Standard))
+            await conn.execute(select(func.count()).select_from(Standard))
         ).scalar() or 0
-        print(
-            f"{inserted} inserted Standards ({inserted / count_in_db * 100:.2f}% new)."
-        )
+    print(
+        f"{inserted} inserted Standards and {inserted_files} inserted Files "
+        f"in {elapsed:.2f}s ({(inserted + inserted_files) / elapsed:.0f} rows/s, "
+        f"{inserted / max(count_in_db, 1) * 100:.2f}% new)."
+    )
+
 
+async def random_populate(
+    db_url: str,
+    amount: int = 10,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    seed: int | None = None,
+    workers: int = 1,
+) -> None:
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size} (must be at least 1)")
+    if workers < 1:
+        raise ValueError(f"Invalid number of workers: {workers} (must be at least 1)")
 
-async def random_populate(db_url: str, amount: int = 10) -> None:
-    # Create the async engine and sessionmaker
+    # Create the async engine
     engine: AsyncEngine = create_async_engine(db_url)
-    async_session: AsyncSessionMaker = async_sessionmaker(engine, class_=AsyncSession)
 
-    # Create an instance of Faker
-    fake = Faker()
+    # Draw a seed if none is given, the dataset is reproducible for a given seed
+    if seed is None:
+        seed = random.randrange(2**32)
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    await _random_populate(async_session, amount, fake)
+        await conn.run_sync(upgrade)
+    await _random_populate(engine, amount, batch_size, seed, workers)
+    await engine.dispose()
@@ -0,0 +1,32 @@
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from ..db.stats import FileStats, file_counts, rebuild_file_counts
+
+
+__all__: list[str] = ["rebuild_stats"]
+
+
+async def rebuild_stats(db_url: str) -> FileStats:
+    """
+    Count the files of a database again, replacing the content of its
+    file_counts table (e.g. after it has been written to without its triggers).
+
+    Args:
+        db_url: The URL of the database.
+
+    Returns:
+        The statistics of the files.
+    """
+    engine: AsyncEngine = create_async_engine(db_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(rebuild_file_counts)
+            stats: FileStats = FileStats.from_counts(
+                (await conn.execute(file_counts())).tuples().all()
+            )
+    finally:
+        await engine.dispose()
+    print(
+        f"{stats.files} files counted by {len(stats.formats)} formats, "
+        f"{len(stats.languages)} languages and {len(stats.prefixes)} prefixes."
+    )
+    return stats
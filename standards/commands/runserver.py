@@ -1,15 +1,34 @@
 import strawberry
 from fastapi import FastAPI
 from ..app import MyApp
-from ..db import MyDb
+from ..db import LRUCache, MyDb, QueryAccounting, Replicas, SingleFlight
 from ..graphql import get_schema
 
 
 __all__: list[str] = ["runserver"]
 
 
-async def runserver(db_url: str) -> MyApp:
+async def runserver(
+    db_url: str,
+    cache_size: int = 0,
+    cache_ttl: float = 60,
+    single_flight: bool = False,
+    debug_queries: bool = False,
+    query_budget: int | None = 50,
+    max_repeats: int | None = 10,
+    replica_urls: list[str] | None = None,
+) -> MyApp:
     api: FastAPI = FastAPI()
-    db: MyDb = await MyDb.start(db_url=db_url)
+    db: MyDb = await MyDb.start(
+        db_url=db_url,
+        cache=LRUCache(maxsize=cache_size, ttl=cache_ttl) if cache_size else None,
+        single_flight=SingleFlight() if single_flight else None,
+        accounting=(
+            QueryAccounting(max_queries=query_budget, max_repeats=max_repeats)
+            if debug_queries
+            else None
+        ),
+        replicas=Replicas(urls=replica_urls) if replica_urls else None,
+    )
     schema: strawberry.Schema = get_schema()
     return await MyApp.start(api, db, schema)
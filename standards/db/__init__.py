@@ -1,20 +1,101 @@
 from __future__ import annotations
-from typing import Self
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Self,
+    Sequence,
+    TypeVar,
+)
 import pydantic
-from sqlalchemy import Result, select
+from sqlalchemy import ColumnElement, Result, event, select, tuple_
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.pool import Pool, QueuePool
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
+    AsyncScalarResult,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import selectinload
-from .models import File, Standard
+from sqlalchemy.orm import Session, selectinload, with_expression
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.orm.interfaces import ORMOption
+from .accounting import QueryAccounting, QueryStats
+from .cache import LRUCache
+from .models import File, Standard, TableVersion
+from .replicas import Replicas, RoutingSession
+from .search import FILES_SEARCH, decode_rank_cursor, match_expression
+from .stats import FileStats, count_files, file_counts
+from .pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Page,
+    decode_cursor,
+    encode_cursor,
+)
+from .singleflight import SingleFlight
+from .._private.enum import FileFormat, FileLanguage
 from .._private.pydantic import Config as _PydanticConfig
 from .._private.types import AsyncSessionMaker
 
 
-__all__: list[str] = ["MyDb"]
+__all__: list[str] = [
+    "DEFAULT_IN_CHUNK_SIZE",
+    "DEFAULT_YIELD_PER",
+    "FileStats",
+    "LRUCache",
+    "MyDb",
+    "Page",
+    "PlannedOptions",
+    "QueryAccounting",
+    "QueryStats",
+    "Replicas",
+    "SingleFlight",
+]
+
+
+DEFAULT_YIELD_PER: int = 1000
+DEFAULT_IN_CHUNK_SIZE: int = 500
+
+T = TypeVar("T")
+
+
+class _RequestSession:
+    """
+    Represents the session of a request, along with the lock taken by the
+    operation using it.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session: AsyncSession = session
+        self.lock: asyncio.Lock = asyncio.Lock()
+
+
+class PlannedOptions(list[ORMOption]):
+    """
+    Represents loader options planned from the names of the columns and
+    relationships to load, which identify them (e.g. for the single-flight
+    calls).
+
+    Attributes:
+        key: The names of the columns and relationships to load.
+    """
+
+    def __init__(self, options: Iterable[ORMOption], key: Hashable) -> None:
+        super().__init__(options)
+        self.key: Hashable = key
+
+
+_STANDARD_OPTIONS: tuple[ORMOption, ...] = (selectinload(Standard.files),)
+_FILE_OPTIONS: tuple[ORMOption, ...] = (selectinload(File.standard),)
 
 
 class MyDb(pydantic.BaseModel):
@@ -26,30 +107,87 @@ class MyDb(pydantic.BaseModel):
         engine: The async engine for database operations.
         sessionmaker: The async session maker for creating database sessions.
         expire_on_commit: Whether to expire objects on commit.
+        pool_size: The number of connections kept open in the pool.
+        max_overflow: The number of connections allowed beyond pool_size.
+        pool_recycle: The number of seconds after which a connection is recycled.
+        pool_pre_ping: Whether to test connections for liveness upon checkout.
+        pool_timeout: The number of seconds to wait for a connection to be available.
+        in_chunk_size: The maximum number of keys given to one IN query by the
+            bulk lookups.
+        cache: The cache of the get_standard and get_file lookups, None to
+            disable caching. Its entries are invalidated whenever a standard or
+            a file of the same numdos is flushed through this instance.
+        single_flight: The group sharing one query between identical concurrent
+            get_standard, get_file, get_standards and get_files calls, None to
+            disable coalescing.
+        accounting: The accounting of the SQL statements of every request (a
+            diagnostic mode catching N+1 queries), None to disable it.
+        replicas: The read replicas the reads are balanced across, the primary
+            database (db_url) getting the writes and the reads when no replica
+            is healthy, None to read from the primary database only.
+
+    Pool settings left to None fall back to SQLAlchemy's defaults, which keeps
+    pools that do not support them (e.g. in-memory SQLite) working.
     """
 
     db_url: str
     engine: AsyncEngine | None = None
     sessionmaker: AsyncSessionMaker | None = None
     expire_on_commit: bool = False
+    pool_size: int | None = None
+    max_overflow: int | None = None
+    pool_recycle: int | None = None
+    pool_pre_ping: bool = False
+    pool_timeout: float | None = None
+    in_chunk_size: int = DEFAULT_IN_CHUNK_SIZE
+    cache: LRUCache | None = None
+    single_flight: SingleFlight | None = None
+    accounting: QueryAccounting | None = None
+    replicas: Replicas | None = None
+
+    _current_session: ContextVar[_RequestSession | None] = pydantic.PrivateAttr(
+        default_factory=lambda: ContextVar("current_session", default=None)
+    )
 
     Config = _PydanticConfig
 
     @classmethod
-    async def start(cls, db_url: str) -> MyDb:
+    async def start(cls, db_url: str, **options: Any) -> MyDb:
         """
         Start the database connection and return a MyDb instance.
 
         Args:
             db_url: The URL of the database.
+            **options: Other attributes of the instance, such as the connection
+                pool settings (pool_size, max_overflow, pool_recycle,
+                pool_pre_ping, pool_timeout) or the cache.
 
         Returns:
             The initialized MyDb instance.
         """
-        self: MyDb = cls(db_url=db_url)
+        self: MyDb = cls(db_url=db_url, **options)
         await self.connect()
         return self
 
+    @property
+    def engine_options(self) -> dict[str, Any]:
+        """
+        The keyword arguments given to create_async_engine.
+
+        Returns:
+            A dictionary containing the pool settings that have been set.
+        """
+        options: dict[str, Any] = {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_recycle": self.pool_recycle,
+            "pool_timeout": self.pool_timeout,
+        }
+        options = {key: value for key, value in options.items() if value is not None}
+        if self.pool_pre_ping:
+            options["pool_pre_ping"] = True
+        return options
+
     async def connect(self) -> Self:
         """
         Connect to the database by creating the async engine and session maker.
@@ -57,12 +195,35 @@ class MyDb(pydantic.BaseModel):
         Returns:
             The updated MyDb instance.
         """
-        self.engine: AsyncEngine = create_async_engine(self.db_url)
+        self.engine: AsyncEngine = create_async_engine(
+            self.db_url, **self.engine_options
+        )
         self.sessionmaker: AsyncSessionMaker = async_sessionmaker(
-            self.engine, expire_on_commit=False, class_=AsyncSession
+            self.engine,
+            expire_on_commit=self.expire_on_commit,
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            info={"db": self},
         )
+        if self.replicas is not None:
+            self.replicas.connect(**self.engine_options)
+        if self.accounting is not None:
+            for engine in self.engines:
+                self.accounting.instrument(engine)
         return self
 
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        """
+        The engines of the primary database and of the read replicas.
+
+        Returns:
+            The engines, the primary one first, empty if not connected.
+        """
+        if self.engine is None:
+            return []
+        return [self.engine, *(self.replicas.engines if self.replicas else [])]
+
     async def get_session(self) -> AsyncSession:
         """
         Get an async session from the session maker.
@@ -75,68 +236,720 @@ class MyDb(pydantic.BaseModel):
         assert self.sessionmaker is not None
         return self.sessionmaker()
 
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Provide a session which is always released once done with.
+
+        If a request-scoped session is active (see request_session) and is not
+        being used by a concurrent operation of the request (e.g. another root
+        field of a GraphQL query, or a DataLoader batch), it is reused and left
+        open for the rest of the request. Otherwise a session of its own is
+        opened, as a session does not support concurrent operations.
+
+        Yields:
+            The async session.
+        """
+        current: _RequestSession | None = self._current_session.get()
+        if current is not None and not current.lock.locked():
+            async with current.lock:
+                yield current.session
+            return
+        async with await self.get_session() as session:
+            yield session
+
+    async def request_session(self) -> AsyncIterator[AsyncSession]:
+        """
+        FastAPI dependency providing one session per HTTP or GraphQL request.
+
+        The MyDb calls made while handling the request share this session, one
+        at a time (the concurrent ones get their own), and it is closed (and its
+        connection returned to the pool) once the request is over.
+
+        Yields:
+            The async session bound to the current request.
+        """
+        async with await self.get_session() as session:
+            token: Token = self._current_session.set(_RequestSession(session))
+            try:
+                yield session
+            finally:
+                self._current_session.reset(token)
+
+    def pool_stats(self) -> dict[str, int]:
+        """
+        Get the statistics of the connection pool.
+
+        Returns:
+            A dictionary containing the pool size, the checked in and checked out
+            connections and the current overflow, or an empty dictionary if the
+            pool does not keep track of those (e.g. in-memory SQLite).
+        """
+        pool: Pool | None = self.engine.pool if self.engine else None
+        if not isinstance(pool, QueuePool):
+            return {}
+        return {
+            "size": pool.size(),
+            "checkedin": pool.checkedin(),
+            "checkedout": pool.checkedout(),
+            "overflow": pool.overflow(),
+        }
+
     async def close(self) -> None:
         """
-        Close the database connection.
+        Close the database connection, releasing every pooled connection.
+        """
+        if self.engine is not None:
+            await self.engine.dispose()
+        if self.replicas is not None:
+            await self.replicas.close()
+        self.engine = None
+        self.sessionmaker = None
+
+    async def _in_own_session(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Make a call in a session of its own rather than in the request session,
+        e.g. to fill the cache: the instances it loads are detached once its
+        session is closed, so that they outlive the request, and a rollback or
+        the close of the request session does not expire them.
+        """
+        token: Token = self._current_session.set(None)
+        try:
+            return await call()
+        finally:
+            self._current_session.reset(token)
+
+    async def _coalesce(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Make a call through the single-flight group, if any, so that identical
+        concurrent calls share one query.
+
+        The shared query runs in its own task and session, as it may outlive the
+        request which started it.
         """
-        ...
+        if self.single_flight is None:
+            return await call()
 
-    async def get_standards(self) -> list[Standard]:
+        async def call_in_own_session() -> T:
+            self._current_session.set(None)
+            return await call()
+
+        return await self.single_flight.do(key, call_in_own_session)
+
+    async def get_table_versions(self, names: Sequence[str]) -> tuple[int, ...] | None:
         """
-        Get a list of all standards from the database.
+        Get the versions of tables, bumped on every change of their rows.
+
+        Args:
+            names: The names of the tables.
+
+        Returns:
+            The versions of the tables, in the same order as names, or None if
+            the database does not keep track of them (e.g. created before the
+            table_versions table was introduced).
+        """
+        async with self.session() as session:
+            try:
+                result: Result[tuple[str, int]] = await session.execute(
+                    select(TableVersion.name, TableVersion.version).where(
+                        TableVersion.name.in_(names)
+                    )
+                )
+            except (OperationalError, ProgrammingError):
+                await session.rollback()
+                return None
+            versions: dict[str, int] = dict(result.tuples().all())
+        if len(versions) != len(set(names)):
+            return None
+        return tuple(versions[name] for name in names)
+
+    async def get_standards(
+        self,
+        numdos_prefix: str | None = None,
+        options: Sequence[ORMOption] | None = None,
+    ) -> list[Standard]:
+        """
+        Get a list of all standards from the database, or of the ones whose
+        numdos starts with a prefix.
+
+        Args:
+            numdos_prefix: The prefix the numdos of the standards must start
+                with, None for any.
+            options: The loader options of the query, None to load the files
+                of the standards along with them.
 
         Returns:
             A list of Standard instances.
         """
-        session: AsyncSession = await self.get_session()
-        result: Result[tuple[Standard, ...]] = await session.execute(
-            select(Standard).options(selectinload(Standard.files))
+        return await self._coalesce(
+            ("standards", numdos_prefix or None, _options_key(options)),
+            lambda: self._get_standards(numdos_prefix, options),
         )
-        return [std for (std,) in result.all()]
 
-    async def get_files(self) -> list[File]:
+    async def _get_standards(
+        self, numdos_prefix: str | None, options: Sequence[ORMOption] | None
+    ) -> list[Standard]:
+        async with self.session() as session:
+            result: Result[tuple[Standard, ...]] = await session.execute(
+                select(Standard)
+                .options(*_or_default(options, _STANDARD_OPTIONS))
+                .where(*_starts_with(Standard.numdos, numdos_prefix))
+            )
+            return [std for (std,) in result.all()]
+
+    async def get_files(
+        self,
+        formats: Sequence[FileFormat] | None = None,
+        languages: Sequence[FileLanguage] | None = None,
+        numdos_prefix: str | None = None,
+        options: Sequence[ORMOption] | None = None,
+    ) -> list[File]:
         """
-        Get a list of all files from the database.
+        Get a list of all files from the database, or of the ones matching
+        filters (through the indexes of the files).
+
+        Args:
+            formats: The formats the files must have one of, None for any.
+            languages: The languages the files must have one of, None for any.
+            numdos_prefix: The prefix the numdos of the files must start with,
+                None for any.
+            options: The loader options of the query, None to load the standard
+                of the files along with them.
 
         Returns:
             A list of File instances.
         """
-        session: AsyncSession = await self.get_session()
-        result: Result[tuple[File, ...]] = await session.execute(
-            select(File).options(selectinload(File.standard))
+        return await self._coalesce(
+            (
+                "files",
+                frozenset(formats or ()),
+                frozenset(languages or ()),
+                numdos_prefix or None,
+                _options_key(options),
+            ),
+            lambda: self._get_files(
+                _file_filters(formats, languages, numdos_prefix), options
+            ),
         )
-        return [file for (file,) in result.all()]
 
-    async def get_standard(self, numdos: str) -> Standard | None:
+    async def _get_files(
+        self,
+        filters: list[ColumnElement[bool]],
+        options: Sequence[ORMOption] | None,
+    ) -> list[File]:
+        async with self.session() as session:
+            result: Result[tuple[File, ...]] = await session.execute(
+                select(File)
+                .options(*_or_default(options, _FILE_OPTIONS))
+                .where(*filters)
+            )
+            return [file for (file,) in result.all()]
+
+    async def stream_standards(
+        self, yield_per: int = DEFAULT_YIELD_PER
+    ) -> AsyncIterator[Standard]:
         """
-        Get a standard from the database by numdos.
+        Stream all standards from the database, ordered by numdos, through a
+        server-side cursor.
 
         Args:
-            numdos: The numdos of the standard.
+            yield_per: The number of standards fetched (and their files loaded)
+                at once.
+
+        Yields:
+            The Standard instances, one at a time.
+        """
+        async with self.session() as session:
+            standards: AsyncScalarResult[Standard] = await session.stream_scalars(
+                select(Standard)
+                .options(*_STANDARD_OPTIONS)
+                .order_by(Standard.numdos)
+                .execution_options(yield_per=yield_per)
+            )
+            async for standard in standards:
+                yield standard
+
+    async def stream_files(
+        self, yield_per: int = DEFAULT_YIELD_PER
+    ) -> AsyncIterator[File]:
+        """
+        Stream all files from the database, ordered by id, through a server-side
+        cursor.
+
+        Args:
+            yield_per: The number of files fetched (and their standards loaded)
+                at once.
+
+        Yields:
+            The File instances, one at a time.
+        """
+        async with self.session() as session:
+            files: AsyncScalarResult[File] = await session.stream_scalars(
+                select(File)
+                .options(*_FILE_OPTIONS)
+                .order_by(File.id)
+                .execution_options(yield_per=yield_per)
+            )
+            async for file in files:
+                yield file
+
+    async def get_standards_page(
+        self,
+        numdos_prefix: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        options: Sequence[ORMOption] | None = None,
+    ) -> Page[Standard]:
+        """
+        Get a page of standards from the database, ordered by numdos.
+
+        Args:
+            numdos_prefix: The prefix the numdos of the standards must start
+                with, None for any.
+            limit: The maximum number of standards in the page (capped to
+                MAX_PAGE_SIZE).
+            cursor: The cursor returned with the previous page, None to get the
+                first one.
+            options: The loader options of the query, None to load the files
+                of the standards along with them.
 
         Returns:
-            The Standard instance if found, None otherwise.
+            The page of Standard instances.
+
+        Raises:
+            ValueError: If the limit or the cursor is invalid.
         """
-        session: AsyncSession = await self.get_session()
-        result: Result[tuple[Standard, ...]] = await session.execute(
+        limit = self._check_limit(limit)
+        statement = (
             select(Standard)
-            .options(selectinload(Standard.files))
-            .where(Standard.numdos == numdos)
+            .options(*_or_default(options, _STANDARD_OPTIONS))
+            .where(*_starts_with(Standard.numdos, numdos_prefix))
+            .order_by(Standard.numdos)
+            .limit(limit + 1)
         )
-        try:
-            return result.scalars().first()
-        except AttributeError:
-            return None
+        if cursor is not None:
+            statement = statement.where(Standard.numdos > decode_cursor(cursor, str))
+        async with self.session() as session:
+            standards: list[Standard] = list(
+                (await session.execute(statement)).scalars().all()
+            )
+        return self._paginate(standards, limit, lambda std: std.numdos)
+
+    async def get_files_page(
+        self,
+        formats: Sequence[FileFormat] | None = None,
+        languages: Sequence[FileLanguage] | None = None,
+        numdos_prefix: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        options: Sequence[ORMOption] | None = None,
+    ) -> Page[File]:
+        """
+        Get a page of files from the database, ordered by id.
+
+        Args:
+            formats: The formats the files must have one of, None for any.
+            languages: The languages the files must have one of, None for any.
+            numdos_prefix: The prefix the numdos of the files must start with,
+                None for any.
+            limit: The maximum number of files in the page (capped to
+                MAX_PAGE_SIZE).
+            cursor: The cursor returned with the previous page, None to get the
+                first one.
+            options: The loader options of the query, None to load the standard
+                of the files along with them.
 
-    async def get_file(self, numdos: str = "", numdosvl: str = "") -> File | None:
-        session: AsyncSession = await self.get_session()
-        result: Result[tuple[File, ...]] = await session.execute(
+        Returns:
+            The page of File instances.
+
+        Raises:
+            ValueError: If the limit or the cursor is invalid.
+        """
+        limit = self._check_limit(limit)
+        statement = (
             select(File)
-            .options(selectinload(File.standard))
-            .where(File.numdos == numdos)
-            .where(File.numdosvl == numdosvl)
+            .options(*_or_default(options, _FILE_OPTIONS))
+            .where(*_file_filters(formats, languages, numdos_prefix))
+            .order_by(File.id)
+            .limit(limit + 1)
         )
-        try:
-            return result.scalars().first()
-        except AttributeError:
-            return None
+        if cursor is not None:
+            statement = statement.where(File.id > decode_cursor(cursor, int))
+        async with self.session() as session:
+            files: list[File] = list((await session.execute(statement)).scalars().all())
+        return self._paginate(files, limit, lambda file: file.id)
+
+    async def search(
+        self,
+        query: str,
+        formats: Sequence[FileFormat] | None = None,
+        languages: Sequence[FileLanguage] | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        options: Sequence[ORMOption] | None = None,
+    ) -> Page[File]:
+        """
+        Search the files by the words of their name and of their numdos and
+        numdosvl, through the full-text index of the files (SQLite only), the
+        best matches (BM25) first. A standard is found through its files, those
+        without files not being indexed (get_standard looks them up by numdos).
+
+        The ranked results are paged by keyset on their rank and id, which are
+        loaded into the search_rank and id of the files.
+
+        Args:
+            query: The search query, whose terms must all match: whole words, or
+                prefixes for the terms ending with * (e.g. "NF12* rapport"),
+                see match_expression.
+            formats: The formats the files must have one of, None for any.
+            languages: The languages the files must have one of, None for any.
+            limit: The maximum number of files in the page (capped to
+                MAX_PAGE_SIZE).
+            cursor: The cursor returned with the previous page, None to get the
+                first one.
+            options: The loader options of the query, None to load the standard
+                of the files along with them.
+
+        Returns:
+            The page of File instances.
+
+        Raises:
+            ValueError: If the query, the limit or the cursor is invalid.
+            NotImplementedError: If the database is not a SQLite one.
+        """
+        if self.engine is not None and self.engine.dialect.name != "sqlite":
+            raise NotImplementedError("The search needs the FTS5 index of SQLite")
+        limit = self._check_limit(limit)
+        rank: ColumnElement = FILES_SEARCH.c.rank
+        statement = (
+            select(File)
+            .join(FILES_SEARCH, FILES_SEARCH.c.rowid == File.id)
+            .where(FILES_SEARCH.c.files_fts.match(match_expression(query)))
+            .where(*_file_filters(formats, languages, None))
+            .options(
+                with_expression(File.search_rank, rank),
+                *_or_default(options, _FILE_OPTIONS),
+            )
+            # The files already in the session get their rank in this search
+            .execution_options(populate_existing=True)
+            .order_by(rank, File.id)
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            after_rank, after_id = decode_rank_cursor(cursor)
+            statement = statement.where(tuple_(rank, File.id) > (after_rank, after_id))
+        async with self.session() as session:
+            files: list[File] = list((await session.execute(statement)).scalars().all())
+        return self._paginate(files, limit, lambda file: [file.search_rank, file.id])
+
+    async def get_stats(self) -> FileStats:
+        """
+        Get the numbers of files by format, language and prefix of the numdos
+        of their standard.
+
+        On SQLite, they are read from the file_counts table, kept up to date by
+        triggers, in a time depending on the number of values and not on the
+        number of files. On the other databases, the files are counted.
+
+        Returns:
+            The statistics of the files.
+        """
+        sqlite: bool = self.engine is None or self.engine.dialect.name == "sqlite"
+        async with self.session() as session:
+            result: Result[tuple[str, str, int]] = await session.execute(
+                file_counts() if sqlite else count_files()
+            )
+            return FileStats.from_counts(result.tuples().all())
+
+    @staticmethod
+    def _check_limit(limit: int) -> int:
+        if limit < 1:
+            raise ValueError(f"Invalid limit: {limit} (must be at least 1)")
+        return min(limit, MAX_PAGE_SIZE)
+
+    @staticmethod
+    def _paginate(items: list[Any], limit: int, key: Callable[[Any], Any]) -> Page:
+        if len(items) <= limit:
+            return Page(items=items)
+        items = items[:limit]
+        return Page(items=items, next_cursor=encode_cursor(key(items[-1])))
+
+    async def get_standard(
+        self, numdos: str, options: Sequence[ORMOption] | None = None
+    ) -> Standard | None:
+        """
+        Get a standard from the database by numdos, through the cache if any.
+
+        Args:
+            numdos: The numdos of the standard.
+            options: The loader options of the query, None to load the files
+                of the standard along with it. Ignored when a cache is set, the
+                cached standards being fully loaded.
+
+        Returns:
+            The Standard instance if found, None otherwise.
+        """
+        if self.cache is None:
+            return await self._coalesce(
+                ("standard", numdos, _options_key(options)),
+                lambda: self._get_standard(numdos, options),
+            )
+        return await self.cache.get_or_load(
+            ("standard", numdos),
+            numdos,
+            lambda: self._in_own_session(
+                lambda: self._coalesce(
+                    ("standard", numdos, None),
+                    lambda: self._get_standard(numdos, None),
+                )
+            ),
+        )
+
+    async def _get_standard(
+        self, numdos: str, options: Sequence[ORMOption] | None
+    ) -> Standard | None:
+        async with self.session() as session:
+            result: Result[tuple[Standard, ...]] = await session.execute(
+                select(Standard)
+                .options(*_or_default(options, _STANDARD_OPTIONS))
+                .where(Standard.numdos == numdos)
+            )
+            try:
+                return result.scalars().first()
+            except AttributeError:
+                return None
+
+    async def get_file(
+        self,
+        numdos: str = "",
+        numdosvl: str = "",
+        options: Sequence[ORMOption] | None = None,
+    ) -> File | None:
+        """
+        Get a file from the database by numdos and numdosvl, through the cache if
+        any.
+
+        Args:
+            numdos: The numdos of the file.
+            numdosvl: The numdosvl of the file.
+            options: The loader options of the query, None to load the standard
+                of the file along with it. Ignored when a cache is set, the
+                cached files being fully loaded.
+
+        Returns:
+            The File instance if found, None otherwise.
+        """
+        if self.cache is None:
+            return await self._coalesce(
+                ("file", numdos, numdosvl, _options_key(options)),
+                lambda: self._get_file(numdos, numdosvl, options),
+            )
+        return await self.cache.get_or_load(
+            ("file", numdos, numdosvl),
+            numdos,
+            lambda: self._in_own_session(
+                lambda: self._coalesce(
+                    ("file", numdos, numdosvl, None),
+                    lambda: self._get_file(numdos, numdosvl, None),
+                )
+            ),
+        )
+
+    async def _get_file(
+        self, numdos: str, numdosvl: str, options: Sequence[ORMOption] | None
+    ) -> File | None:
+        async with self.session() as session:
+            result: Result[tuple[File, ...]] = await session.execute(
+                select(File)
+                .options(*_or_default(options, _FILE_OPTIONS))
+                .where(File.numdos == numdos)
+                .where(File.numdosvl == numdosvl)
+            )
+            try:
+                return result.scalars().first()
+            except AttributeError:
+                return None
+
+    async def get_standards_by_numdos(
+        self, numdos: Sequence[str], options: Sequence[ORMOption] | None = None
+    ) -> list[Standard | None]:
+        """
+        Get many standards from the database by numdos, through chunked IN
+        queries.
+
+        Args:
+            numdos: The numdos of the standards.
+            options: The loader options of the query, None to load the files
+                of the standards along with them.
+
+        Returns:
+            The Standard instances, in the same order as numdos, with None for
+            the ones not found.
+        """
+        standards: dict[str, Standard] = {}
+        async with self.session() as session:
+            for chunk in _chunks(list(dict.fromkeys(numdos)), self.in_chunk_size):
+                result: Result[tuple[Standard, ...]] = await session.execute(
+                    select(Standard)
+                    .options(*_or_default(options, _STANDARD_OPTIONS))
+                    .where(Standard.numdos.in_(chunk))
+                )
+                standards.update((std.numdos, std) for std in result.scalars().all())
+        return [standards.get(key) for key in numdos]
+
+    async def get_files_by_numdos(
+        self, numdos: Sequence[str], options: Sequence[ORMOption] | None = None
+    ) -> list[list[File]]:
+        """
+        Get the files of many standards from the database, through chunked IN
+        queries.
+
+        Args:
+            numdos: The numdos of the standards.
+            options: The loader options of the query, None to load the standard
+                of the files along with them.
+
+        Returns:
+            The lists of File instances, in the same order as numdos.
+        """
+        files: dict[str, list[File]] = {}
+        async with self.session() as session:
+            for chunk in _chunks(list(dict.fromkeys(numdos)), self.in_chunk_size):
+                result: Result[tuple[File, ...]] = await session.execute(
+                    select(File)
+                    .options(*_or_default(options, _FILE_OPTIONS))
+                    .where(File.numdos.in_(chunk))
+                    .order_by(File.id)
+                )
+                for file in result.scalars().all():
+                    files.setdefault(file.numdos, []).append(file)
+        return [files.get(key, []) for key in numdos]
+
+    async def get_files_by_keys(
+        self,
+        keys: Sequence[tuple[str, str]],
+        options: Sequence[ORMOption] | None = None,
+    ) -> list[File | None]:
+        """
+        Get many files from the database by numdos and numdosvl, through chunked
+        IN queries.
+
+        Args:
+            keys: The (numdos, numdosvl) pairs of the files.
+            options: The loader options of the query, None to load the standard
+                of the files along with them.
+
+        Returns:
+            The File instances, in the same order as keys, with None for the ones
+            not found.
+        """
+        files: dict[tuple[str, str], File] = {}
+        async with self.session() as session:
+            for chunk in _chunks(list(dict.fromkeys(keys)), self.in_chunk_size):
+                result: Result[tuple[File, ...]] = await session.execute(
+                    select(File)
+                    .options(*_or_default(options, _FILE_OPTIONS))
+                    # The numdos IN lets SQLite search the (numdos, numdosvl)
+                    # index, which it does not for a row value IN (VALUES ...)
+                    .where(File.numdos.in_(sorted({numdos for numdos, _ in chunk})))
+                    .where(tuple_(File.numdos, File.numdosvl).in_(chunk))
+                    .order_by(File.id)
+                )
+                for file in result.scalars().all():
+                    files.setdefault((file.numdos, file.numdosvl), file)
+        return [files.get(key) for key in keys]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_invalidated(session: Session, flush_context: Any) -> None:
+    """
+    Collect the numdos of the standards and files flushed by a session of a
+    MyDb instance having a cache, to invalidate their cached entries once the
+    transaction is committed (before, a concurrent lookup could cache them again
+    from the data not committed yet).
+    """
+    db: MyDb | None = session.info.get("db")
+    if db is None or db.cache is None:
+        return
+    invalidated: set[str] = session.info.setdefault("invalidated", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, (Standard, File)):
+            invalidated.add(instance.numdos)
+            # The former numdos of a moved file, or of a renamed standard
+            invalidated.update(get_history(instance, "numdos").deleted or ())
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cache(session: Session) -> None:
+    """
+    Invalidate the cached entries of the standards and files committed by a
+    session of a MyDb instance having a cache.
+    """
+    db: MyDb | None = session.info.get("db")
+    invalidated: set[str] = session.info.pop("invalidated", set())
+    if db is None or db.cache is None:
+        return
+    for numdos in invalidated:
+        db.cache.invalidate(numdos)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidated(session: Session) -> None:
+    """
+    Discard the numdos collected for invalidation, the flushed changes having
+    been rolled back.
+    """
+    session.info.pop("invalidated", None)
+
+
+def _chunks(items: list[T], size: int) -> Iterator[list[T]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _file_filters(
+    formats: Sequence[FileFormat] | None,
+    languages: Sequence[FileLanguage] | None,
+    numdos_prefix: str | None,
+) -> list[ColumnElement[bool]]:
+    """
+    Build the WHERE clauses of the filters of a query on File, the empty or
+    None ones matching any file.
+    """
+    filters: list[ColumnElement[bool]] = []
+    if formats:
+        filters.append(File.format.in_(formats))
+    if languages:
+        filters.append(File.language.in_(languages))
+    filters.extend(_starts_with(File.numdos, numdos_prefix))
+    return filters
+
+
+def _starts_with(column: Any, prefix: str | None) -> list[ColumnElement[bool]]:
+    """
+    Build the WHERE clauses matching the values of a column starting with a
+    prefix, as a range which the index of the column is searched with (which it
+    is not for a LIKE, case insensitive on SQLite).
+    """
+    if not prefix:
+        return []
+    return [column >= prefix, column < prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+
+
+def _options_key(options: Sequence[ORMOption] | None) -> Hashable:
+    """
+    A hashable key identifying loader options, for the single-flight calls: the
+    names of the planned columns and relationships, or the identities of the
+    other options (shared by the calls passing the same options only).
+    """
+    if options is None:
+        return None
+    if isinstance(options, PlannedOptions):
+        return ("planned", options.key)
+    return tuple(id(option) for option in options)
+
+
+def _or_default(
+    options: Sequence[ORMOption] | None, default: Sequence[ORMOption]
+) -> Sequence[ORMOption]:
+    return default if options is None else options
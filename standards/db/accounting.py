@@ -0,0 +1,173 @@
+from __future__ import annotations
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+from weakref import WeakKeyDictionary, WeakSet
+import pydantic
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from .._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = ["QueryAccounting", "QueryStats", "shape_of"]
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_PARAMETERS: re.Pattern = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)|\?|%\(\w+\)s|\$\d+")
+_SPACES: re.Pattern = re.compile(r"\s+")
+
+
+class QueryStats(pydantic.BaseModel):
+    """
+    Represents the SQL statements executed while handling a request.
+
+    Attributes:
+        queries: The number of statements.
+        time: The total time spent executing them, in seconds.
+        shapes: The number of statements of every shape (the statement with
+            its parameters and IN lists collapsed).
+    """
+
+    queries: int = 0
+    time: float = 0.0
+    shapes: Counter[str] = pydantic.Field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """
+        Record an executed statement.
+
+        Args:
+            statement: The SQL statement.
+            elapsed: The time spent executing it, in seconds.
+        """
+        self.queries += 1
+        self.time += elapsed
+        self.shapes[shape_of(statement)] += 1
+
+
+class QueryAccounting(pydantic.BaseModel):
+    """
+    Represents the accounting of the SQL statements of every request, to catch
+    the ones making too many queries or the same query over and over (N+1).
+
+    Attributes:
+        max_queries: The number of statements a request may make before it is
+            flagged, None for no limit.
+        max_repeats: The number of statements of the same shape a request may
+            make before it is flagged, None for no limit.
+    """
+
+    max_queries: int | None = pydantic.Field(default=50, gt=0)
+    max_repeats: int | None = pydantic.Field(default=10, gt=0)
+
+    _current: ContextVar[QueryStats | None] = pydantic.PrivateAttr(
+        default_factory=lambda: ContextVar("query_stats", default=None)
+    )
+    _engines: WeakSet[Engine] = pydantic.PrivateAttr(default_factory=WeakSet)
+    # The start of the statements being executed, by execution: the ones which
+    # fail are forgotten along with their execution
+    _started: WeakKeyDictionary[ExecutionContext, float] = pydantic.PrivateAttr(
+        default_factory=WeakKeyDictionary
+    )
+
+    Config = _PydanticConfig
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """
+        Account for the statements executed by an engine.
+
+        Args:
+            engine: The engine to instrument (idempotent).
+        """
+        sync_engine: Engine = engine.sync_engine
+        if sync_engine in self._engines:
+            return
+        self._engines.add(sync_engine)
+        event.listen(sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_execute)
+
+    @contextmanager
+    def track(self) -> Iterator[QueryStats]:
+        """
+        Account for the statements executed in the current context (i.e. the
+        current request and the tasks it starts).
+
+        Yields:
+            The statistics, updated as statements are executed.
+        """
+        stats: QueryStats = QueryStats()
+        token = self._current.set(stats)
+        try:
+            yield stats
+        finally:
+            self._current.reset(token)
+
+    def check(self, stats: QueryStats, name: str = "") -> list[str]:
+        """
+        Check the statistics of a request against the budget, logging a warning
+        if they go over it.
+
+        Args:
+            stats: The statistics of the request.
+            name: The name of the request, for the log.
+
+        Returns:
+            The reasons the request has been flagged, empty if it has not.
+        """
+        problems: list[str] = []
+        if self.max_queries is not None and stats.queries > self.max_queries:
+            problems.append(f"{stats.queries} queries (budget: {self.max_queries})")
+        if self.max_repeats is not None and stats.shapes:
+            shape, count = stats.shapes.most_common(1)[0]
+            if count > self.max_repeats:
+                problems.append(f"{count} times the same query: {shape[:120]}")
+        for problem in problems:
+            logger.warning("%s: %s", name or "Request", problem)
+        return problems
+
+    def _before_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        if self._current.get() is not None:
+            self._started[context] = time.perf_counter()
+
+    def _after_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        stats: QueryStats | None = self._current.get()
+        started: float | None = self._started.pop(context, None)
+        if stats is not None and started is not None:
+            stats.record(statement, time.perf_counter() - started)
+
+
+def shape_of(statement: str) -> str:
+    """
+    Get the shape of a SQL statement: its text with the parameters (and the
+    lists of parameters) collapsed, so that the same query made with other
+    values has the same shape.
+
+    Args:
+        statement: The SQL statement.
+
+    Returns:
+        The shape of the statement.
+    """
+    return _SPACES.sub(" ", _PARAMETERS.sub("?", statement)).strip()
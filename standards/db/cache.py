@@ -0,0 +1,144 @@
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+import pydantic
+from .._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = ["LRUCache"]
+
+
+T = TypeVar("T")
+
+
+class LRUCache(pydantic.BaseModel):
+    """
+    Represents a bounded in-process cache, with least recently used eviction
+    and a time to live.
+
+    Every entry is tagged (with the numdos it relates to) so that all the
+    entries of a tag can be invalidated at once. A value loaded while an
+    invalidation (of any tag) or a clear happened is not cached, as it may
+    predate it.
+
+    Attributes:
+        maxsize: The maximum number of entries.
+        ttl: The number of seconds an entry stays valid.
+        hits: The number of lookups answered from the cache.
+        misses: The number of lookups not answered from the cache.
+        evictions: The number of entries evicted to make room for new ones.
+        expirations: The number of entries dropped because they expired.
+        invalidations: The number of entries dropped by invalidate.
+    """
+
+    maxsize: int = pydantic.Field(default=1024, gt=0)
+    ttl: float = pydantic.Field(default=60.0, gt=0)
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    _entries: OrderedDict[Hashable, tuple[float, str, Any]] = pydantic.PrivateAttr(
+        default_factory=OrderedDict
+    )
+    _tags: dict[str, set[Hashable]] = pydantic.PrivateAttr(default_factory=dict)
+    _generation: int = pydantic.PrivateAttr(default=0)
+
+    Config = _PydanticConfig
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(
+        self, key: Hashable, tag: str, load: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Get a value from the cache, loading (and caching) it on a miss.
+
+        Args:
+            key: The key of the value.
+            tag: The tag of the entry, to invalidate it.
+            load: The function loading the value. None values are not cached.
+
+        Returns:
+            The cached or loaded value.
+        """
+        entry: tuple[float, str, Any] | None = self._entries.get(key)
+        if entry is not None:
+            expires_at, _, value = entry
+            if expires_at > time.monotonic():
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            self._drop(key)
+            self.expirations += 1
+        self.misses += 1
+        generation: int = self._generation
+        value = await load()
+        if value is not None and self._generation == generation:
+            self.set(key, tag, value)
+        return value
+
+    def set(self, key: Hashable, tag: str, value: Any) -> None:
+        """
+        Put a value in the cache, evicting the least recently used entries if
+        it is full.
+
+        Args:
+            key: The key of the value.
+            tag: The tag of the entry, to invalidate it.
+            value: The value.
+        """
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, tag, value)
+        self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, tag: str) -> None:
+        """
+        Drop every entry of a tag.
+
+        Args:
+            tag: The tag of the entries (i.e. a numdos).
+        """
+        self._generation += 1
+        for key in self._tags.get(tag, set()).copy():
+            self._drop(key)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """
+        Drop every entry.
+        """
+        self._generation += 1
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the statistics of the cache.
+
+        Returns:
+            A dictionary containing the size of the cache and its counters.
+        """
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, key: Hashable) -> None:
+        _, tag, _ = self._entries.pop(key)
+        keys: set[Hashable] = self._tags[tag]
+        keys.discard(key)
+        if not keys:
+            del self._tags[tag]
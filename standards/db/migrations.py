@@ -0,0 +1,248 @@
+from __future__ import annotations
+from typing import Any, Callable, cast
+import pydantic
+from sqlalchemy import (
+    ColumnClause,
+    ColumnElement,
+    Connection,
+    Index,
+    Integer,
+    Table,
+    case,
+    column,
+    func,
+    insert,
+    inspect,
+    select,
+    table,
+    text,
+)
+from .models import Base, CodedEnum, File, SchemaMigration, track_versions
+from .search import create_search_index
+from .stats import create_file_counts
+from .._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = [
+    "MIGRATIONS",
+    "SCHEMA_VERSION",
+    "Migration",
+    "pending_migrations",
+    "schema_version",
+    "upgrade",
+]
+
+
+class Migration(pydantic.BaseModel):
+    """
+    Represents a versioned change of the schema of the database.
+
+    The migrations are applied in order of version, and recorded in the
+    schema_migrations table. As the first one creates the missing tables from
+    the current models (along with their indexes), the later ones must be
+    idempotent (e.g. create an index only if it does not exist yet).
+
+    Attributes:
+        version: The version of the schema after the migration.
+        description: The description of the migration.
+        upgrade: The function applying the migration on a (sync) connection.
+    """
+
+    version: int = pydantic.Field(..., gt=0)
+    description: str
+    upgrade: Callable[[Connection], None]
+
+    Config = _PydanticConfig
+
+
+def _create_tables(conn: Connection) -> None:
+    Base.metadata.create_all(conn, checkfirst=True)
+
+
+def _create_index(name: str) -> Callable[[Connection], None]:
+    """
+    Create the function creating an index declared on the models, unless it
+    already exists.
+    """
+
+    def create_index(conn: Connection) -> None:
+        index: Index = next(
+            index
+            for table in Base.metadata.sorted_tables
+            for index in table.indexes
+            if index.name == name
+        )
+        index.create(conn, checkfirst=True)
+
+    return create_index
+
+
+def _code_enums(conn: Connection) -> None:
+    """
+    Convert the format and language columns of the files, which stored the
+    names of the members of their enums, into integer codes (see CodedEnum),
+    unless they already are, and index them.
+
+    SQLite cannot change the type of a column, so the table is rebuilt: renamed,
+    created again (along with its indexes and triggers) and filled with the
+    converted rows, keeping their ids.
+    """
+    coded: list[str] = ["format", "language"]
+    columns: dict[str, Any] = {
+        info["name"]: info["type"] for info in inspect(conn).get_columns("files")
+    }
+    if all(isinstance(columns[name], Integer) for name in coded):
+        _create_index("ix_files_format_language")(conn)
+        _create_index("ix_files_language")(conn)
+        return
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("ALTER TABLE files RENAME TO files_old")
+        for kind, name in conn.exec_driver_sql(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE tbl_name = 'files_old' AND type IN ('index', 'trigger') "
+            "AND sql IS NOT NULL"
+        ).all():
+            conn.exec_driver_sql(f"DROP {kind.upper()} {name}")
+        files: Table = cast(Table, File.__table__)
+        files.create(conn)
+        old = table("files_old", *(column(name) for name in columns))
+        conn.execute(
+            insert(files).from_select(
+                list(columns),
+                select(
+                    *(
+                        _to_code(old.c[name]) if name in coded else old.c[name]
+                        for name in columns
+                    )
+                ),
+            )
+        )
+        conn.exec_driver_sql("DROP TABLE files_old")
+        if inspect(conn).has_table("files_fts"):
+            conn.exec_driver_sql("INSERT INTO files_fts (files_fts) VALUES ('rebuild')")
+    elif conn.dialect.name == "postgresql":
+        for name in coded:
+            using: Any = _to_code(column(name)).compile(
+                conn, compile_kwargs={"literal_binds": True}
+            )
+            conn.execute(
+                text(
+                    f"ALTER TABLE files ALTER COLUMN {name} TYPE SMALLINT USING {using}"
+                )
+            )
+            conn.exec_driver_sql(f"DROP TYPE IF EXISTS {columns[name].name}")
+        _create_index("ix_files_format_language")(conn)
+        _create_index("ix_files_language")(conn)
+    else:
+        raise ValueError(f"Cannot convert the enums of {conn.dialect.name}")
+
+
+def _to_code(value: ColumnClause) -> ColumnElement:
+    """
+    Convert the name of a member of the enum of a coded column of the files
+    into its code.
+    """
+    coded: CodedEnum = cast(CodedEnum, File.__table__.c[value.name].type)
+    return case({member.name: code for member, code in coded.codes}, value=value)
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(version=1, description="Create the tables", upgrade=_create_tables),
+    Migration(
+        version=2,
+        description="Index the files by numdos and numdosvl",
+        upgrade=_create_index("ix_files_numdos_numdosvl"),
+    ),
+    Migration(
+        version=3,
+        description="Index the files for full-text search (SQLite)",
+        upgrade=create_search_index,
+    ),
+    Migration(
+        version=4,
+        description="Store the formats and languages of the files as indexed codes",
+        upgrade=_code_enums,
+    ),
+    Migration(
+        version=5,
+        description="Count the files by format, language and prefix",
+        upgrade=create_file_counts,
+    ),
+    Migration(
+        version=6,
+        description="Track the versions of the existing tables (SQLite)",
+        upgrade=track_versions,
+    ),
+)
+SCHEMA_VERSION: int = MIGRATIONS[-1].version
+
+
+def schema_version(conn: Connection) -> int:
+    """
+    Get the version of the schema of a database.
+
+    Args:
+        conn: The (sync) connection to the database.
+
+    Returns:
+        The version of the last applied migration, 0 if none has been applied.
+    """
+    if not inspect(conn).has_table(SchemaMigration.__tablename__):
+        return 0
+    return conn.execute(select(func.max(SchemaMigration.version))).scalar() or 0
+
+
+def pending_migrations(conn: Connection, target: int | None = None) -> list[Migration]:
+    """
+    Get the migrations bringing the schema of a database to a version.
+
+    Args:
+        conn: The (sync) connection to the database.
+        target: The version to bring the schema to, SCHEMA_VERSION if None.
+
+    Returns:
+        The migrations to apply, in order.
+
+    Raises:
+        ValueError: If the target version is unknown or older than the version
+            of the schema (downgrades are not supported).
+    """
+    target = SCHEMA_VERSION if target is None else target
+    if not 0 <= target <= SCHEMA_VERSION:
+        raise ValueError(f"Unknown schema version {target} (latest: {SCHEMA_VERSION})")
+    current: int = schema_version(conn)
+    if target < current:
+        raise ValueError(
+            f"Cannot downgrade the schema from version {current} to {target}"
+        )
+    return [m for m in MIGRATIONS if current < m.version <= target]
+
+
+def upgrade(conn: Connection, target: int | None = None) -> list[Migration]:
+    """
+    Bring the schema of a database to a version, creating it if it is empty.
+
+    Meant to be run in a transaction (e.g. with AsyncConnection.run_sync in
+    AsyncEngine.begin), so that the migrations are applied all or none.
+
+    Args:
+        conn: The (sync) connection to the database.
+        target: The version to bring the schema to, SCHEMA_VERSION if None.
+
+    Returns:
+        The applied migrations, in order.
+
+    Raises:
+        ValueError: If the target version is unknown or older than the version
+            of the schema.
+    """
+    migrations: list[Migration] = pending_migrations(conn, target)
+    cast(Table, SchemaMigration.__table__).create(conn, checkfirst=True)
+    for migration in migrations:
+        migration.upgrade(conn)
+        conn.execute(
+            insert(SchemaMigration).values(
+                version=migration.version, description=migration.description
+            )
+        )
+    return migrations
@@ -1,12 +1,44 @@
 from __future__ import annotations
 from abc import abstractmethod
-from typing import Any, Iterable
-from sqlalchemy import CheckConstraint, Column, ForeignKey, String
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from enum import Enum
+from typing import Any, Iterable, cast
+from datetime import datetime
+from sqlalchemy import (
+    DDL,
+    CheckConstraint,
+    Column,
+    Connection,
+    Dialect,
+    ForeignKey,
+    Index,
+    SmallInteger,
+    String,
+    Table,
+    TypeDecorator,
+    event,
+    func,
+)
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    mapped_column,
+    query_expression,
+    relationship,
+)
 from .._private.enum import FileFormat, FileLanguage
 
 
-__all__: list[str] = ["Base", "File", "Standard"]
+__all__: list[str] = [
+    "Base",
+    "CodedEnum",
+    "File",
+    "FileCount",
+    "SchemaMigration",
+    "Standard",
+    "TableVersion",
+    "VERSIONED_TABLES",
+    "track_versions",
+]
 
 
 class Base(DeclarativeBase):  # pragma: no cover
@@ -51,6 +83,40 @@ class Base(DeclarativeBase):  # pragma: no cover
         raise NotImplementedError()
 
 
+class CodedEnum(TypeDecorator):
+    """
+    Stores the members of an enum as small integers, more compact than their
+    names and cheaper to index and compare.
+
+    The codes are explicit, so that they stay the same whatever the order of
+    the members (only new codes may be added).
+
+    Attributes:
+        enum_class: The enum.
+        codes: The (member, code) pairs of the enum (a tuple, as the attributes
+            are part of the cache key of the statements).
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class: type[Enum], codes: dict[Any, int]) -> None:
+        super().__init__()
+        if set(codes) != set(enum_class) or len(set(codes.values())) != len(codes):
+            raise ValueError(f"Every member of {enum_class} needs its own code")
+        self.enum_class: type[Enum] = enum_class
+        self.codes: tuple[tuple[Any, int], ...] = tuple(codes.items())
+        self._codes: dict[Any, int] = dict(codes)
+        self._members: dict[int, Any] = {code: m for m, code in codes.items()}
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> int | None:
+        # Values are accepted as well as members (e.g. "pdf" for FileFormat.PDF)
+        return None if value is None else self._codes[self.enum_class(value)]
+
+    def process_result_value(self, value: int | None, dialect: Dialect) -> Any:
+        return None if value is None else self._members[value]
+
+
 class Standard(Base):
     """
     Represents a standard in the database.
@@ -62,7 +128,7 @@ class Standard(Base):
 
     __tablename__: str = "standards"
 
-    numdos: Column = Column(
+    numdos: Mapped[str] = mapped_column(
         String, CheckConstraint(r"numdos REGEXP '^[A-Z]{2}\d+$'"), primary_key=True
     )
     files: Mapped[list[File]] = relationship(
@@ -88,6 +154,8 @@ class File(Base):
         standard: The relationship to the standard associated with the file.
         format: The format of the file, one of FileFormat.
         language: The language of the file, one of FileLanguage.
+        search_rank: The rank of the file among the results of MyDb.search (the
+            lower the better), None when it is loaded otherwise.
     """
 
     __tablename__: str = "files"
@@ -97,8 +165,21 @@ class File(Base):
     numdosvl: Mapped[str]
     numdos: Mapped[str] = mapped_column(ForeignKey("standards.numdos"))
     standard: Mapped[Standard] = relationship(back_populates="files")
-    format: Mapped[FileFormat]
-    language: Mapped[FileLanguage]
+    format: Mapped[FileFormat] = mapped_column(
+        CodedEnum(
+            FileFormat,
+            {
+                FileFormat.XML: 1,
+                FileFormat.XMLRL: 2,
+                FileFormat.PDF: 3,
+                FileFormat.PDFRL: 4,
+            },
+        )
+    )
+    language: Mapped[FileLanguage] = mapped_column(
+        CodedEnum(FileLanguage, {FileLanguage.FR: 1, FileLanguage.EN: 2})
+    )
+    search_rank: Mapped[float | None] = query_expression()
 
     __table_args__: Iterable[Column] = tuple(
         CheckConstraint(
@@ -118,3 +199,151 @@ class File(Base):
             f"File(numdos={self.numdos}, numdosvl={self.numdosvl}, name={self.name}, "
             f"format={self.format}, language={self.language})"
         )
+
+
+class TableVersion(Base):
+    """
+    Represents the version of a table in the database, bumped on every change
+    of its rows (by triggers, on SQLite).
+
+    Attributes:
+        name: The name of the table.
+        version: The version of the table.
+    """
+
+    __tablename__: str = "table_versions"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(default=0)
+
+    def keys(self) -> list[str]:
+        return ["name", "version"]
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"TableVersion(name={self.name}, version={self.version})"
+
+
+class FileCount(Base):
+    """
+    Represents the number of files having a value (e.g. the pdf format), kept
+    up to date on every inserted, updated or deleted file (by triggers, on
+    SQLite), see standards.db.stats.
+
+    Attributes:
+        dimension: What the files are counted by: format, language or prefix
+            (of the numdos of their standard).
+        value: The value of the files, e.g. pdf.
+        count: The number of files having the value, 0 once they are all gone.
+    """
+
+    __tablename__: str = "file_counts"
+
+    dimension: Mapped[str] = mapped_column(primary_key=True)
+    value: Mapped[str] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+    def keys(self) -> list[str]:
+        return ["dimension", "value", "count"]
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (
+            f"FileCount(dimension={self.dimension}, value={self.value}, "
+            f"count={self.count})"
+        )
+
+
+class SchemaMigration(Base):
+    """
+    Represents a migration applied to the schema of the database, see
+    standards.db.migrations.
+
+    Attributes:
+        version: The version of the schema after the migration.
+        description: The description of the migration.
+        applied_at: When the migration has been applied.
+    """
+
+    __tablename__: str = "schema_migrations"
+
+    version: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    description: Mapped[str]
+    applied_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    def keys(self) -> list[str]:
+        return ["version", "description", "applied_at"]
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return (
+            f"SchemaMigration(version={self.version}, description={self.description})"
+        )
+
+
+# The lookups of a file (get_file) and of the files of standards (their
+# relationship loads) filter on numdos, or on numdos and numdosvl
+Index("ix_files_numdos_numdosvl", File.numdos, File.numdosvl)
+# The filters on the format and the language of the files (get_files), either
+# both or the language alone (the format alone being a prefix of the first)
+Index("ix_files_format_language", File.format, File.language)
+Index("ix_files_language", File.language)
+
+# The triggers keeping the counts up to date are created along with their table
+cast(Table, FileCount.__table__).add_is_dependent_on(cast(Table, File.__table__))
+
+VERSIONED_TABLES: tuple[Table, ...] = (
+    cast(Table, Standard.__table__),
+    cast(Table, File.__table__),
+)
+
+
+def _version_triggers(table: Table) -> list[str]:
+    """
+    The SQLite triggers bumping the version of a table on every inserted,
+    updated or deleted row, unless they already exist.
+    """
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table.name}_version_{operation.lower()} "
+        f"AFTER {operation} ON {table.name} BEGIN "
+        f"UPDATE table_versions SET version = version + 1 "
+        f"WHERE name = '{table.name}'; END"
+        for operation in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+# The versions are only kept, hence seeded, where the triggers bump them: on the
+# other dialects get_table_versions finds no rows and no ETag is sent
+_SEED_VERSIONS: str = (
+    "INSERT OR IGNORE INTO table_versions (name, version) VALUES "
+    + ", ".join(f"('{table.name}', 0)" for table in VERSIONED_TABLES)
+)
+
+
+def track_versions(conn: Connection) -> None:
+    """
+    Keep track of the versions of the existing tables, on SQLite: add their
+    missing rows to the table_versions table and create their missing triggers.
+
+    The triggers are created along with the tables, so the tables created
+    before the table_versions table have none.
+
+    Args:
+        conn: The (sync) connection to the database, whose table_versions
+            table exists.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    conn.exec_driver_sql(_SEED_VERSIONS)
+    for table in VERSIONED_TABLES:
+        for statement in _version_triggers(table):
+            conn.exec_driver_sql(statement)
+
+
+event.listen(
+    TableVersion.__table__,
+    "after_create",
+    DDL(_SEED_VERSIONS).execute_if(dialect="sqlite"),
+)
+for _table in VERSIONED_TABLES:
+    for _statement in _version_triggers(_table):
+        event.listen(
+            _table, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+        )
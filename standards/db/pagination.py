@@ -0,0 +1,78 @@
+from __future__ import annotations
+import base64
+import binascii
+import json
+from typing import Any, Generic, TypeVar
+from pydantic.generics import GenericModel
+from .._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = [
+    "DEFAULT_PAGE_SIZE",
+    "MAX_PAGE_SIZE",
+    "Page",
+    "decode_cursor",
+    "encode_cursor",
+]
+
+
+DEFAULT_PAGE_SIZE: int = 100
+MAX_PAGE_SIZE: int = 1000
+
+T = TypeVar("T")
+K = TypeVar("K", int, str, list)
+
+
+class Page(GenericModel, Generic[T]):
+    """
+    Represents a page of results retrieved through keyset pagination.
+
+    Attributes:
+        items: The items of the page.
+        next_cursor: The cursor to give to retrieve the next page, None if this
+            page is the last one.
+    """
+
+    items: list[T]
+    next_cursor: str | None = None
+
+    Config = _PydanticConfig
+
+
+def encode_cursor(key: Any) -> str:
+    """
+    Encode a pagination key into an opaque cursor.
+
+    Args:
+        key: The (JSON serializable) value of the ordering column.
+
+    Returns:
+        The opaque cursor.
+    """
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str, key_type: type[K]) -> K:
+    """
+    Decode an opaque cursor back into a pagination key.
+
+    Args:
+        cursor: The opaque cursor, as returned by encode_cursor.
+        key_type: The type of the ordering column (int or str), or list for
+            a key of several columns.
+
+    Returns:
+        The value of the ordering column(s).
+
+    Raises:
+        ValueError: If the cursor is not a valid one, or its key is not of the
+            type of the ordering column.
+    """
+    try:
+        key: Any = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    # JSON booleans are decoded as bools, which are ints for isinstance
+    if not isinstance(key, key_type) or isinstance(key, bool):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return key
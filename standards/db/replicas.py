@@ -0,0 +1,233 @@
+from __future__ import annotations
+import asyncio
+import logging
+from itertools import count
+from typing import Any, Iterator
+import pydantic
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine, ExceptionContext
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import CompoundSelect, Select
+from .._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = ["DEFAULT_CHECK_INTERVAL", "Replicas", "RoutingSession"]
+
+
+DEFAULT_CHECK_INTERVAL: float = 5.0
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class Replicas(pydantic.BaseModel):
+    """
+    Represents the read replicas of a database, which the reads are balanced
+    across (round-robin) as long as they are healthy.
+
+    A replica is marked as unhealthy when a connection to it or a statement on
+    it fails, and as healthy again once it answers a health check.
+
+    Attributes:
+        urls: The URLs of the replicas.
+        check_interval: The number of seconds between two health checks of the
+            replicas.
+        check_timeout: The number of seconds a replica has to answer a health
+            check.
+        engines: The async engines of the replicas, once connected.
+    """
+
+    urls: list[str] = pydantic.Field(..., min_items=1)
+    check_interval: float = pydantic.Field(default=DEFAULT_CHECK_INTERVAL, gt=0)
+    check_timeout: float = pydantic.Field(default=1.0, gt=0)
+    engines: list[AsyncEngine] = []
+
+    _healthy: dict[Engine, bool] = pydantic.PrivateAttr(default_factory=dict)
+    _turns: Iterator[int] = pydantic.PrivateAttr(default_factory=count)
+    _checks: asyncio.Task | None = pydantic.PrivateAttr(None)
+
+    Config = _PydanticConfig
+
+    def connect(self, **engine_options: Any) -> None:
+        """
+        Create the engines of the replicas and start checking their health.
+
+        Args:
+            **engine_options: The keyword arguments given to create_async_engine.
+        """
+        if self._checks is not None and not self._checks.done():
+            self._checks.cancel()
+        self.engines = [create_async_engine(url, **engine_options) for url in self.urls]
+        self._healthy = {engine.sync_engine: True for engine in self.engines}
+        for engine in self.engines:
+            event.listen(engine.sync_engine, "handle_error", self._handle_error)
+        self._checks = asyncio.get_running_loop().create_task(self._check_forever())
+
+    async def close(self) -> None:
+        """
+        Stop checking the health of the replicas and close their connections.
+        """
+        if self._checks is not None:
+            self._checks.cancel()
+            self._checks = None
+        for engine in self.engines:
+            await engine.dispose()
+        self.engines = []
+        self._healthy = {}
+
+    def choose(self) -> Engine | None:
+        """
+        Choose the replica of the next session, in turn among the healthy ones.
+
+        Returns:
+            The (sync) engine of the replica, or None if none is healthy.
+        """
+        healthy: list[Engine] = [e for e, ok in self._healthy.items() if ok]
+        if not healthy:
+            return None
+        return healthy[next(self._turns) % len(healthy)]
+
+    def is_healthy(self, engine: Engine) -> bool:
+        """
+        Tell whether an engine is the one of a healthy replica.
+
+        Args:
+            engine: The (sync) engine.
+
+        Returns:
+            True if it is the engine of a healthy replica.
+        """
+        return self._healthy.get(engine, False)
+
+    def is_replica(self, engine: Engine) -> bool:
+        """
+        Tell whether an engine is the one of a replica.
+
+        Args:
+            engine: The (sync) engine.
+
+        Returns:
+            True if it is the engine of a replica.
+        """
+        return engine in self._healthy
+
+    def mark(self, engine: Engine, healthy: bool) -> None:
+        """
+        Mark a replica as healthy or not.
+
+        Args:
+            engine: The (sync) engine of the replica.
+            healthy: Whether the replica is healthy.
+        """
+        if engine in self._healthy and self._healthy[engine] != healthy:
+            logger.warning(
+                "Replica %s is %s",
+                engine.url.render_as_string(hide_password=True),
+                "back up" if healthy else "down",
+            )
+            self._healthy[engine] = healthy
+
+    def health(self) -> dict[str, bool]:
+        """
+        Get the health of the replicas.
+
+        Returns:
+            Whether every replica is healthy, by URL (without password).
+        """
+        return {
+            engine.url.render_as_string(hide_password=True): healthy
+            for engine, healthy in self._healthy.items()
+        }
+
+    async def check(self) -> dict[str, bool]:
+        """
+        Check the health of every replica, with a SELECT 1.
+
+        Returns:
+            Whether every replica is healthy, by URL (without password).
+        """
+        results: list[bool] = await asyncio.gather(
+            *(self._check(engine) for engine in self.engines)
+        )
+        for engine, healthy in zip(self.engines, results):
+            self.mark(engine.sync_engine, healthy)
+        return self.health()
+
+    async def _check(self, engine: AsyncEngine) -> bool:
+        async def select_one() -> None:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        try:
+            await asyncio.wait_for(select_one(), self.check_timeout)
+        except (DBAPIError, OSError, asyncio.TimeoutError):
+            return False
+        return True
+
+    async def _check_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    def _handle_error(self, context: ExceptionContext) -> None:
+        if context.is_disconnect or isinstance(
+            context.sqlalchemy_exception, OperationalError
+        ):
+            engine: Engine | None = context.engine
+            if engine is not None:
+                self.mark(engine, False)
+
+
+class RoutingSession(Session):
+    """
+    Session sending its reads (SELECT statements) to the read replicas of its
+    MyDb instance, if any, and everything else (flushes, DML and textual
+    statements) to the primary database. The reads of a session all go to the
+    same replica as long as it is healthy, the replicas being balanced across
+    sessions.
+
+    Once it has sent something else than a read to the primary, every later
+    statement of the session goes to the primary so that it reads its own
+    writes. A read failing on a replica is made again on the primary.
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Any:
+        replicas: Replicas | None = self._replicas()
+        if replicas is None or kwargs.get("bind") or self.info.get("wrote"):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if self._flushing or not isinstance(clause, (Select, CompoundSelect)):
+            self.info["wrote"] = self._flushing or clause is not None
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        replica: Engine | None = self.info.get("replica")
+        if replica is None or not replicas.is_healthy(replica):
+            replica = self.info["replica"] = replicas.choose()
+        if replica is None:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return replica
+
+    def execute(self, statement: Any, *args: Any, **kwargs: Any) -> Any:
+        replicas: Replicas | None = self._replicas()
+        bind_arguments: dict[str, Any] = kwargs.get("bind_arguments") or {}
+        if replicas is None or "bind" in bind_arguments:
+            return super().execute(statement, *args, **kwargs)
+        bind: Any = self.get_bind(**{"clause": statement, **bind_arguments})
+        try:
+            return super().execute(
+                statement,
+                *args,
+                **{**kwargs, "bind_arguments": {**bind_arguments, "bind": bind}},
+            )
+        except OperationalError:
+            if not replicas.is_replica(bind):
+                raise
+            primary: Any = super().get_bind(**{"clause": statement, **bind_arguments})
+            return super().execute(
+                statement,
+                *args,
+                **{**kwargs, "bind_arguments": {**bind_arguments, "bind": primary}},
+            )
+
+    def _replicas(self) -> Replicas | None:
+        db: Any = self.info.get("db")
+        return getattr(db, "replicas", None)
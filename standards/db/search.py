@@ -0,0 +1,114 @@
+from __future__ import annotations
+import re
+from sqlalchemy import DDL, Connection, TableClause, column, event, inspect, table
+from .models import File
+from .pagination import decode_cursor
+
+
+__all__: list[str] = [
+    "FILES_SEARCH",
+    "create_search_index",
+    "decode_rank_cursor",
+    "match_expression",
+]
+
+
+FILES_SEARCH: TableClause = table(
+    "files_fts",
+    column("rowid"),
+    column("rank"),
+    column("files_fts"),
+    column("name"),
+    column("numdos"),
+    column("numdosvl"),
+)
+
+_TERM: re.Pattern = re.compile(r"(\w+)(\*?)")
+
+# The FTS5 index of the files (SQLite only), an external content table whose
+# rows are kept in sync with the files table by triggers (created again, but
+# not the index, when the files table is rebuilt by a migration)
+_COLUMNS: str = "name, numdos, numdosvl"
+_SEARCH_DDL: tuple[str, ...] = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5({_COLUMNS}, "
+    f"content='files', content_rowid='id')",
+    f"CREATE TRIGGER files_fts_insert AFTER INSERT ON files BEGIN "
+    f"INSERT INTO files_fts (rowid, {_COLUMNS}) "
+    f"VALUES (new.id, new.name, new.numdos, new.numdosvl); END",
+    f"CREATE TRIGGER files_fts_delete AFTER DELETE ON files BEGIN "
+    f"INSERT INTO files_fts (files_fts, rowid, {_COLUMNS}) "
+    f"VALUES ('delete', old.id, old.name, old.numdos, old.numdosvl); END",
+    f"CREATE TRIGGER files_fts_update AFTER UPDATE OF {_COLUMNS} ON files BEGIN "
+    f"INSERT INTO files_fts (files_fts, rowid, {_COLUMNS}) "
+    f"VALUES ('delete', old.id, old.name, old.numdos, old.numdosvl); "
+    f"INSERT INTO files_fts (rowid, {_COLUMNS}) "
+    f"VALUES (new.id, new.name, new.numdos, new.numdosvl); END",
+)
+
+
+def create_search_index(conn: Connection) -> None:
+    """
+    Create the full-text index of the files on SQLite, unless it already
+    exists, and index the existing files.
+
+    Args:
+        conn: The (sync) connection to the database.
+    """
+    if conn.dialect.name != "sqlite" or inspect(conn).has_table("files_fts"):
+        return
+    for statement in _SEARCH_DDL:
+        conn.exec_driver_sql(statement)
+    conn.exec_driver_sql("INSERT INTO files_fts (files_fts) VALUES ('rebuild')")
+
+
+def match_expression(query: str) -> str:
+    """
+    Convert a search query into an FTS5 MATCH expression, every term of which
+    must match: a term ending with * matches the words it prefixes (e.g.
+    NF12*), the other ones whole words. The other characters separate the
+    terms, as they do the indexed words.
+
+    Args:
+        query: The search query, e.g. "NF12* rapport".
+
+    Returns:
+        The MATCH expression, e.g. '"NF12"* "rapport"'.
+
+    Raises:
+        ValueError: If the query has no term.
+    """
+    terms: list[str] = [f'"{term}"{star}' for term, star in _TERM.findall(query)]
+    if not terms:
+        raise ValueError(f"Invalid search query: {query!r} (no term)")
+    return " ".join(terms)
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Decode a cursor of the search results, keyed by the rank and the id of the
+    last file of the previous page.
+
+    Args:
+        cursor: The opaque cursor, as returned by MyDb.search.
+
+    Returns:
+        The rank and the id of the file.
+
+    Raises:
+        ValueError: If the cursor is not a valid one.
+    """
+    key: list = decode_cursor(cursor, list)
+    if (
+        len(key) != 2
+        or not all(isinstance(value, (int, float)) for value in key)
+        or not isinstance(key[1], int)
+        or any(isinstance(value, bool) for value in key)
+    ):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return float(key[0]), key[1]
+
+
+for _statement in _SEARCH_DDL:
+    event.listen(
+        File.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
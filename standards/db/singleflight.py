@@ -0,0 +1,94 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+import pydantic
+from .._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = ["SingleFlight"]
+
+
+T = TypeVar("T")
+
+
+class _Call:
+    """
+    Represents a call in flight, along with the number of callers waiting for it.
+    """
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task: asyncio.Task = task
+        self.waiters: int = 0
+
+
+class SingleFlight(pydantic.BaseModel):
+    """
+    Represents a group of calls in which concurrent calls with the same key
+    share a single execution and its result (or exception).
+
+    The shared execution runs in its own task: a cancelled caller does not
+    cancel it for the others, it is only cancelled once every caller waiting
+    for it has been.
+
+    Attributes:
+        calls: The number of calls made.
+        shared: The number of calls which joined an execution already in flight.
+    """
+
+    calls: int = 0
+    shared: int = 0
+
+    _in_flight: dict[Hashable, _Call] = pydantic.PrivateAttr(default_factory=dict)
+
+    Config = _PydanticConfig
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Execute a call, or join the execution of a concurrent call with the same
+        key.
+
+        Args:
+            key: The key identifying identical calls.
+            call: The function making the call.
+
+        Returns:
+            The result of the (shared) execution.
+        """
+        self.calls += 1
+        in_flight: _Call | None = self._in_flight.get(key)
+        if in_flight is None:
+            in_flight = _Call(asyncio.ensure_future(call()))
+            self._in_flight[key] = in_flight
+            in_flight.task.add_done_callback(lambda _: self._forget(key, in_flight))
+        else:
+            self.shared += 1
+        in_flight.waiters += 1
+        try:
+            return await asyncio.shield(in_flight.task)
+        finally:
+            in_flight.waiters -= 1
+            if not in_flight.waiters and not in_flight.task.done():
+                # Forgotten right away, so that a new call does not join the
+                # cancelled execution before it is done
+                if self._in_flight.get(key) is in_flight:
+                    del self._in_flight[key]
+                in_flight.task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get the statistics of the group.
+
+        Returns:
+            A dictionary containing the number of calls in flight, made and
+            shared.
+        """
+        return {"in_flight": len(self), "calls": self.calls, "shared": self.shared}
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._in_flight.get(key) is call:
+            del self._in_flight[key]
+        if not call.task.cancelled():
+            call.task.exception()  # Retrieved by the waiters, if any
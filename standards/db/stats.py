@@ -0,0 +1,229 @@
+from __future__ import annotations
+from typing import Iterable, cast
+import pydantic
+from sqlalchemy import (
+    DDL,
+    ColumnElement,
+    CompoundSelect,
+    Connection,
+    Integer,
+    Select,
+    Table,
+    case,
+    delete,
+    event,
+    func,
+    insert,
+    literal,
+    select,
+    type_coerce,
+    union_all,
+)
+from sqlalchemy.orm import InstrumentedAttribute
+from .models import CodedEnum, File, FileCount
+from .._private.enum import FileFormat, FileLanguage
+from .._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = [
+    "PREFIX_LENGTH",
+    "FileStats",
+    "count_files",
+    "create_file_counts",
+    "file_counts",
+    "rebuild_file_counts",
+]
+
+
+PREFIX_LENGTH: int = 2
+
+
+class FileStats(pydantic.BaseModel):
+    """
+    Represents the numbers of files, in total and by format, language and
+    prefix of the numdos of their standard.
+
+    Attributes:
+        files: The number of files.
+        formats: The number of files of every format, 0 for the formats no file
+            has.
+        languages: The number of files of every language, 0 for the languages
+            no file has.
+        prefixes: The number of files by prefix (the first PREFIX_LENGTH
+            characters of the numdos), for the prefixes some files have.
+    """
+
+    files: int
+    formats: dict[str, int]
+    languages: dict[str, int]
+    prefixes: dict[str, int]
+
+    Config = _PydanticConfig
+
+    @classmethod
+    def from_counts(cls, counts: Iterable[tuple[str, str, int]]) -> FileStats:
+        """
+        Build the statistics from the counts of the files.
+
+        Args:
+            counts: The (dimension, value, count) rows of the file_counts table,
+                or of count_files.
+
+        Returns:
+            The statistics.
+        """
+        by_dimension: dict[str, dict[str, int]] = {
+            "format": {format.value: 0 for format in FileFormat},
+            "language": {language.value: 0 for language in FileLanguage},
+            "prefix": {},
+        }
+        for dimension, value, count in counts:
+            if count:
+                by_dimension[dimension][value] = count
+        return cls(
+            files=sum(by_dimension["format"].values()),
+            formats=by_dimension["format"],
+            languages=by_dimension["language"],
+            prefixes=dict(sorted(by_dimension["prefix"].items())),
+        )
+
+
+def _decode(column: InstrumentedAttribute) -> ColumnElement:
+    """
+    Convert the codes of a coded enum column into the values of their members.
+    """
+    coded: CodedEnum = cast(CodedEnum, column.type)
+    return case(
+        {code: member.value for member, code in coded.codes},
+        value=type_coerce(column, Integer),
+    )
+
+
+def _values() -> dict[str, ColumnElement]:
+    """
+    The values of the files, by dimension.
+    """
+    return {
+        "format": _decode(File.format),
+        "language": _decode(File.language),
+        "prefix": func.substr(File.numdos, 1, PREFIX_LENGTH),
+    }
+
+
+def count_files() -> CompoundSelect:
+    """
+    Build the query counting the files by format, language and prefix, through
+    the whole files table.
+
+    Returns:
+        The query, selecting (dimension, value, count) rows.
+    """
+    return union_all(
+        *(
+            select(
+                literal(dimension).label("dimension"),
+                value.label("value"),
+                func.count().label("count"),
+            ).group_by(value)
+            for dimension, value in _values().items()
+        )
+    )
+
+
+def file_counts() -> Select:
+    """
+    Build the query reading the counts of the files from the file_counts table,
+    whose size is the number of values, not of files.
+
+    Returns:
+        The query, selecting (dimension, value, count) rows.
+    """
+    return select(FileCount.dimension, FileCount.value, FileCount.count)
+
+
+def rebuild_file_counts(conn: Connection) -> None:
+    """
+    Count the files again, replacing the content of the file_counts table.
+
+    Args:
+        conn: The (sync) connection to the database.
+    """
+    conn.execute(delete(FileCount))
+    conn.execute(
+        insert(FileCount).from_select(["dimension", "value", "count"], count_files())
+    )
+
+
+def create_file_counts(conn: Connection) -> None:
+    """
+    Create the file_counts table, and on SQLite the triggers keeping it up to
+    date, unless they already exist, and count the existing files.
+
+    Args:
+        conn: The (sync) connection to the database.
+    """
+    cast(Table, FileCount.__table__).create(conn, checkfirst=True)
+    if conn.dialect.name == "sqlite":
+        for statement in _COUNTS_DDL:
+            conn.exec_driver_sql(statement)
+    rebuild_file_counts(conn)
+
+
+def _sql_values(row: str) -> dict[str, str]:
+    """
+    The SQL expressions of the values of a row (new or old) of the files in a
+    trigger, by dimension.
+    """
+
+    def decode(column: str) -> str:
+        coded: CodedEnum = cast(CodedEnum, File.__table__.c[column].type)
+        whens: str = " ".join(
+            f"WHEN {code} THEN '{member.value}'" for member, code in coded.codes
+        )
+        return f"CASE {row}.{column} {whens} END"
+
+    return {
+        "format": decode("format"),
+        "language": decode("language"),
+        "prefix": f"substr({row}.numdos, 1, {PREFIX_LENGTH})",
+    }
+
+
+def _increment(row: str) -> str:
+    values: str = ", ".join(
+        f"('{dimension}', {value}, 1)" for dimension, value in _sql_values(row).items()
+    )
+    return (
+        f"INSERT INTO file_counts (dimension, value, count) VALUES {values} "
+        f"ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;"
+    )
+
+
+def _decrement(row: str) -> str:
+    # The counts falling to 0 are kept, rather than deleted, so that each row
+    # only touches its own counts
+    return " ".join(
+        f"UPDATE file_counts SET count = count - 1 "
+        f"WHERE dimension = '{dimension}' AND value = {value};"
+        for dimension, value in _sql_values(row).items()
+    )
+
+
+# The triggers keeping the counts of the files up to date (SQLite only), each
+# written file updating one count by dimension
+_COUNTS_DDL: tuple[str, ...] = (
+    f"CREATE TRIGGER IF NOT EXISTS file_counts_insert AFTER INSERT ON files "
+    f"BEGIN {_increment('new')} END",
+    f"CREATE TRIGGER IF NOT EXISTS file_counts_delete AFTER DELETE ON files "
+    f"BEGIN {_decrement('old')} END",
+    f"CREATE TRIGGER IF NOT EXISTS file_counts_update "
+    f"AFTER UPDATE OF numdos, format, language ON files "
+    f"BEGIN {_decrement('old')} {_increment('new')} END",
+)
+
+for _statement in _COUNTS_DDL:
+    event.listen(
+        FileCount.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
@@ -1,10 +1,41 @@
 import strawberry
+from strawberry.extensions import ParserCache, ValidationCache
+from .cost import CostLimits, QueryCost
+from .extensions import ResolverMetrics
 from .queries import Query
 
 
-__all__: list[str] = ["get_schema"]
+__all__: list[str] = ["DEFAULT_DOCUMENT_CACHE_SIZE", "CostLimits", "get_schema"]
 
 
-def get_schema() -> strawberry.Schema:
-    """Retrieves the Strawberry schema."""
-    return strawberry.Schema(Query)
+DEFAULT_DOCUMENT_CACHE_SIZE: int = 1_000
+
+
+def get_schema(
+    document_cache_size: int = DEFAULT_DOCUMENT_CACHE_SIZE,
+    cost_limits: CostLimits | None = None,
+) -> strawberry.Schema:
+    """
+    Retrieves the Strawberry schema.
+
+    The parsed and validated documents are kept in LRU caches, so that the
+    queries the clients keep sending (e.g. persisted ones) are only parsed and
+    validated once. The operations over the cost or depth limits are rejected
+    before being executed (see standards.graphql.cost).
+
+    Args:
+        document_cache_size: The number of documents of the caches.
+        cost_limits: The cost and depth limits, the default ones if None.
+
+    Returns:
+        The Strawberry schema.
+    """
+    return strawberry.Schema(
+        Query,
+        extensions=[
+            ParserCache(maxsize=document_cache_size),
+            ValidationCache(maxsize=document_cache_size),
+            QueryCost.with_limits(cost_limits) if cost_limits else QueryCost,
+            ResolverMetrics,
+        ],
+    )
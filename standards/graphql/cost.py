@@ -0,0 +1,284 @@
+from __future__ import annotations
+from typing import Any, ClassVar, Iterator
+import pydantic
+from graphql import (
+    DocumentNode,
+    ExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLList,
+    GraphQLNamedType,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    GraphQLOutputType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    get_named_type,
+    get_operation_ast,
+)
+from graphql.execution.values import get_argument_values
+from strawberry.extensions import SchemaExtension
+from .._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = ["Cost", "CostLimits", "QueryCost", "cost_of"]
+
+
+class CostLimits(pydantic.BaseModel):
+    """
+    Represents the static cost analysis of the GraphQL operations.
+
+    The cost of an object field is its weight plus the cost of its subfields,
+    times the expected number of objects for a list; the cost of a scalar field
+    is its weight. The size of a list is the length of its key argument if any
+    (e.g. standardsByNumdos(numdos)), the first argument of its parent field if
+    any (e.g. the edges of standardsConnection(first)), its expected cardinality
+    otherwise. The other list arguments (e.g. the formats filter of files) are
+    not sizes: a filter may match the whole table, and its empty lists match
+    every row.
+
+    Attributes:
+        max_cost: The cost an operation may have, None for no limit.
+        max_depth: The depth an operation may have, None for no limit.
+        weights: The weights of the fields, by "Type.field" (1 for the object
+            fields and 0 for the scalar ones by default).
+        key_arguments: The list argument whose length is the size of the list
+            fields returning one item per key, by "Type.field".
+        list_sizes: The expected cardinality of the list fields, by
+            "Type.field".
+        default_list_size: The expected cardinality of the other list fields.
+    """
+
+    max_cost: int | None = pydantic.Field(default=20_000, gt=0)
+    max_depth: int | None = pydantic.Field(default=10, gt=0)
+    weights: dict[str, int] = {}
+    key_arguments: dict[str, str] = {
+        "Query.standardsByNumdos": "numdos",
+        "Query.filesByKeys": "keys",
+    }
+    list_sizes: dict[str, int] = {
+        "Query.standards": 1_000,
+        "Query.files": 10_000,
+        "StandardType.files": 10,
+    }
+    default_list_size: int = pydantic.Field(default=10, ge=0)
+
+    Config = _PydanticConfig
+
+
+class Cost(pydantic.BaseModel):
+    """
+    Represents the static cost of a GraphQL operation.
+
+    Attributes:
+        cost: The cost of the operation.
+        depth: The depth of the operation (1 for the root fields).
+    """
+
+    cost: int = 0
+    depth: int = 0
+
+
+def cost_of(
+    schema: GraphQLSchema,
+    document: DocumentNode,
+    variables: dict[str, Any] | None = None,
+    operation_name: str | None = None,
+    limits: CostLimits | None = None,
+) -> Cost:
+    """
+    Compute the static cost of a GraphQL operation, before executing it.
+
+    The introspection fields are ignored.
+
+    Args:
+        schema: The GraphQL schema.
+        document: The parsed and validated document.
+        variables: The variables of the operation.
+        operation_name: The name of the operation, if the document has many.
+        limits: The weights and list sizes.
+
+    Returns:
+        The cost and depth of the operation.
+    """
+    limits = limits if limits is not None else CostLimits()
+    operation: OperationDefinitionNode | None = get_operation_ast(
+        document, operation_name
+    )
+    root: GraphQLObjectType | None = (
+        schema.get_root_type(operation.operation) if operation else None
+    )
+    if operation is None or root is None:
+        return Cost()
+    fragments: dict[str, FragmentDefinitionNode] = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    return _Analysis(schema, fragments, variables or {}, limits).selection_set(
+        root, operation.selection_set, None
+    )
+
+
+class _Analysis:
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        fragments: dict[str, FragmentDefinitionNode],
+        variables: dict[str, Any],
+        limits: CostLimits,
+    ) -> None:
+        self.schema: GraphQLSchema = schema
+        self.fragments: dict[str, FragmentDefinitionNode] = fragments
+        self.variables: dict[str, Any] = variables
+        self.limits: CostLimits = limits
+
+    def selection_set(
+        self,
+        parent: GraphQLObjectType,
+        selection_set: SelectionSetNode | None,
+        first: int | None,
+    ) -> Cost:
+        """
+        The cost of the fields selected on an object type, the first argument of
+        the field of the object sizing their lists.
+        """
+        total: Cost = Cost()
+        for node in self._fields(parent, selection_set):
+            if node.name.value.startswith("__"):
+                continue
+            field: GraphQLField | None = parent.fields.get(node.name.value)
+            if field is None:
+                continue
+            cost: Cost = self.field(parent, node, field, first)
+            total.cost += cost.cost
+            total.depth = max(total.depth, cost.depth)
+        return total
+
+    def field(
+        self,
+        parent: GraphQLObjectType,
+        node: FieldNode,
+        field: GraphQLField,
+        first: int | None,
+    ) -> Cost:
+        key: str = f"{parent.name}.{node.name.value}"
+        named: GraphQLNamedType = get_named_type(field.type)
+        if not isinstance(named, GraphQLObjectType):
+            return Cost(cost=self.limits.weights.get(key, 0), depth=1)
+        weight: int = self.limits.weights.get(key, 1)
+        arguments: dict[str, Any] = self._arguments(field, node)
+        size: int = 1
+        output: GraphQLOutputType = field.type
+        if isinstance(output, GraphQLNonNull):
+            output = output.of_type
+        if isinstance(output, GraphQLList):
+            keys: Any = arguments.get(self.limits.key_arguments.get(key, ""))
+            if isinstance(keys, list):
+                size = len(keys)
+            elif first is not None:
+                size = first
+            else:
+                size = self.limits.list_sizes.get(key, self.limits.default_list_size)
+        first_argument: Any = arguments.get("first")
+        children: Cost = self.selection_set(
+            named,
+            node.selection_set,
+            first_argument if isinstance(first_argument, int) else None,
+        )
+        return Cost(cost=size * (weight + children.cost), depth=children.depth + 1)
+
+    def _arguments(self, field: GraphQLField, node: FieldNode) -> dict[str, Any]:
+        try:
+            return get_argument_values(field, node, self.variables)
+        except GraphQLError:
+            # Invalid variables are reported by the execution
+            return {}
+
+    def _fields(
+        self, parent: GraphQLObjectType, selection_set: SelectionSetNode | None
+    ) -> Iterator[FieldNode]:
+        """
+        The fields of a selection set, the ones of its fragments included.
+        """
+        for selection in selection_set.selections if selection_set else ():
+            if isinstance(selection, FieldNode):
+                yield selection
+            elif isinstance(selection, InlineFragmentNode):
+                yield from self._fields(parent, selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment: FragmentDefinitionNode | None = self.fragments.get(
+                    selection.name.value
+                )
+                if fragment is not None:
+                    yield from self._fields(parent, fragment.selection_set)
+
+
+class QueryCost(SchemaExtension):
+    """
+    Rejects the operations over the cost or depth limits before executing them,
+    and reports the cost of the others in the "cost" extension of the response.
+
+    Use QueryCost.with_limits to set other limits than the default ones.
+    """
+
+    limits: ClassVar[CostLimits] = CostLimits()
+
+    _cost: Cost | None = None
+
+    @classmethod
+    def with_limits(cls, limits: CostLimits) -> type[QueryCost]:
+        """
+        Create the extension with other limits.
+
+        Args:
+            limits: The limits.
+
+        Returns:
+            The extension class.
+        """
+        return type(cls.__name__, (cls,), {"limits": limits})
+
+    def on_execute(self) -> Iterator[None]:
+        context: Any = self.execution_context
+        if context.graphql_document is not None and context.result is None:
+            self._cost = cost_of(
+                context.schema._schema,
+                context.graphql_document,
+                context.variables,
+                context.operation_name,
+                self.limits,
+            )
+            error: GraphQLError | None = self._check(self._cost)
+            if error is not None:
+                context.result = ExecutionResult(data=None, errors=[error])
+        yield
+
+    def get_results(self) -> dict[str, Any]:
+        if self._cost is None:
+            return {}
+        return {
+            "cost": {
+                "requestedQueryCost": self._cost.cost,
+                "maximumAvailable": self.limits.max_cost,
+                "depth": self._cost.depth,
+                "maximumDepth": self.limits.max_depth,
+            }
+        }
+
+    def _check(self, cost: Cost) -> GraphQLError | None:
+        message: str | None = None
+        max_cost: int | None = self.limits.max_cost
+        max_depth: int | None = self.limits.max_depth
+        if max_depth is not None and cost.depth > max_depth:
+            message = f"Query depth {cost.depth} exceeds the maximum of {max_depth}"
+        elif max_cost is not None and cost.cost > max_cost:
+            message = f"Query cost {cost.cost} exceeds the maximum of {max_cost}"
+        if message is None:
+            return None
+        return GraphQLError(message, extensions={"code": "QUERY_TOO_COMPLEX"})
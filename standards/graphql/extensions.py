@@ -0,0 +1,47 @@
+import time
+from inspect import isawaitable
+from typing import Any, Callable
+from graphql import GraphQLResolveInfo
+from strawberry.extensions import SchemaExtension
+from strawberry.utils.await_maybe import AwaitableOrValue
+
+
+__all__: list[str] = ["ResolverMetrics"]
+
+
+class ResolverMetrics(SchemaExtension):
+    """
+    Times the resolvers of the Query fields into the metrics of the context, if
+    any (see standards.metrics.Metrics).
+
+    The nested fields are not timed, their cost is part of their root field.
+    """
+
+    def resolve(
+        self,
+        _next: Callable,
+        root: Any,
+        info: GraphQLResolveInfo,
+        *args: str,
+        **kwargs: Any,
+    ) -> AwaitableOrValue[object]:
+        metrics: Any = None
+        if info.parent_type.name == "Query" and isinstance(info.context, dict):
+            metrics = info.context.get("metrics")
+        if metrics is None:
+            return _next(root, info, *args, **kwargs)
+        start: float = time.perf_counter()
+        result: Any = _next(root, info, *args, **kwargs)
+        if not isawaitable(result):
+            metrics.resolvers.observe((info.field_name,), time.perf_counter() - start)
+            return result
+
+        async def observed() -> Any:
+            try:
+                return await result
+            finally:
+                metrics.resolvers.observe(
+                    (info.field_name,), time.perf_counter() - start
+                )
+
+        return observed()
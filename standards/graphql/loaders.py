@@ -0,0 +1,65 @@
+from __future__ import annotations
+from typing import Any
+import pydantic
+from strawberry.dataloader import DataLoader
+from ..db import MyDb
+from ..db.models import File, Standard
+from .._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = ["Loaders", "get_loaders"]
+
+
+class Loaders(pydantic.BaseModel):
+    """
+    Represents the DataLoaders of a GraphQL request, batching the lookups of the
+    relationships of every resolved object into one query per level.
+
+    Attributes:
+        standard: Loads a Standard (without its files) by numdos.
+        files: Loads the Files (without their standard) of a standard by numdos.
+    """
+
+    standard: DataLoader
+    files: DataLoader
+
+    Config = _PydanticConfig
+
+    @classmethod
+    def create(cls, db: MyDb) -> Loaders:
+        """
+        Create the DataLoaders of a request.
+
+        Args:
+            db: The MyDb instance for database operations.
+
+        Returns:
+            The DataLoaders, with empty caches.
+        """
+
+        async def load_standards(numdos: list[str]) -> list[Standard | None]:
+            return await db.get_standards_by_numdos(numdos, options=())
+
+        async def load_files(numdos: list[str]) -> list[list[File]]:
+            return await db.get_files_by_numdos(numdos, options=())
+
+        return cls(
+            standard=DataLoader(load_fn=load_standards),
+            files=DataLoader(load_fn=load_files),
+        )
+
+
+def get_loaders(context: dict[str, Any]) -> Loaders:
+    """
+    Get the DataLoaders of the current GraphQL request, creating them if the
+    context does not provide them yet.
+
+    Args:
+        context: The context of the request, holding the MyDb instance.
+
+    Returns:
+        The DataLoaders of the request.
+    """
+    if "loaders" not in context:
+        context["loaders"] = Loaders.create(context["db"])
+    return context["loaders"]
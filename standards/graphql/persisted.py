@@ -0,0 +1,177 @@
+from __future__ import annotations
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Mapping
+import pydantic
+from graphql import GraphQLError
+from strawberry.exceptions import StrawberryGraphQLError
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http.exceptions import HTTPException
+from strawberry.types import ExecutionResult
+from .._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = [
+    "DEFAULT_PERSISTED_QUERIES_SIZE",
+    "PersistedQueries",
+    "PersistedQueryNotFound",
+    "PersistedQueryRouter",
+]
+
+
+DEFAULT_PERSISTED_QUERIES_SIZE: int = 1_000
+
+
+class PersistedQueryNotFound(Exception):
+    """
+    Raised when a request only sends the hash of a query that is not known
+    (yet), the client is expected to send it again along with the query.
+    """
+
+
+class PersistedQueries(pydantic.BaseModel):
+    """
+    Represents the queries registered by the clients, by the SHA-256 hash of
+    their text (automatic persisted queries), the least recently used ones
+    being evicted first.
+
+    Attributes:
+        maxsize: The number of queries to keep.
+    """
+
+    maxsize: int = pydantic.Field(default=DEFAULT_PERSISTED_QUERIES_SIZE, gt=0)
+
+    _queries: OrderedDict[str, str] = pydantic.PrivateAttr(default_factory=OrderedDict)
+
+    Config = _PydanticConfig
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def get(self, sha256: str) -> str | None:
+        """
+        Get a registered query.
+
+        Args:
+            sha256: The hexadecimal SHA-256 hash of the query.
+
+        Returns:
+            The query, or None if it is not registered.
+        """
+        query: str | None = self._queries.get(sha256.lower())
+        if query is not None:
+            self._queries.move_to_end(sha256.lower())
+        return query
+
+    def register(self, sha256: str, query: str) -> None:
+        """
+        Register a query, evicting the least recently used one if full.
+
+        Args:
+            sha256: The hexadecimal SHA-256 hash of the query.
+            query: The query.
+
+        Raises:
+            ValueError: If the hash is not the one of the query.
+        """
+        sha256 = sha256.lower()
+        if hashlib.sha256(query.encode()).hexdigest() != sha256:
+            raise ValueError("The provided sha256Hash does not match the query")
+        self._queries[sha256] = query
+        self._queries.move_to_end(sha256)
+        while len(self._queries) > self.maxsize:
+            self._queries.popitem(last=False)
+
+    def resolve(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Resolve the query of a GraphQL request following the automatic
+        persisted queries protocol: a request with the hash of its query in
+        extensions.persistedQuery.sha256Hash may omit the query if it has
+        already been registered, and registers it otherwise.
+
+        Args:
+            data: The GraphQL request (query, variables, operationName and
+                extensions).
+
+        Returns:
+            The GraphQL request, along with its query.
+
+        Raises:
+            PersistedQueryNotFound: If the request only has the hash of an
+                unknown query.
+            ValueError: If the persisted query is invalid.
+        """
+        extensions: Any = data.get("extensions")
+        persisted: Any = (
+            extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+        )
+        if persisted is None:
+            return data
+        if not isinstance(persisted, dict) or persisted.get("version", 1) != 1:
+            raise ValueError("Unsupported persisted query version")
+        sha256: Any = persisted.get("sha256Hash")
+        if not isinstance(sha256, str):
+            raise ValueError("The persisted query has no sha256Hash")
+        query: Any = data.get("query")
+        if query:
+            self.register(sha256, query)
+            return data
+        query = self.get(sha256)
+        if query is None:
+            raise PersistedQueryNotFound(sha256)
+        return {**data, "query": query}
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """
+    GraphQL router supporting the automatic persisted queries, in the JSON body
+    of POST requests as well as in the extensions parameter of GET requests.
+    """
+
+    def __init__(
+        self, *args: Any, persisted_queries: PersistedQueries | None = None, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.persisted_queries: PersistedQueries = (
+            persisted_queries if persisted_queries is not None else PersistedQueries()
+        )
+
+    async def execute_operation(self, *args: Any, **kwargs: Any) -> ExecutionResult:
+        try:
+            return await super().execute_operation(*args, **kwargs)
+        except PersistedQueryNotFound:
+            error: GraphQLError = StrawberryGraphQLError(
+                "PersistedQueryNotFound",
+                extensions={"code": "PERSISTED_QUERY_NOT_FOUND"},
+            )
+            return ExecutionResult(data=None, errors=[error])
+
+    def should_render_graphiql(self, request: Any) -> bool:
+        # A GET request with the hash of its query only is not a browser's
+        return (
+            "extensions" not in request.query_params
+            and super().should_render_graphiql(request)
+        )
+
+    def parse_json(self, data: str | bytes) -> dict[str, Any]:
+        parsed: Any = super().parse_json(data)
+        return self._resolve(parsed) if isinstance(parsed, dict) else parsed
+
+    def parse_query_params(
+        self, params: Mapping[str, str | list[str] | None]
+    ) -> dict[str, Any]:
+        parsed: dict[str, Any] = super().parse_query_params(params)
+        extensions: Any = parsed.get("extensions")
+        if isinstance(extensions, str):
+            try:
+                parsed["extensions"] = json.loads(extensions)
+            except json.JSONDecodeError as e:
+                raise HTTPException(400, "Unable to parse extensions as JSON") from e
+        return self._resolve(parsed)
+
+    def _resolve(self, data: dict[str, Any]) -> dict[str, Any]:
+        try:
+            return self.persisted_queries.resolve(data)
+        except ValueError as e:
+            raise HTTPException(400, str(e)) from e
@@ -0,0 +1,129 @@
+from __future__ import annotations
+from typing import Any, Iterable
+from sqlalchemy.orm import load_only, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+from strawberry.types.nodes import SelectedField, Selection
+from ..db import PlannedOptions
+from ..db.models import File, Standard
+
+
+__all__: list[str] = ["file_options", "selections_of", "standard_options"]
+
+
+_FILE_COLUMNS: dict[str, Any] = {
+    "id": File.id,
+    "name": File.name,
+    "numdosvl": File.numdosvl,
+    "numdos": File.numdos,
+    "format": File.format,
+    "language": File.language,
+}
+
+
+def selections_of(info: Any, *path: str) -> list[Selection] | None:
+    """
+    Get the selections of the field being resolved, or of one of its subfields.
+
+    Args:
+        info: The info of the resolver.
+        *path: The names of the subfields to follow (e.g. "edges", "node").
+
+    Returns:
+        The selections, or None if they are not known (e.g. when the resolver is
+        not called by the GraphQL executor).
+    """
+    selected_fields: list[SelectedField] | None = getattr(info, "selected_fields", None)
+    if not selected_fields:
+        return None
+    selections: list[Selection] = selected_fields[0].selections
+    for name in path:
+        selections = _fields(selections).get(name, [])
+    return selections
+
+
+def standard_options(selections: list[Selection] | None) -> list[ORMOption]:
+    """
+    Build the loader options of a query on Standard retrieving only what has
+    been selected.
+
+    Args:
+        selections: The selections of the StandardType, None if they are not
+            known.
+
+    Returns:
+        The loader options (nothing but the numdos column if the files are not
+        selected).
+    """
+    if selections is None:
+        return []
+    fields: dict[str, list[Selection]] = _fields(selections)
+    options: list[ORMOption] = [load_only(Standard.numdos)]
+    key: tuple = ("numdos",)
+    if "files" in fields:
+        files: list[str] = _file_columns(fields["files"])
+        options.append(
+            selectinload(Standard.files).load_only(
+                *(_FILE_COLUMNS[name] for name in files)
+            )
+        )
+        key += (("files", tuple(files)),)
+    return PlannedOptions(options, key)
+
+
+def file_options(selections: list[Selection] | None) -> list[ORMOption]:
+    """
+    Build the loader options of a query on File retrieving only what has been
+    selected.
+
+    Args:
+        selections: The selections of the FileType, None if they are not known.
+
+    Returns:
+        The loader options (only the selected columns, and the standard and its
+        files only if they are selected).
+    """
+    if selections is None:
+        return []
+    fields: dict[str, list[Selection]] = _fields(selections)
+    columns: list[str] = _file_columns(selections)
+    options: list[ORMOption] = [load_only(*(_FILE_COLUMNS[name] for name in columns))]
+    key: tuple = tuple(columns)
+    if "standard" in fields:
+        standard_fields: dict[str, list[Selection]] = _fields(fields["standard"])
+        if "files" in standard_fields:
+            files: list[str] = _file_columns(standard_fields["files"])
+            options.append(
+                selectinload(File.standard)
+                .selectinload(Standard.files)
+                .load_only(*(_FILE_COLUMNS[name] for name in files))
+            )
+            key += (("standard", ("files", tuple(files))),)
+        else:
+            options.append(selectinload(File.standard))
+            key += (("standard",),)
+    return PlannedOptions(options, key)
+
+
+def _file_columns(selections: list[Selection]) -> list[str]:
+    """
+    The names of the File columns to load for the given selections, always
+    including the ones identifying the file, needed to paginate, to look it up
+    and to load its standard.
+    """
+    names: Iterable[str] = _fields(selections).keys() | {"id", "numdos", "numdosvl"}
+    return [name for name in sorted(names) if name in _FILE_COLUMNS]
+
+
+def _fields(selections: list[Selection]) -> dict[str, list[Selection]]:
+    """
+    Group the subselections of the selected fields by field name, going through
+    fragments.
+    """
+    fields: dict[str, list[Selection]] = {}
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            fields.setdefault(selection.name, []).extend(selection.selections)
+        else:
+            for name, subselections in _fields(selection.selections).items():
+                fields.setdefault(name, []).extend(subselections)
+    return fields
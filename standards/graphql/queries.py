@@ -1,8 +1,46 @@
+from typing import Any, Callable
 import strawberry
 from strawberry.types import ExecutionContext
-from .types import FileType, StandardType
-from ..db import MyDb
+from .._private.enum import FileFormat, FileLanguage
+from .planning import file_options, selections_of, standard_options
+from .types import (
+    Connection,
+    Edge,
+    FileKeyInput,
+    FileType,
+    PageInfo,
+    StandardType,
+    StatsType,
+)
+from ..db import MyDb, Page
 from ..db.models import File, Standard
+from ..db.pagination import DEFAULT_PAGE_SIZE, encode_cursor
+
+
+def _to_connection(
+    page: Page, to_node: Callable[[Any], Any], key: Callable[[Any], Any]
+) -> Connection:
+    """
+    Convert a page retrieved from MyDb into a Relay connection.
+
+    Args:
+        page: The page of database instances.
+        to_node: The function converting an instance into its GraphQL type.
+        key: The function retrieving the pagination key of an instance.
+
+    Returns:
+        The connection.
+    """
+    edges: list[Edge] = [
+        Edge(cursor=encode_cursor(key(item)), node=to_node(item)) for item in page.items
+    ]
+    return Connection(
+        edges=edges,
+        page_info=PageInfo(
+            has_next_page=page.next_cursor is not None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
 
 
 @strawberry.type
@@ -28,8 +66,10 @@ class Query:
             The retrieved standard, or None if not found.
         """
         db: MyDb = info.context["db"]
-        standard: Standard | None = await db.get_standard(numdos)
-        return StandardType(**standard) if standard else None
+        standard: Standard | None = await db.get_standard(
+            numdos, options=standard_options(selections_of(info))
+        )
+        return StandardType.from_model(standard) if standard else None
 
     @strawberry.field
     async def file(
@@ -47,35 +87,221 @@ class Query:
             The retrieved file, or None if not found.
         """
         db: MyDb = info.context["db"]
-        file: File | None = await db.get_file(numdos, numdosvl)
-        return FileType(**file) if file else None
+        file: File | None = await db.get_file(
+            numdos, numdosvl, options=file_options(selections_of(info))
+        )
+        return FileType.from_model(file) if file else None
 
     @strawberry.field
-    async def standards(self, info: ExecutionContext) -> list[StandardType]:
+    async def standards(
+        self, info: ExecutionContext, numdos_prefix: str | None = None
+    ) -> list[StandardType]:
         """
         Resolver method to retrieve all standards.
 
         Args:
             info: The execution context.
+            numdos_prefix: The prefix the numdos of the standards must start
+                with (optional).
 
         Returns:
             The list of all standards.
         """
         db: MyDb = info.context["db"]
-        standards: list[Standard] = await db.get_standards()
-        return [StandardType(**std) for std in standards]
+        standards: list[Standard] = await db.get_standards(
+            numdos_prefix=numdos_prefix, options=standard_options(selections_of(info))
+        )
+        return [StandardType.from_model(std) for std in standards]
 
     @strawberry.field
-    async def files(self, info: ExecutionContext) -> list[FileType]:
+    async def files(
+        self,
+        info: ExecutionContext,
+        formats: list[FileFormat] | None = None,
+        languages: list[FileLanguage] | None = None,
+        numdos_prefix: str | None = None,
+    ) -> list[FileType]:
         """
-        Resolver method to retrieve all files.
+        Resolver method to retrieve all files, filtered by the database.
 
         Args:
             info: The execution context.
+            formats: The formats the files must have one of (optional).
+            languages: The languages the files must have one of (optional).
+            numdos_prefix: The prefix the numdos of the files must start with
+                (optional).
 
         Returns:
             The list of all files.
         """
         db: MyDb = info.context["db"]
-        files: list[File] = await db.get_files()
-        return [FileType(**file) for file in files]
+        files: list[File] = await db.get_files(
+            formats=formats,
+            languages=languages,
+            numdos_prefix=numdos_prefix,
+            options=file_options(selections_of(info)),
+        )
+        return [FileType.from_model(file) for file in files]
+
+    @strawberry.field
+    async def standards_by_numdos(
+        self, info: ExecutionContext, numdos: list[str]
+    ) -> list[StandardType | None]:
+        """
+        Resolver method to retrieve many standards by numdos at once.
+
+        Args:
+            info: The execution context.
+            numdos: The numdos of the standards to retrieve.
+
+        Returns:
+            The retrieved standards, in the same order as numdos, with None for
+            the ones not found.
+        """
+        db: MyDb = info.context["db"]
+        standards: list[Standard | None] = await db.get_standards_by_numdos(
+            numdos, options=standard_options(selections_of(info))
+        )
+        return [StandardType.from_model(std) if std else None for std in standards]
+
+    @strawberry.field
+    async def files_by_keys(
+        self, info: ExecutionContext, keys: list[FileKeyInput]
+    ) -> list[FileType | None]:
+        """
+        Resolver method to retrieve many files by numdos and numdosvl at once.
+
+        Args:
+            info: The execution context.
+            keys: The numdos and numdosvl of the files to retrieve.
+
+        Returns:
+            The retrieved files, in the same order as keys, with None for the
+            ones not found.
+        """
+        db: MyDb = info.context["db"]
+        files: list[File | None] = await db.get_files_by_keys(
+            [(key.numdos, key.numdosvl) for key in keys],
+            options=file_options(selections_of(info)),
+        )
+        return [FileType.from_model(file) if file else None for file in files]
+
+    @strawberry.field
+    async def standards_connection(
+        self,
+        info: ExecutionContext,
+        numdos_prefix: str | None = None,
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[StandardType]:
+        """
+        Resolver method to retrieve a page of standards, ordered by numdos.
+
+        Args:
+            info: The execution context.
+            numdos_prefix: The prefix the numdos of the standards must start
+                with (optional).
+            first: The maximum number of standards to retrieve.
+            after: The end cursor of the previous page (optional).
+
+        Returns:
+            The connection of standards.
+        """
+        db: MyDb = info.context["db"]
+        page: Page[Standard] = await db.get_standards_page(
+            numdos_prefix=numdos_prefix,
+            limit=first,
+            cursor=after,
+            options=standard_options(selections_of(info, "edges", "node")),
+        )
+        return _to_connection(page, StandardType.from_model, lambda std: std.numdos)
+
+    @strawberry.field
+    async def files_connection(
+        self,
+        info: ExecutionContext,
+        formats: list[FileFormat] | None = None,
+        languages: list[FileLanguage] | None = None,
+        numdos_prefix: str | None = None,
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[FileType]:
+        """
+        Resolver method to retrieve a page of files, ordered by id.
+
+        Args:
+            info: The execution context.
+            formats: The formats the files must have one of (optional).
+            languages: The languages the files must have one of (optional).
+            numdos_prefix: The prefix the numdos of the files must start with
+                (optional).
+            first: The maximum number of files to retrieve.
+            after: The end cursor of the previous page (optional).
+
+        Returns:
+            The connection of files.
+        """
+        db: MyDb = info.context["db"]
+        page: Page[File] = await db.get_files_page(
+            formats=formats,
+            languages=languages,
+            numdos_prefix=numdos_prefix,
+            limit=first,
+            cursor=after,
+            options=file_options(selections_of(info, "edges", "node")),
+        )
+        return _to_connection(page, FileType.from_model, lambda file: file.id)
+
+    @strawberry.field
+    async def search(
+        self,
+        info: ExecutionContext,
+        query: str,
+        formats: list[FileFormat] | None = None,
+        languages: list[FileLanguage] | None = None,
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[FileType]:
+        """
+        Resolver method to search the files by the words of their name and of
+        their numdos and numdosvl, the best matches first.
+
+        Args:
+            info: The execution context.
+            query: The search query, whose terms must all match (whole words,
+                or prefixes for the terms ending with *, e.g. NF12*).
+            formats: The formats the files must have one of (optional).
+            languages: The languages the files must have one of (optional).
+            first: The maximum number of files to retrieve.
+            after: The end cursor of the previous page (optional).
+
+        Returns:
+            The connection of files.
+        """
+        db: MyDb = info.context["db"]
+        page: Page[File] = await db.search(
+            query,
+            formats=formats,
+            languages=languages,
+            limit=first,
+            cursor=after,
+            options=file_options(selections_of(info, "edges", "node")),
+        )
+        return _to_connection(
+            page, FileType.from_model, lambda file: [file.search_rank, file.id]
+        )
+
+    @strawberry.field
+    async def stats(self, info: ExecutionContext) -> StatsType:
+        """
+        Resolver method to retrieve the numbers of files by format, language
+        and prefix of the numdos of their standard.
+
+        Args:
+            info: The execution context.
+
+        Returns:
+            The statistics of the files.
+        """
+        db: MyDb = info.context["db"]
+        return StatsType.from_model(await db.get_stats())
@@ -1,6 +1,16 @@
 from __future__ import annotations
+from typing import Generic, TypeVar
 import strawberry
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstanceState
+from strawberry.types import ExecutionContext
+from .loaders import get_loaders
 from .._private.enum import FileFormat, FileLanguage
+from ..db.models import File, Standard
+from ..db.stats import FileStats
+
+
+T = TypeVar("T")
 
 
 @strawberry.type
@@ -10,11 +20,48 @@ class StandardType:
 
     Attributes:
         numdos: The numdos attribute of the standard type.
-        files: The list of files associated with the standard type.
+        files: The list of files associated with the standard type, loaded
+            through the request's DataLoaders when None.
     """
 
     numdos: str
-    files: list[FileType]
+    files: strawberry.Private[list[FileType] | None] = None
+
+    @classmethod
+    def from_model(cls, standard: Standard) -> StandardType:
+        """
+        Convert a Standard into its GraphQL type, keeping its files only if they
+        have already been loaded.
+
+        Args:
+            standard: The Standard instance.
+
+        Returns:
+            The standard type.
+        """
+        self: StandardType = cls(numdos=standard.numdos)
+        if "files" not in inspect(standard).unloaded:
+            self.files = [
+                FileType.from_model(file, standard=self) for file in standard.files
+            ]
+        return self
+
+    @strawberry.field(name="files")
+    async def resolve_files(self, info: ExecutionContext) -> list[FileType]:
+        """
+        Resolver method to retrieve the files of the standard, batched with the
+        ones of every other standard of the request.
+
+        Args:
+            info: The execution context.
+
+        Returns:
+            The list of files associated with the standard.
+        """
+        if self.files is None:
+            files: list[File] = await get_loaders(info.context).files.load(self.numdos)
+            self.files = [FileType.from_model(file, standard=self) for file in files]
+        return self.files
 
 
 @strawberry.type
@@ -27,15 +74,174 @@ class FileType:
         name: The name of the file type.
         numdosvl: The numdosvl attribute of the file type.
         numdos: The numdos attribute of the file type.
-        standard: The associated standard type.
         format: The file format of the file type.
         language: The language of the file type.
+        standard: The associated standard type, loaded through the request's
+            DataLoaders when None.
     """
 
     id: int
     name: str
     numdosvl: str
     numdos: str
-    standard: StandardType
     format: strawberry.enum(FileFormat)  # type: ignore # mypy's wrong
     language: strawberry.enum(FileLanguage)  # type: ignore # mypy's wrong
+    standard: strawberry.Private[StandardType | None] = None
+
+    @classmethod
+    def from_model(cls, file: File, standard: StandardType | None = None) -> FileType:
+        """
+        Convert a File into its GraphQL type, keeping its columns and its
+        standard only if they have already been loaded.
+
+        Args:
+            file: The File instance.
+            standard: The standard type the file belongs to, if already known.
+
+        Returns:
+            The file type.
+        """
+        state: InstanceState = inspect(file)
+        if standard is None and "standard" not in state.unloaded:
+            standard = StandardType.from_model(file.standard)
+        # The columns identifying the file are always loaded, the other ones left
+        # out of the query are set to placeholders, as they are not selected
+        return cls(
+            id=file.id,
+            name=state.dict.get("name", ""),
+            numdosvl=file.numdosvl,
+            numdos=file.numdos,
+            format=state.dict.get("format"),
+            language=state.dict.get("language"),
+            standard=standard,
+        )
+
+    @strawberry.field(name="standard")
+    async def resolve_standard(self, info: ExecutionContext) -> StandardType:
+        """
+        Resolver method to retrieve the standard of the file, batched with the
+        ones of every other file of the request.
+
+        Args:
+            info: The execution context.
+
+        Returns:
+            The associated standard type.
+        """
+        if self.standard is None:
+            standard: Standard = await get_loaders(info.context).standard.load(
+                self.numdos
+            )
+            self.standard = StandardType.from_model(standard)
+        return self.standard
+
+
+@strawberry.type
+class CountType:
+    """
+    Represents the number of files having a value.
+
+    Attributes:
+        value: The value, e.g. pdf.
+        count: The number of files having the value.
+    """
+
+    value: str
+    count: int
+
+
+@strawberry.type
+class StatsType:
+    """
+    Represents the numbers of files, in total and by format, language and
+    prefix of the numdos of their standard.
+
+    Attributes:
+        files: The number of files.
+        formats: The number of files of every format.
+        languages: The number of files of every language.
+        prefixes: The number of files by prefix of numdos.
+    """
+
+    files: int
+    formats: list[CountType]
+    languages: list[CountType]
+    prefixes: list[CountType]
+
+    @classmethod
+    def from_model(cls, stats: FileStats) -> StatsType:
+        """
+        Convert the statistics of the files into their GraphQL type.
+
+        Args:
+            stats: The FileStats instance.
+
+        Returns:
+            The stats type.
+        """
+
+        def counts(by_value: dict[str, int]) -> list[CountType]:
+            return [CountType(value=v, count=c) for v, c in by_value.items()]
+
+        return cls(
+            files=stats.files,
+            formats=counts(stats.formats),
+            languages=counts(stats.languages),
+            prefixes=counts(stats.prefixes),
+        )
+
+
+@strawberry.input
+class FileKeyInput:
+    """
+    Represents the key of a file, to look it up.
+
+    Attributes:
+        numdos: The numdos of the file.
+        numdosvl: The numdosvl of the file.
+    """
+
+    numdos: str
+    numdosvl: str
+
+
+@strawberry.type
+class PageInfo:
+    """
+    Represents the pagination information of a connection.
+
+    Attributes:
+        has_next_page: Whether there are more items after this page.
+        end_cursor: The cursor of the last item of the page.
+    """
+
+    has_next_page: bool
+    end_cursor: str | None
+
+
+@strawberry.type
+class Edge(Generic[T]):
+    """
+    Represents an item of a connection.
+
+    Attributes:
+        cursor: The cursor pointing to the item.
+        node: The item itself.
+    """
+
+    cursor: str
+    node: T
+
+
+@strawberry.type
+class Connection(Generic[T]):
+    """
+    Represents a page of items, following the Relay connection specification.
+
+    Attributes:
+        edges: The items of the page, along with their cursors.
+        page_info: The pagination information.
+    """
+
+    edges: list[Edge[T]]
+    page_info: PageInfo
@@ -0,0 +1,305 @@
+from __future__ import annotations
+import time
+from bisect import bisect_left
+from typing import Any, Iterator
+from weakref import WeakKeyDictionary, WeakSet
+import pydantic
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ._private.pydantic import Config as _PydanticConfig
+
+
+__all__: list[str] = [
+    "CONTENT_TYPE",
+    "DEFAULT_BUCKETS",
+    "Gauge",
+    "Histogram",
+    "Metrics",
+    "MetricsMiddleware",
+]
+
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+
+CONTENT_TYPE: str = "text/plain; version=0.0.4"
+
+
+class Histogram(pydantic.BaseModel):
+    """
+    Represents a Prometheus histogram, with one series per combination of
+    label values.
+
+    Attributes:
+        name: The name of the metric.
+        documentation: The help text of the metric.
+        label_names: The names of the labels.
+        buckets: The upper bounds of the buckets, in seconds.
+    """
+
+    name: str
+    documentation: str
+    label_names: tuple[str, ...]
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+
+    # Label values -> [count of every bucket..., count of +Inf, sum]
+    _series: dict[tuple[str, ...], list[float]] = pydantic.PrivateAttr(
+        default_factory=dict
+    )
+
+    Config = _PydanticConfig
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        """
+        Record an observation.
+
+        Args:
+            labels: The label values, in the order of label_names.
+            value: The observed value, in seconds.
+        """
+        series: list[float] | None = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, labels: tuple[str, ...]) -> int:
+        """
+        Get the number of observations of a series.
+
+        Args:
+            labels: The label values of the series.
+
+        Returns:
+            The number of observations.
+        """
+        series: list[float] | None = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> Iterator[str]:
+        """
+        Render the histogram in the Prometheus text format.
+
+        Yields:
+            The lines of the histogram.
+        """
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        bounds: list[str] = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        for labels, series in self._series.items():
+            pairs: str = _labels(self.label_names, labels)
+            cumulative: float = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                bucket_pairs: str = f'{pairs + "," if pairs else ""}le="{bound}"'
+                yield f"{self.name}_bucket{{{bucket_pairs}}} {cumulative:g}"
+            yield f"{self.name}_sum{{{pairs}}} {series[-1]:.6f}"
+            yield f"{self.name}_count{{{pairs}}} {cumulative:g}"
+
+
+class Gauge(pydantic.BaseModel):
+    """
+    Represents a Prometheus gauge.
+
+    Attributes:
+        name: The name of the metric.
+        documentation: The help text of the metric.
+        value: The current value.
+    """
+
+    name: str
+    documentation: str
+    value: float = 0
+
+    def render(self) -> Iterator[str]:
+        """
+        Render the gauge in the Prometheus text format.
+
+        Yields:
+            The lines of the gauge.
+        """
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self.value:g}"
+
+
+class Metrics(pydantic.BaseModel):
+    """
+    Represents the metrics of the application.
+
+    Attributes:
+        requests: The latency of the HTTP requests, by method, route and status.
+        in_flight: The number of HTTP requests being handled.
+        resolvers: The latency of the GraphQL Query fields, by field.
+        statements: The latency of the SQL statements, by operation and table.
+    """
+
+    requests: Histogram = pydantic.Field(
+        default_factory=lambda: Histogram(
+            name="http_request_duration_seconds",
+            documentation="Latency of the HTTP requests.",
+            label_names=("method", "route", "status"),
+        )
+    )
+    in_flight: Gauge = pydantic.Field(
+        default_factory=lambda: Gauge(
+            name="http_requests_in_flight",
+            documentation="Number of HTTP requests being handled.",
+        )
+    )
+    resolvers: Histogram = pydantic.Field(
+        default_factory=lambda: Histogram(
+            name="graphql_resolver_duration_seconds",
+            documentation="Latency of the resolvers of the GraphQL Query fields.",
+            label_names=("field",),
+        )
+    )
+    statements: Histogram = pydantic.Field(
+        default_factory=lambda: Histogram(
+            name="sql_statement_duration_seconds",
+            documentation="Latency of the SQL statements.",
+            label_names=("operation", "table"),
+        )
+    )
+
+    _engines: WeakSet[Engine] = pydantic.PrivateAttr(default_factory=WeakSet)
+    # The start of the statements being executed, by execution: the ones which
+    # fail are forgotten along with their execution
+    _started: WeakKeyDictionary[ExecutionContext, float] = pydantic.PrivateAttr(
+        default_factory=WeakKeyDictionary
+    )
+
+    Config = _PydanticConfig
+
+    def instrument_engine(self, engine: AsyncEngine) -> None:
+        """
+        Time the SQL statements executed by an engine.
+
+        Args:
+            engine: The engine to instrument (idempotent).
+        """
+        sync_engine: Engine = engine.sync_engine
+        if sync_engine in self._engines:
+            return
+        self._engines.add(sync_engine)
+        event.listen(sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_execute)
+
+    def render(self, gauges: dict[str, float] | None = None) -> str:
+        """
+        Render every metric in the Prometheus text format.
+
+        Args:
+            gauges: Other gauges to render, by name (e.g. the pool statistics),
+                read when rendering.
+
+        Returns:
+            The text exposition of the metrics.
+        """
+        lines: list[str] = [
+            *self.requests.render(),
+            *self.in_flight.render(),
+            *self.resolvers.render(),
+            *self.statements.render(),
+        ]
+        for name, value in (gauges or {}).items():
+            lines.extend(Gauge(name=name, documentation=name, value=value).render())
+        return "\n".join(lines) + "\n"
+
+    def _before_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        self._started[context] = time.perf_counter()
+
+    def _after_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        started: float | None = self._started.pop(context, None)
+        if started is not None:
+            elapsed: float = time.perf_counter() - started
+            self.statements.observe(_statement_labels(statement), elapsed)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing the HTTP requests by route, and counting the ones in
+    flight.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics) -> None:
+        self.app: ASGIApp = app
+        self.metrics: Metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status: int = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.in_flight.value += 1
+        start: float = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_flight.value -= 1
+            route: Any = scope.get("route")
+            self.metrics.requests.observe(
+                (scope["method"], getattr(route, "path", "<unmatched>"), str(status)),
+                time.perf_counter() - start,
+            )
+
+
+_TABLE_KEYWORDS: dict[str, str] = {
+    "SELECT": "FROM",
+    "DELETE": "FROM",
+    "INSERT": "INTO",
+    "UPDATE": "UPDATE",
+}
+
+
+def _statement_labels(statement: str) -> tuple[str, str]:
+    """
+    The operation and the (first) table of a SQL statement, as low cardinality
+    labels.
+    """
+    words: list[str] = statement.split(None, 64)
+    operation: str = words[0].upper() if words else ""
+    keyword: str | None = _TABLE_KEYWORDS.get(operation)
+    table: str = ""
+    if keyword is not None:
+        upper: list[str] = [word.upper() for word in words]
+        if keyword in upper[:-1]:
+            name: str = words[upper.index(keyword) + 1]
+            table = "(subquery)" if name.startswith("(") else name.strip('"`;')
+            table = table.split(".")[-1]
+    return operation, table
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
@@ -0,0 +1,135 @@
+from typing import TYPE_CHECKING, Any
+import pydantic
+from ._private.enum import FileFormat, FileLanguage
+from .db.pagination import MAX_PAGE_SIZE
+
+
+__all__: list[str] = [
+    "FileKey",
+    "FileKeys",
+    "FileOut",
+    "FileRow",
+    "FileWithStandardOut",
+    "NumdosList",
+    "StandardKeyOut",
+    "StandardOut",
+    "StandardRow",
+]
+
+
+class FileKey(pydantic.BaseModel):
+    """
+    Represents the key of a file in a request body.
+
+    Attributes:
+        numdos: The numdos of the file.
+        numdosvl: The numdosvl of the file.
+    """
+
+    numdos: str
+    numdosvl: str
+
+
+if TYPE_CHECKING:
+    NumdosList = list[str]
+    FileKeys = list[FileKey]
+else:
+    NumdosList = pydantic.conlist(str, max_items=MAX_PAGE_SIZE)
+    FileKeys = pydantic.conlist(FileKey, max_items=MAX_PAGE_SIZE)
+
+
+class StandardRow(pydantic.BaseModel):
+    """
+    Represents a standard row, as exported and imported.
+
+    Attributes:
+        numdos: The numdos of the standard.
+    """
+
+    numdos: str = pydantic.Field(..., regex=r"^[A-Z]{2}\d+$")
+
+
+class FileRow(pydantic.BaseModel):
+    """
+    Represents a file row, as exported and imported.
+
+    Attributes:
+        id: The ID of the file, None to insert it as a new file.
+        name: The name of the file.
+        numdosvl: The numdosvl of the file, only its second character may differ
+            from the numdos.
+        numdos: The numdos of the standard of the file.
+        format: The format of the file.
+        language: The language of the file.
+    """
+
+    id: int | None = None
+    name: str
+    numdosvl: str
+    numdos: str = pydantic.Field(..., regex=r"^[A-Z]{2}\d+$")
+    format: FileFormat
+    language: FileLanguage
+
+    @pydantic.root_validator(skip_on_failure=True)
+    def numdosvl_matches_numdos(cls, values: dict[str, Any]) -> dict[str, Any]:
+        numdos: str = values["numdos"]
+        numdosvl: str = values["numdosvl"]
+        if len(numdosvl) < 2 or numdosvl[0] + numdosvl[2:] != numdos[0] + numdos[2:]:
+            raise ValueError(f"numdosvl {numdosvl} does not match numdos {numdos}")
+        return values
+
+
+class FileOut(pydantic.BaseModel):
+    """
+    Represents a file in a response body, without its standard.
+
+    Attributes:
+        id: The ID of the file.
+        name: The name of the file.
+        numdos: The numdos of the standard of the file.
+        numdosvl: The numdosvl of the file.
+        format: The format of the file.
+        language: The language of the file.
+    """
+
+    id: int
+    name: str
+    numdos: str
+    numdosvl: str
+    format: FileFormat
+    language: FileLanguage
+
+
+class StandardKeyOut(pydantic.BaseModel):
+    """
+    Represents the key of the standard of a file in a response body.
+
+    Attributes:
+        numdos: The numdos of the standard.
+    """
+
+    numdos: str
+
+
+class FileWithStandardOut(FileOut):
+    """
+    Represents a file in a response body, along with the key of its standard.
+
+    Attributes:
+        standard: The key of the standard of the file.
+    """
+
+    standard: StandardKeyOut
+
+
+class StandardOut(pydantic.BaseModel):
+    """
+    Represents a standard in a response body, along with its files.
+
+    Attributes:
+        numdos: The numdos of the standard.
+        files: The files of the standard.
+    """
+
+    numdos: str
+    files: list[FileOut]
@@ -0,0 +1,44 @@
+import json
+import pytest
+from standards._private.stats import percentile
+from standards.commands.benchmark import benchmark
+
+
+def test_percentile() -> None:
+    values: list[float] = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 90) == pytest.approx(4.6)
+    assert percentile([7.0], 99) == 7.0
+
+
+@pytest.mark.asyncio
+async def test_benchmark(tmp_path) -> None:
+    output = tmp_path / "results.json"
+    report: dict = await benchmark(
+        sizes=(20,), repeat=2, scan_repeat=1, data_dir=tmp_path, output=output
+    )
+    assert json.loads(output.read_text()) == report
+    timings: list[dict] = report["results"]["20"]
+    assert {timing["kind"] for timing in timings} == {"db", "rest", "graphql"}
+    assert {
+        "graphql.standards_connection.nested",
+        "db.search",
+        "db.get_files.filtered",
+        "GET /stats",
+        "GET /metrics",
+    } <= {t["name"] for t in timings}
+    for timing in timings:
+        assert timing["runs"] in (1, 2)
+        assert timing["min"] <= timing["p50"] <= timing["p99"] <= timing["max"]
+    # The seeded database is reused by the next runs
+    assert (tmp_path / "standards-20-0.sqlite").exists()
+
+
+@pytest.mark.asyncio
+async def test_benchmark_only_and_without_scans(tmp_path) -> None:
+    report: dict = await benchmark(
+        sizes=(20,), repeat=1, scan_repeat=0, data_dir=tmp_path, only="db."
+    )
+    names: list[str] = [timing["name"] for timing in report["results"]["20"]]
+    assert names and all(name.startswith("db.") for name in names)
+    assert "db.get_standards" not in names
@@ -0,0 +1,63 @@
+import json
+import pytest
+from standards._private.enum import FileFormat
+from standards.commands.catalog import export_catalog, import_catalog
+from standards.commands.random_populate import random_populate
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("suffix", ["csv", "ndjson"])
+async def test_export_import_round_trip(tmp_path, dump, suffix: str) -> None:
+    source: str = f"sqlite+aiosqlite:///{tmp_path / 'source.sqlite'}"
+    target: str = f"sqlite+aiosqlite:///{tmp_path / 'target.sqlite'}"
+    await random_populate(source, amount=30, batch_size=10, seed=1)
+    for table in ("standards", "files"):
+        path = tmp_path / f"{table}.{suffix}"
+        exported: int = await export_catalog(source, table, path, chunk_size=7)
+        assert await import_catalog(target, table, path, chunk_size=7) == exported
+    assert await dump(source) == await dump(target)
+
+
+@pytest.mark.asyncio
+async def test_import_upserts_files(tmp_path, dump) -> None:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    path = tmp_path / "files.ndjson"
+    row: dict = {
+        "id": 1,
+        "name": "a.xml",
+        "numdosvl": "AB1",
+        "numdos": "AB1",
+        "format": "xml",
+        "language": "fr",
+    }
+    path.write_text(json.dumps(row) + "\n")
+    await import_catalog(db_url, "files", path)
+    path.write_text(
+        json.dumps({**row, "format": "pdf"})
+        + "\n"
+        + json.dumps({**row, "id": None, "numdosvl": "AE1"})
+        + "\n"
+    )
+    await import_catalog(db_url, "files", path)
+    standards, files = await dump(db_url)
+    assert standards == ["AB1"]
+    assert [(file.id, file.numdosvl, file.format) for file in files] == [
+        (1, "AB1", FileFormat.PDF),
+        (2, "AE1", FileFormat.XML),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_validates_every_row_first(tmp_path) -> None:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    path = tmp_path / "files.csv"
+    path.write_text(
+        "id,name,numdosvl,numdos,format,language\n"
+        ",a.xml,AB1,AB1,xml,fr\n"
+        ",b.xml,XB1,AB1,xml,fr\n"
+        ",c.xml,ab2,ab2,doc,fr\n"
+    )
+    with pytest.raises(ValueError, match="2 invalid rows") as error:
+        await import_catalog(db_url, "files", path)
+    assert "Row 2" in str(error.value) and "Row 3" in str(error.value)
+    assert not (tmp_path / "db.sqlite").exists()
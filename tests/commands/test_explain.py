@@ -0,0 +1,47 @@
+import json
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from standards.commands.explain import ACCESS_PATHS, explain
+from standards.commands.random_populate import random_populate
+
+
+@pytest_asyncio.fixture
+async def db_url(tmp_path) -> str:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    await random_populate(db_url, amount=50, seed=1)
+    return db_url
+
+
+@pytest.mark.asyncio
+async def test_explain(db_url: str, tmp_path) -> None:
+    output = tmp_path / "plans.json"
+    plans = await explain(db_url, output=output)
+    assert json.loads(output.read_text()) == [plan.dict() for plan in plans]
+    assert {plan.path for plan in plans} == set(ACCESS_PATHS)
+    assert not [f for plan in plans for f in plan.findings if f.is_regression]
+    scans = {f.key for plan in plans if plan.path == "files" for f in plan.findings}
+    assert "full_scan:files" in scans
+
+
+@pytest.mark.asyncio
+async def test_explain_flags_missing_index(db_url: str) -> None:
+    engine: AsyncEngine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP INDEX ix_files_numdos_numdosvl"))
+    await engine.dispose()
+    plans = await explain(db_url, only="file")
+    regressions = {
+        (plan.path, f.key) for plan in plans for f in plan.findings if f.is_regression
+    }
+    assert ("file", "full_scan:files") in regressions
+    assert ("graphql_files_by_keys", "full_scan:files") in regressions
+
+
+@pytest.mark.asyncio
+async def test_explain_empty_database(tmp_path) -> None:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'empty.sqlite'}"
+    await random_populate(db_url, amount=0)
+    with pytest.raises(ValueError, match="empty database"):
+        await explain(db_url)
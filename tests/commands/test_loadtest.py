@@ -0,0 +1,58 @@
+import json
+import pytest
+import pytest_asyncio
+from standards.commands.loadtest import loadtest, parse_mix
+from standards.commands.random_populate import random_populate
+
+
+def test_parse_mix() -> None:
+    assert parse_mix("standard=3, file,graphql_standard=0.5") == {
+        "standard": 3.0,
+        "file": 1.0,
+        "graphql_standard": 0.5,
+    }
+    with pytest.raises(ValueError, match="Unknown scenario"):
+        parse_mix("standard,unknown=1")
+    with pytest.raises(ValueError, match="must be positive"):
+        parse_mix("standard=0")
+    with pytest.raises(ValueError, match="no scenario"):
+        parse_mix("")
+
+
+@pytest_asyncio.fixture
+async def db_url(tmp_path) -> str:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    await random_populate(db_url, amount=20, seed=1)
+    return db_url
+
+
+@pytest.mark.asyncio
+async def test_loadtest_closed_loop(db_url: str, tmp_path) -> None:
+    output = tmp_path / "report.json"
+    report: dict = await loadtest(
+        db_url=db_url, duration=0.5, concurrency=2, seed=1, output=output
+    )
+    assert json.loads(output.read_text()) == report
+    total: dict = report["total"]
+    assert total["requests"] > 0
+    assert total["errors"] == 0
+    assert sum(total["histogram"].values()) == total["requests"]
+    assert total["requests"] == sum(s["requests"] for s in report["scenarios"])
+
+
+@pytest.mark.asyncio
+async def test_loadtest_open_loop(db_url: str) -> None:
+    report: dict = await loadtest(
+        db_url=db_url,
+        duration=0.5,
+        concurrency=4,
+        rate=40,
+        mix="standard,graphql_connection",
+        seed=1,
+    )
+    assert [s["name"] for s in report["scenarios"]] == [
+        "standard",
+        "graphql_connection",
+    ]
+    assert 0 < report["total"]["requests"] < 60
+    assert report["total"]["error_rate"] == 0
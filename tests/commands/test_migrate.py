@@ -0,0 +1,16 @@
+import pytest
+from standards.commands.migrate import migrate
+from standards.db.migrations import SCHEMA_VERSION
+
+
+@pytest.mark.asyncio
+async def test_migrate(tmp_path, capsys) -> None:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    pending = await migrate(db_url, dry_run=True)
+    assert len(pending) == SCHEMA_VERSION
+    assert f"Schema version 0, {SCHEMA_VERSION} pending" in capsys.readouterr().out
+    assert await migrate(db_url) == pending
+    assert f"Schema version 0 -> {SCHEMA_VERSION}." in capsys.readouterr().out
+    assert await migrate(db_url) == []
+    with pytest.raises(ValueError):
+        await migrate(db_url, target=0)
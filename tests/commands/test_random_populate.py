@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from standards.commands.random_populate import random_populate
+from standards.db.models import Standard
+
+
+@pytest.mark.asyncio
+async def test_random_populate_in_batches(tmp_path, dump) -> None:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    await random_populate(db_url, amount=25, batch_size=10, seed=1)
+    standards, files = await dump(db_url, ids=False)
+    assert len(standards) == 25
+    assert {file.numdos for file in files} == set(standards)
+
+
+@pytest.mark.asyncio
+async def test_random_populate_is_reproducible(tmp_path, dump) -> None:
+    first: str = f"sqlite+aiosqlite:///{tmp_path / 'first.sqlite'}"
+    second: str = f"sqlite+aiosqlite:///{tmp_path / 'second.sqlite'}"
+    await random_populate(first, amount=20, batch_size=7, seed=42)
+    await random_populate(second, amount=20, batch_size=7, seed=42)
+    assert await dump(first, ids=False) == await dump(second, ids=False)
+
+
+@pytest.mark.asyncio
+async def test_random_populate_skips_existing_standards(tmp_path) -> None:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    await random_populate(db_url, amount=10, seed=3)
+    await random_populate(db_url, amount=10, seed=3)
+    engine: AsyncEngine = create_async_engine(db_url)
+    async with engine.connect() as conn:
+        count: int = (
+            await conn.execute(select(func.count()).select_from(Standard))
+        ).scalar()
+    await engine.dispose()
+    assert count == 10
+
+
+@pytest.mark.asyncio
+async def test_random_populate_does_not_depend_on_workers(tmp_path, dump) -> None:
+    serial: str = f"sqlite+aiosqlite:///{tmp_path / 'serial.sqlite'}"
+    parallel: str = f"sqlite+aiosqlite:///{tmp_path / 'parallel.sqlite'}"
+    await random_populate(serial, amount=50, batch_size=10, seed=7)
+    await random_populate(parallel, amount=50, batch_size=10, seed=7, workers=2)
+    assert await dump(serial, ids=False) == await dump(parallel, ids=False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kwargs", [{"batch_size": 0}, {"workers": -1}])
+async def test_random_populate_invalid_arguments(tmp_path, kwargs) -> None:
+    with pytest.raises(ValueError, match="must be at least 1"):
+        await random_populate(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}", **kwargs)
+    assert not (tmp_path / "db.sqlite").exists()
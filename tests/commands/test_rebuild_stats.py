@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from standards.commands.random_populate import random_populate
+from standards.commands.rebuild_stats import rebuild_stats
+from standards.db import MyDb
+
+
+@pytest.mark.asyncio
+async def test_rebuild_stats(tmp_path, capsys) -> None:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+    await random_populate(db_url, amount=20, seed=1)
+    db: MyDb = await MyDb.start(db_url)
+    expected = await db.get_stats()
+    engine: AsyncEngine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM file_counts"))
+    await engine.dispose()
+    assert (await db.get_stats()).files == 0
+    capsys.readouterr()
+    assert await rebuild_stats(db_url) == expected
+    assert f"{expected.files} files counted by 4 formats" in capsys.readouterr().out
+    assert await db.get_stats() == expected
+    await db.close()
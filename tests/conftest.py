@@ -0,0 +1,69 @@
+from typing import Any, AsyncIterator, Awaitable, Callable
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from standards._private.enum import FileFormat, FileLanguage
+from standards.db import MyDb
+from standards.db.models import Base, File, Standard
+
+
+@pytest.fixture
+def make_file() -> Callable[..., File]:
+    def make_file(
+        numdos: str,
+        fmt: FileFormat,
+        language: FileLanguage,
+        name: str | None = None,
+        numdosvl: str | None = None,
+    ) -> File:
+        return File(
+            name=name or f"{numdos}.{fmt.value}",
+            numdos=numdos,
+            numdosvl=numdosvl or numdos,
+            format=fmt,
+            language=language,
+        )
+
+    return make_file
+
+
+@pytest_asyncio.fixture
+async def make_db(tmp_path) -> AsyncIterator[Callable[[list[Any]], Awaitable[MyDb]]]:
+    dbs: list[MyDb] = []
+
+    async def make_db(rows: list[Any]) -> MyDb:
+        db: MyDb = await MyDb.start(
+            f"sqlite+aiosqlite:///{tmp_path / f'db{len(dbs)}.sqlite'}"
+        )
+        dbs.append(db)
+        async with db.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with db.session() as session:
+            session.add_all(rows)
+            await session.commit()
+        return db
+
+    yield make_db
+    for db in dbs:
+        await db.close()
+
+
+@pytest.fixture
+def dump() -> Callable[..., Awaitable[tuple[list, list]]]:
+    async def dump(db_url: str, ids: bool = True) -> tuple[list, list]:
+        """
+        The sorted numdos of the standards and rows of the files of a database,
+        with or without their ids.
+        """
+        columns: list[Column] = [
+            column for column in File.__table__.columns if ids or column.name != "id"
+        ]
+        engine: AsyncEngine = create_async_engine(db_url)
+        async with engine.connect() as conn:
+            standards = (await conn.execute(select(Standard.numdos))).scalars().all()
+            files = (await conn.execute(select(*columns).order_by(*columns))).all()
+        await engine.dispose()
+        return sorted(standards), files
+
+    return dump
@@ -0,0 +1,69 @@
+import gc
+import logging
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from standards.db import MyDb, QueryAccounting, QueryStats
+from standards.db.accounting import shape_of
+from standards.db.models import Base, Standard
+
+
+def test_shape_of() -> None:
+    assert shape_of("SELECT a\n FROM t WHERE x = ? AND y IN (?, ?,?)") == (
+        "SELECT a FROM t WHERE x = ? AND y IN ?"
+    )
+    assert shape_of("SELECT a FROM t WHERE y IN (?)") == shape_of(
+        "SELECT a FROM t WHERE y IN (?, ?)"
+    )
+
+
+def test_check(caplog: pytest.LogCaptureFixture) -> None:
+    accounting: QueryAccounting = QueryAccounting(max_queries=2, max_repeats=1)
+    stats: QueryStats = QueryStats()
+    stats.record("SELECT a FROM t WHERE x = ?", 0.001)
+    assert accounting.check(stats) == []
+    stats.record("SELECT a FROM t WHERE x = ?", 0.001)
+    stats.record("SELECT b FROM t", 0.001)
+    with caplog.at_level(logging.WARNING):
+        problems: list[str] = accounting.check(stats, "GET /test")
+    assert problems == [
+        "3 queries (budget: 2)",
+        "2 times the same query: SELECT a FROM t WHERE x = ?",
+    ]
+    assert "GET /test: 3 queries (budget: 2)" in caplog.text
+    assert QueryAccounting(max_queries=None, max_repeats=None).check(stats) == []
+
+
+@pytest.mark.asyncio
+async def test_track() -> None:
+    accounting: QueryAccounting = QueryAccounting()
+    db: MyDb = await MyDb.start("sqlite+aiosqlite://", accounting=accounting)
+    accounting.instrument(db.engine)  # Idempotent
+    async with db.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with db.session() as session:
+        session.add_all(Standard(numdos=numdos) for numdos in ("AB1", "AB2", "AB3"))
+        await session.commit()
+    with accounting.track() as stats:
+        for numdos in ("AB1", "AB2", "AB3"):
+            await db.get_standard(numdos)
+    await db.get_standard("AB1")  # Not tracked
+    await db.close()
+    assert stats.queries == 6
+    assert stats.time > 0
+    assert sorted(stats.shapes.values()) == [3, 3]
+
+
+@pytest.mark.asyncio
+async def test_track_failed_statement() -> None:
+    accounting: QueryAccounting = QueryAccounting()
+    db: MyDb = await MyDb.start("sqlite+aiosqlite://", accounting=accounting)
+    with accounting.track() as stats:
+        async with db.engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("SELECT * FROM missing"))
+            await conn.execute(text("SELECT 1"))
+    await db.close()
+    gc.collect()
+    assert not accounting._started
+    assert stats.queries == 1
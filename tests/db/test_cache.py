@@ -0,0 +1,87 @@
+import pytest
+from pytest_mock import MockerFixture
+from standards.db.cache import LRUCache
+
+
+async def _load(value):
+    return value
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_and_miss() -> None:
+    cache: LRUCache = LRUCache(maxsize=2)
+    assert await cache.get_or_load("a", "AB1", lambda: _load(1)) == 1
+    assert await cache.get_or_load("a", "AB1", lambda: _load(2)) == 1
+    assert await cache.get_or_load("b", "AB1", lambda: _load(None)) is None
+    assert cache.stats() == {
+        "size": 1,
+        "maxsize": 2,
+        "hits": 1,
+        "misses": 2,
+        "evictions": 0,
+        "expirations": 0,
+        "invalidations": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_cache_lru_eviction() -> None:
+    cache: LRUCache = LRUCache(maxsize=2)
+    await cache.get_or_load("a", "AB1", lambda: _load(1))
+    await cache.get_or_load("b", "AB2", lambda: _load(2))
+    await cache.get_or_load("a", "AB1", lambda: _load(1))
+    await cache.get_or_load("c", "AB3", lambda: _load(3))
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert await cache.get_or_load("b", "AB2", lambda: _load(20)) == 20
+    assert await cache.get_or_load("c", "AB3", lambda: _load(30)) == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_ttl(mocker: MockerFixture) -> None:
+    monotonic = mocker.patch("standards.db.cache.time.monotonic", return_value=0)
+    cache: LRUCache = LRUCache(ttl=10)
+    await cache.get_or_load("a", "AB1", lambda: _load(1))
+    monotonic.return_value = 11
+    assert await cache.get_or_load("a", "AB1", lambda: _load(2)) == 2
+    assert cache.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidate() -> None:
+    cache: LRUCache = LRUCache()
+    cache.set("a", "AB1", 1)
+    cache.set("b", "AB1", 2)
+    cache.set("c", "AB2", 3)
+    cache.invalidate("AB1")
+    cache.invalidate("AB3")
+    assert len(cache) == 1
+    assert cache.invalidations == 2
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_while_loading() -> None:
+    cache: LRUCache = LRUCache()
+
+    async def load() -> int:
+        cache.invalidate("AB1")
+        return 1
+
+    assert await cache.get_or_load("a", "AB1", load) == 1
+    assert len(cache) == 0
+    assert await cache.get_or_load("a", "AB1", lambda: _load(2)) == 2
+    assert await cache.get_or_load("a", "AB1", lambda: _load(3)) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_cleared_while_loading() -> None:
+    cache: LRUCache = LRUCache()
+
+    async def load() -> int:
+        cache.clear()
+        return 1
+
+    assert await cache.get_or_load("a", "AB1", load) == 1
+    assert len(cache) == 0
@@ -0,0 +1,169 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from standards.db.migrations import (
+    SCHEMA_VERSION,
+    pending_migrations,
+    schema_version,
+    upgrade,
+)
+from standards._private.enum import FileFormat, FileLanguage
+from standards.db import MyDb
+from standards.db.models import track_versions
+
+
+# The schema of the databases created before the migrations, the index on the
+# files and the table_versions table
+LEGACY_DDL: tuple[str, ...] = (
+    "CREATE TABLE standards ("
+    r"numdos VARCHAR NOT NULL CHECK (numdos REGEXP '^[A-Z]{2}\d+$'), "
+    "PRIMARY KEY (numdos))",
+    "CREATE TABLE files (id INTEGER NOT NULL, name VARCHAR NOT NULL, "
+    "numdosvl VARCHAR NOT NULL, numdos VARCHAR NOT NULL, "
+    "format VARCHAR(5) NOT NULL, language VARCHAR(2) NOT NULL, "
+    "PRIMARY KEY (id), FOREIGN KEY(numdos) REFERENCES standards (numdos))",
+)
+
+
+@pytest_asyncio.fixture
+async def legacy(tmp_path) -> AsyncEngine:
+    engine: AsyncEngine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'legacy.sqlite'}"
+    )
+    async with engine.begin() as conn:
+        for statement in LEGACY_DDL:
+            await conn.execute(text(statement))
+        await conn.execute(text("INSERT INTO standards VALUES ('AB1')"))
+        await conn.execute(
+            text("INSERT INTO files VALUES (1, 'guide.pdf', 'AB1', 'AB1', 'PDF', 'EN')")
+        )
+    yield engine
+    await engine.dispose()
+
+
+def _indexes(conn) -> list[str]:
+    return [index["name"] for index in inspect(conn).get_indexes("files")]
+
+
+async def _plan(engine: AsyncEngine, statement: str) -> str:
+    async with engine.connect() as conn:
+        rows = await conn.execute(text(f"EXPLAIN QUERY PLAN {statement}"))
+        return " ".join(row.detail for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_migrations_upgrade_legacy_database(legacy: AsyncEngine) -> None:
+    lookup: str = "SELECT * FROM files WHERE numdos = 'AB1' AND numdosvl = 'AB1'"
+    assert "SCAN files" in await _plan(legacy, lookup)
+    async with legacy.begin() as conn:
+        assert await conn.run_sync(schema_version) == 0
+        applied = await conn.run_sync(upgrade)
+    assert [m.version for m in applied] == list(range(1, SCHEMA_VERSION + 1))
+    async with legacy.connect() as conn:
+        assert "ix_files_numdos_numdosvl" in await conn.run_sync(_indexes)
+        assert await conn.run_sync(schema_version) == SCHEMA_VERSION
+        assert (await conn.execute(text("SELECT * FROM standards"))).all() == [("AB1",)]
+        assert (await conn.execute(text("SELECT * FROM files"))).all() == [
+            (1, "guide.pdf", "AB1", "AB1", 3, 2)
+        ]
+        triggers = (
+            await conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            )
+        ).scalars()
+        assert {
+            f"{name}_version_{operation}"
+            for name in ("standards", "files")
+            for operation in ("insert", "update", "delete")
+        } <= set(triggers)
+    assert "USING INDEX ix_files_numdos_numdosvl" in await _plan(legacy, lookup)
+    assert "USING INDEX ix_files_numdos_numdosvl" in await _plan(
+        legacy, "SELECT * FROM files WHERE numdos IN ('AB1', 'AB2')"
+    )
+    async with legacy.begin() as conn:
+        assert await conn.run_sync(upgrade) == []
+        await conn.run_sync(track_versions)
+        before = (await conn.execute(text("SELECT * FROM table_versions"))).all()
+        await conn.execute(text("INSERT INTO standards VALUES ('AB2')"))
+        await conn.execute(text("DELETE FROM files"))
+        after = (await conn.execute(text("SELECT * FROM table_versions"))).all()
+    assert dict(after) == {name: version + 1 for name, version in before}
+
+
+@pytest.mark.asyncio
+async def test_migrations_target(legacy: AsyncEngine) -> None:
+    async with legacy.begin() as conn:
+        assert [m.version for m in await conn.run_sync(upgrade, 1)] == [1]
+        assert "ix_files_numdos_numdosvl" not in await conn.run_sync(_indexes)
+        assert [m.version for m in await conn.run_sync(pending_migrations)] == list(
+            range(2, SCHEMA_VERSION + 1)
+        )
+        with pytest.raises(ValueError, match="Cannot downgrade"):
+            await conn.run_sync(upgrade, 0)
+        with pytest.raises(ValueError, match="Unknown schema version"):
+            await conn.run_sync(upgrade, SCHEMA_VERSION + 1)
+
+
+@pytest.mark.asyncio
+async def test_migrations_create_empty_database(tmp_path) -> None:
+    engine: AsyncEngine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'new.sqlite'}"
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade)
+    async with engine.connect() as conn:
+        assert "ix_files_numdos_numdosvl" in await conn.run_sync(_indexes)
+        assert await conn.run_sync(schema_version) == SCHEMA_VERSION
+        versions = (await conn.execute(text("SELECT * FROM table_versions"))).all()
+    await engine.dispose()
+    assert {name for name, _ in versions} == {"standards", "files"}
+
+
+@pytest.mark.asyncio
+async def test_migrations_code_enums(tmp_path) -> None:
+    # A database whose files stored the names of the members of their enums
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'legacy.sqlite'}"
+    engine: AsyncEngine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade, 3)
+        await conn.execute(text("DROP TABLE files"))
+        await conn.execute(
+            text(
+                "CREATE TABLE files (id INTEGER NOT NULL PRIMARY KEY, "
+                "name VARCHAR NOT NULL, numdosvl VARCHAR NOT NULL, "
+                "numdos VARCHAR NOT NULL REFERENCES standards (numdos), "
+                "format VARCHAR(5) NOT NULL, language VARCHAR(2) NOT NULL)"
+            )
+        )
+        await conn.execute(text("INSERT INTO standards VALUES ('AB1')"))
+        await conn.execute(
+            text(
+                "INSERT INTO files VALUES"
+                " (7, 'guide.pdf', 'AV1', 'AB1', 'PDFRL', 'EN'),"
+                " (9, 'guide.xml', 'AB1', 'AB1', 'XML', 'FR')"
+            )
+        )
+        assert [m.version for m in await conn.run_sync(upgrade)] == list(
+            range(4, SCHEMA_VERSION + 1)
+        )
+    async with engine.connect() as conn:
+        stored = (await conn.execute(text("SELECT * FROM files"))).all()
+        indexes: list[str] = await conn.run_sync(_indexes)
+        triggers = (
+            await conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            )
+        ).scalars()
+    await engine.dispose()
+    assert stored == [
+        (7, "guide.pdf", "AV1", "AB1", 4, 2),
+        (9, "guide.xml", "AB1", "AB1", 1, 1),
+    ]
+    assert {"ix_files_format_language", "ix_files_language"} <= set(indexes)
+    assert {"files_version_insert", "files_fts_insert"} <= set(triggers)
+    db: MyDb = await MyDb.start(db_url)
+    files = (await db.search("guide", languages=[FileLanguage.EN])).items
+    assert [(file.id, file.format) for file in files] == [(7, FileFormat.PDFRL)]
+    assert [file.id for file in await db.get_files(formats=[FileFormat.XML])] == [9]
+    await db.close()
@@ -4,14 +4,14 @@ MAINLY DEVELOPED BY CHATGPT
 
 import pytest
 import pytest_asyncio
-from sqlalchemy import text
+from sqlalchemy import create_mock_engine, select, text
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
     AsyncEngine,
     AsyncSession,
 )
-from standards.db.models import Base, Standard, File
+from standards.db.models import Base, CodedEnum, Standard, File, TableVersion
 from standards._private.enum import FileFormat, FileLanguage
 from standards._private.types import AsyncSessionMaker
 
@@ -101,3 +101,69 @@ async def test_file(session: AsyncSessionMaker, setup: None) -> None:
         assert file.language == FileLanguage.EN
 
         assert "numdosvl" in dict(**file)
+
+
+@pytest.mark.asyncio
+async def test_table_versions(session: AsyncSessionMaker, setup: None) -> None:
+    async with session() as s:
+        versions = dict(
+            (await s.execute(select(TableVersion.name, TableVersion.version)))
+            .tuples()
+            .all()
+        )
+        s.add(Standard(numdos="AB123456"))
+        await s.flush()
+        s.add(
+            File(
+                name="file.txt",
+                numdosvl="AB123456",
+                numdos="AB123456",
+                format=FileFormat.PDF,
+                language=FileLanguage.EN,
+            )
+        )
+        await s.flush()
+        assert dict(
+            (await s.execute(select(TableVersion.name, TableVersion.version)))
+            .tuples()
+            .all()
+        ) == {"standards": versions["standards"] + 1, "files": versions["files"] + 1}
+
+
+def test_table_versions_only_kept_on_sqlite() -> None:
+    statements: list[str] = []
+    engine = create_mock_engine(
+        "postgresql://", lambda sql, *_, **__: statements.append(str(sql))
+    )
+    Base.metadata.create_all(engine, checkfirst=False)
+    assert any("CREATE TABLE table_versions" in sql for sql in statements)
+    assert not any("INSERT INTO table_versions" in sql for sql in statements)
+    assert not any("_version_" in sql for sql in statements)
+
+
+@pytest.mark.asyncio
+async def test_file_enums_as_codes(session: AsyncSessionMaker, setup: None) -> None:
+    async with session() as s:
+        s.add(
+            File(
+                name="file.xml",
+                numdosvl="AB123456",
+                standard=Standard(numdos="AB123456"),
+                format=FileFormat.XMLRL,
+                language=FileLanguage.EN,
+            )
+        )
+        await s.flush()
+        stored = (await s.execute(text("SELECT format, language FROM files"))).one()
+        assert tuple(stored) == (2, 2)
+        file = (
+            await s.execute(select(File).where(File.format.in_(["xmlrl", "pdf"])))
+        ).scalar_one()
+        assert (file.format, file.language) == (FileFormat.XMLRL, FileLanguage.EN)
+
+
+def test_coded_enum_codes() -> None:
+    with pytest.raises(ValueError, match="needs its own code"):
+        CodedEnum(FileLanguage, {FileLanguage.FR: 1})
+    with pytest.raises(ValueError, match="needs its own code"):
+        CodedEnum(FileLanguage, {FileLanguage.FR: 1, FileLanguage.EN: 1})
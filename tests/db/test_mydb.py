@@ -2,9 +2,10 @@
 MAINLY DEVELOPED BY CHATGPT
 """
 
+import asyncio
 import pytest
 import pytest_asyncio
-from sqlalchemy import text
+from sqlalchemy import event, select, text
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
@@ -13,7 +14,8 @@ from sqlalchemy.ext.asyncio import (
 )
 from standards._private.enum import FileFormat, FileLanguage
 from standards.db.models import Base, Standard, File
-from standards.db import MyDb
+from standards.db import LRUCache, MyDb, SingleFlight
+from standards.db.pagination import encode_cursor
 from standards._private.types import AsyncSessionMaker
 
 
@@ -133,3 +135,357 @@ async def test_my_db_get_file(db: MyDb, setup: None) -> None:
 
     result = await db.get_file(numdos="NonExistent")
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_my_db_session_is_closed(db: MyDb) -> None:
+    async with db.session() as session:
+        await session.execute(text("SELECT 1"))
+        assert session.in_transaction()
+    assert not session.in_transaction()
+
+
+@pytest.mark.asyncio
+async def test_my_db_request_session_is_shared(db: MyDb) -> None:
+    dependency = db.request_session()
+    request_session: AsyncSession = await anext(dependency)
+    async with db.session() as session:
+        assert session is request_session
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+    async with db.session() as session:
+        assert session is not request_session
+
+
+@pytest.mark.asyncio
+async def test_my_db_request_session_not_shared_concurrently(db: MyDb) -> None:
+    dependency = db.request_session()
+    request_session: AsyncSession = await anext(dependency)
+    used: list[AsyncSession] = []
+
+    async def operation() -> None:
+        async with db.session() as session:
+            used.append(session)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(operation(), operation())
+    assert used[0] is request_session
+    assert used[1] is not request_session
+    async with db.session() as session:
+        assert session is request_session
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+
+
+@pytest.mark.asyncio
+async def test_my_db_pool_options(tmp_path) -> None:
+    db: MyDb = await MyDb.start(
+        f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}",
+        pool_size=3,
+        max_overflow=2,
+        pool_recycle=60,
+        pool_pre_ping=True,
+    )
+    assert db.engine_options == {
+        "pool_size": 3,
+        "max_overflow": 2,
+        "pool_recycle": 60,
+        "pool_pre_ping": True,
+    }
+    async with db.session() as session:
+        await session.execute(text("SELECT 1"))
+        assert db.pool_stats()["checkedout"] == 1
+    assert db.pool_stats() == {
+        "size": 3,
+        "checkedin": 1,
+        "checkedout": 0,
+        "overflow": -2,
+    }
+    await db.close()
+    assert db.pool_stats() == {}
+
+
+@pytest_asyncio.fixture
+async def populated_db(db: MyDb, setup: None) -> MyDb:
+    async with db.session() as session:
+        for numdos in ("AB3", "AB1", "AB2"):
+            session.add(
+                Standard(
+                    numdos=numdos,
+                    files=[
+                        File(
+                            name=f"{numdos}.pdf",
+                            numdosvl=numdos,
+                            format=FileFormat.PDF,
+                            language=FileLanguage.FR,
+                        )
+                    ],
+                )
+            )
+        await session.commit()
+    return db
+
+
+@pytest.mark.asyncio
+async def test_my_db_get_standards_page(populated_db: MyDb) -> None:
+    page = await populated_db.get_standards_page(limit=2)
+    assert [std.numdos for std in page.items] == ["AB1", "AB2"]
+    assert page.next_cursor is not None
+
+    page = await populated_db.get_standards_page(limit=2, cursor=page.next_cursor)
+    assert [std.numdos for std in page.items] == ["AB3"]
+    assert page.items[0].files[0].name == "AB3.pdf"
+    assert page.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_my_db_get_files_page(populated_db: MyDb) -> None:
+    page = await populated_db.get_files_page(limit=3)
+    assert [file.id for file in page.items] == [1, 2, 3]
+    assert page.next_cursor is None
+
+    page = await populated_db.get_files_page(limit=1, cursor=page.next_cursor)
+    assert len(page.items) == 1
+    page = await populated_db.get_files_page(limit=1, cursor=page.next_cursor)
+    assert [file.id for file in page.items] == [2]
+    assert page.items[0].standard.numdos == "AB1"
+
+
+@pytest.mark.asyncio
+async def test_my_db_filters(populated_db: MyDb) -> None:
+    async with populated_db.session() as session:
+        session.add(
+            Standard(
+                numdos="AC1",
+                files=[
+                    File(
+                        name="AC1.xml",
+                        numdosvl="AC1",
+                        format=FileFormat.XML,
+                        language=FileLanguage.EN,
+                    )
+                ],
+            )
+        )
+        await session.commit()
+    files = await populated_db.get_files(formats=[FileFormat.XML, FileFormat.XMLRL])
+    assert [file.name for file in files] == ["AC1.xml"]
+    files = await populated_db.get_files(
+        formats=[FileFormat.PDF], languages=[FileLanguage.FR], numdos_prefix="AB"
+    )
+    assert sorted(file.name for file in files) == ["AB1.pdf", "AB2.pdf", "AB3.pdf"]
+    assert (
+        await populated_db.get_files(languages=[FileLanguage.EN], numdos_prefix="AB")
+        == []
+    )
+    assert len(await populated_db.get_files(formats=[], numdos_prefix="")) == 4
+
+    page = await populated_db.get_files_page(numdos_prefix="AB2", limit=1)
+    assert [file.name for file in page.items] == ["AB2.pdf"]
+    assert page.next_cursor is None
+    standards = await populated_db.get_standards(numdos_prefix="A")
+    assert len(standards) == 4
+    page = await populated_db.get_standards_page(numdos_prefix="AB", limit=2)
+    assert [std.numdos for std in page.items] == ["AB1", "AB2"]
+    page = await populated_db.get_standards_page(
+        numdos_prefix="AB", limit=2, cursor=page.next_cursor
+    )
+    assert [std.numdos for std in page.items] == ["AB3"]
+    assert page.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_my_db_get_page_invalid(db: MyDb) -> None:
+    with pytest.raises(ValueError):
+        await db.get_standards_page(limit=0)
+    with pytest.raises(ValueError):
+        await db.get_files_page(cursor="not a cursor")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key", [None, [1], {"id": 1}, True, "AB1", 1.5])
+async def test_my_db_get_files_page_cursor_type(db: MyDb, key) -> None:
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await db.get_files_page(cursor=encode_cursor(key))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key", [None, ["AB1"], {"numdos": "AB1"}, 1])
+async def test_my_db_get_standards_page_cursor_type(db: MyDb, key) -> None:
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await db.get_standards_page(cursor=encode_cursor(key))
+
+
+@pytest.mark.asyncio
+async def test_my_db_stream_standards(populated_db: MyDb) -> None:
+    standards: list[Standard] = [
+        std async for std in populated_db.stream_standards(yield_per=2)
+    ]
+    assert [std.numdos for std in standards] == ["AB1", "AB2", "AB3"]
+    assert all(len(std.files) == 1 for std in standards)
+
+
+@pytest.mark.asyncio
+async def test_my_db_stream_files(populated_db: MyDb) -> None:
+    files: list[File] = [file async for file in populated_db.stream_files(yield_per=1)]
+    assert [file.id for file in files] == [1, 2, 3]
+    assert [file.standard.numdos for file in files] == ["AB3", "AB1", "AB2"]
+
+
+@pytest.mark.asyncio
+async def test_my_db_get_standards_by_numdos(populated_db: MyDb) -> None:
+    standards = await populated_db.get_standards_by_numdos(["AB2", "XX1", "AB1"])
+    assert [std and std.numdos for std in standards] == ["AB2", None, "AB1"]
+
+
+@pytest.mark.asyncio
+async def test_my_db_get_files_by_numdos(populated_db: MyDb) -> None:
+    files = await populated_db.get_files_by_numdos(["AB2", "XX1", "AB1"])
+    assert [[file.name for file in group] for group in files] == [
+        ["AB2.pdf"],
+        [],
+        ["AB1.pdf"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_my_db_get_standards_by_numdos_chunked(populated_db: MyDb) -> None:
+    populated_db.in_chunk_size = 1
+    standards = await populated_db.get_standards_by_numdos(["AB3", "AB1", "AB3"])
+    assert [std.numdos for std in standards] == ["AB3", "AB1", "AB3"]
+
+
+@pytest.mark.asyncio
+async def test_my_db_get_files_by_keys(populated_db: MyDb) -> None:
+    populated_db.in_chunk_size = 2
+    files = await populated_db.get_files_by_keys(
+        [("AB2", "AB2"), ("AB1", "XX1"), ("AB3", "AB3"), ("AB1", "AB1")]
+    )
+    assert [file and file.name for file in files] == [
+        "AB2.pdf",
+        None,
+        "AB3.pdf",
+        "AB1.pdf",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_my_db_cached_lookups(populated_db: MyDb) -> None:
+    populated_db.cache = LRUCache()
+    standard = await populated_db.get_standard("AB1")
+    assert await populated_db.get_standard("AB1") is standard
+    assert standard.files[0].name == "AB1.pdf"
+    file = await populated_db.get_file("AB1", "AB1", options=())
+    assert await populated_db.get_file("AB1", "AB1") is file
+    assert file.standard.numdos == "AB1"
+    assert populated_db.cache.hits == 2
+    assert populated_db.cache.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_my_db_cache_invalidation(populated_db: MyDb) -> None:
+    populated_db.cache = LRUCache()
+    standard = await populated_db.get_standard("AB1")
+    await populated_db.get_standard("AB2")
+    async with populated_db.session() as session:
+        session.add(
+            File(
+                name="AB1.xml",
+                numdos="AB1",
+                numdosvl="AE1",
+                format=FileFormat.XML,
+                language=FileLanguage.EN,
+            )
+        )
+        await session.commit()
+    assert populated_db.cache.invalidations == 1
+    reloaded = await populated_db.get_standard("AB1")
+    assert reloaded is not standard
+    assert len(reloaded.files) == 2
+
+
+@pytest.mark.asyncio
+async def test_my_db_cached_lookups_outlive_the_request(populated_db: MyDb) -> None:
+    populated_db.cache = LRUCache()
+    dependency = populated_db.request_session()
+    request_session: AsyncSession = await anext(dependency)
+    standard = await populated_db.get_standard("AB1")
+    file = await populated_db.get_file("AB1", "AB1")
+    assert standard not in request_session and file not in request_session
+    await request_session.rollback()
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+    cached = await populated_db.get_standard("AB1")
+    assert cached is standard
+    assert (cached.numdos, cached.files[0].name) == ("AB1", "AB1.pdf")
+    assert (await populated_db.get_file("AB1", "AB1")).standard.numdos == "AB1"
+
+
+@pytest.mark.asyncio
+async def test_my_db_cache_invalidation_on_commit(populated_db: MyDb) -> None:
+    populated_db.cache = LRUCache()
+    standard = await populated_db.get_standard("AB1")
+    async with populated_db.session() as session:
+        file = (
+            await session.execute(select(File).where(File.numdos == "AB1"))
+        ).scalar()
+        file.numdos = "AB2"
+        await session.flush()
+        assert populated_db.cache.invalidations == 0
+        await session.rollback()
+    assert await populated_db.get_standard("AB1") is standard
+    await populated_db.get_standard("AB2")
+    async with populated_db.session() as session:
+        file = (
+            await session.execute(select(File).where(File.numdos == "AB1"))
+        ).scalar()
+        file.numdos = "AB2"
+        await session.flush()
+        assert populated_db.cache.invalidations == 0
+        await session.commit()
+    assert populated_db.cache.invalidations == 2
+    assert (await populated_db.get_standard("AB1")).files == []
+
+
+@pytest.mark.asyncio
+async def test_my_db_single_flight(populated_db: MyDb) -> None:
+    populated_db.single_flight = SingleFlight()
+    statements: list[str] = []
+    event.listen(
+        populated_db.engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    standards = await asyncio.gather(
+        populated_db.get_standard("AB1"),
+        populated_db.get_standard("AB1"),
+        populated_db.get_standard("AB1", options=()),
+        populated_db.get_files(),
+        populated_db.get_files(),
+    )
+    assert standards[0] is standards[1]
+    assert standards[0] is not standards[2]
+    assert standards[3] is standards[4]
+    assert standards[0].files[0].name == "AB1.pdf"
+    assert len(statements) == 5
+    assert populated_db.single_flight.shared == 2
+
+
+@pytest.mark.asyncio
+async def test_my_db_get_table_versions(populated_db: MyDb) -> None:
+    versions = await populated_db.get_table_versions(["standards", "files"])
+    async with populated_db.session() as session:
+        standard = await session.get(Standard, "AB1")
+        await session.delete(standard)
+        await session.commit()
+    assert await populated_db.get_table_versions(["files", "standards"]) == (
+        versions[1] + 1,
+        versions[0] + 1,
+    )
+    assert await populated_db.get_table_versions(["unknown"]) is None
+
+
+@pytest.mark.asyncio
+async def test_my_db_get_table_versions_without_table(database_url: str) -> None:
+    db: MyDb = await MyDb.start(database_url)
+    assert await db.get_table_versions(["standards"]) is None
@@ -0,0 +1,78 @@
+import logging
+from pathlib import Path
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from standards.db import MyDb, Replicas
+from standards.db.models import Base, Standard
+
+
+async def _create(path: Path, *numdos: str) -> str:
+    url: str = f"sqlite+aiosqlite:///{path}"
+    engine: AsyncEngine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for value in numdos:
+            await conn.execute(Standard.__table__.insert().values(numdos=value))
+    await engine.dispose()
+    return url
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path: Path) -> MyDb:
+    # Every database has its own standard, to tell which one has been read
+    primary: str = await _create(tmp_path / "primary.sqlite", "AB0")
+    replicas: list[str] = [
+        await _create(tmp_path / f"replica{i}.sqlite", f"AB{i}") for i in (1, 2)
+    ]
+    db: MyDb = await MyDb.start(primary, replicas=Replicas(urls=replicas))
+    yield db
+    await db.close()
+
+
+async def _read(db: MyDb) -> list[str]:
+    return [standard.numdos for standard in await db.get_standards()]
+
+
+@pytest.mark.asyncio
+async def test_replicas_balance_reads(db: MyDb) -> None:
+    assert len(db.engines) == 3
+    reads: list[list[str]] = [await _read(db) for _ in range(4)]
+    assert sorted(map(tuple, reads)) == [("AB1",), ("AB1",), ("AB2",), ("AB2",)]
+    assert (await db.get_standard("AB1")).files == []
+
+
+@pytest.mark.asyncio
+async def test_replicas_write_to_primary(db: MyDb) -> None:
+    async with db.session() as session:
+        session.add(Standard(numdos="AB3"))
+        await session.commit()
+        # The session reads its own writes
+        assert await session.get(Standard, "AB3") is not None
+    assert await _read(db) in (["AB1"], ["AB2"])
+    db.replicas.mark(db.replicas.engines[0].sync_engine, False)
+    db.replicas.mark(db.replicas.engines[1].sync_engine, False)
+    assert await _read(db) == ["AB0", "AB3"]
+
+
+@pytest.mark.asyncio
+async def test_replicas_fallback(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    primary: str = await _create(tmp_path / "primary.sqlite", "AB0")
+    replica: str = await _create(tmp_path / "replica.sqlite", "AB1")
+    missing: str = f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.sqlite'}"
+    db: MyDb = await MyDb.start(primary, replicas=Replicas(urls=[missing, replica]))
+    replicas: Replicas = db.replicas
+    try:
+        with caplog.at_level(logging.WARNING):
+            assert await _read(db) == ["AB0"]  # Retried on the primary
+        assert "is down" in caplog.text
+        assert list(replicas.health().values()) == [False, True]
+        assert [await _read(db) for _ in range(2)] == [["AB1"], ["AB1"]]
+        (tmp_path / "missing").mkdir()
+        await _create(tmp_path / "missing" / "replica.sqlite", "AB2")
+        assert list((await replicas.check()).values()) == [True, True]
+        assert sorted([await _read(db) for _ in range(2)]) == [["AB1"], ["AB2"]]
+    finally:
+        await db.close()
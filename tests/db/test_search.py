@@ -0,0 +1,107 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from standards._private.enum import FileFormat, FileLanguage
+from standards.db import MyDb
+from standards.db.migrations import upgrade
+from standards.db.models import File, Standard
+from standards.db.pagination import encode_cursor
+from standards.db.search import match_expression
+
+
+@pytest_asyncio.fixture
+async def db(make_db, make_file) -> MyDb:
+    def file(numdos: str, name: str, fmt: FileFormat, language: FileLanguage) -> File:
+        return make_file(
+            numdos, fmt, language, name=name, numdosvl=f"{numdos[0]}V{numdos[2:]}"
+        )
+
+    return await make_db(
+        [
+            Standard(numdos="NF12001"),
+            Standard(numdos="NF12002"),
+            Standard(numdos="NF13001"),
+            file("NF12001", "rapport annuel.pdf", FileFormat.PDF, FileLanguage.FR),
+            file("NF12002", "annual report.xml", FileFormat.XML, FileLanguage.EN),
+            file("NF13001", "rapport rapport.pdf", FileFormat.PDF, FileLanguage.EN),
+        ]
+    )
+
+
+def test_match_expression() -> None:
+    assert match_expression("NF12* rapport") == '"NF12"* "rapport"'
+    assert match_expression('"x" OR (y-z*)') == '"x" "OR" "y" "z"*'
+    with pytest.raises(ValueError, match="no term"):
+        match_expression(" *-() ")
+
+
+@pytest.mark.asyncio
+async def test_search(db: MyDb) -> None:
+    async def names(query: str, **kwargs) -> list[str]:
+        return [file.name for file in (await db.search(query, **kwargs)).items]
+
+    assert await names("NF12*") == ["rapport annuel.pdf", "annual report.xml"]
+    assert await names("nf12002") == ["annual report.xml"]
+    # The file whose name repeats the term ranks first
+    assert await names("rapport") == ["rapport rapport.pdf", "rapport annuel.pdf"]
+    assert await names("rapport", languages=[FileLanguage.FR]) == ["rapport annuel.pdf"]
+    assert await names("NF1*", formats=[FileFormat.XML, FileFormat.PDFRL]) == [
+        "annual report.xml"
+    ]
+    assert await names("rapport NF13*") == ["rapport rapport.pdf"]
+    assert await names("unknown") == []
+    with pytest.raises(ValueError):
+        await db.search("rapport", cursor="bm90IGFuIG9mZnNldA==")
+
+
+@pytest.mark.asyncio
+async def test_search_pages(db: MyDb) -> None:
+    first = await db.search("NF1*", limit=2)
+    second = await db.search("NF1*", limit=2, cursor=first.next_cursor)
+    assert first.next_cursor is not None and second.next_cursor is None
+    assert len({file.id for file in (*first.items, *second.items)}) == 3
+    # The pages are keyed by the rank and id of their last file
+    files: list[File] = (await db.search("rapport")).items
+    assert files[0].search_rank <= files[1].search_rank
+    page = await db.search("rapport", limit=1)
+    assert page.next_cursor == encode_cursor([files[0].search_rank, files[0].id])
+    page = await db.search("rapport", limit=1, cursor=page.next_cursor)
+    assert [file.id for file in page.items] == [files[1].id]
+    assert page.next_cursor is None
+    for key in (1, [1.5], [1.5, "2"], [1.5, True], [1.5, 2.5]):
+        with pytest.raises(ValueError):
+            await db.search("rapport", cursor=encode_cursor(key))
+
+
+@pytest.mark.asyncio
+async def test_search_follows_writes(db: MyDb) -> None:
+    async with db.session() as session:
+        file: File = (await db.search("annual", options=())).items[0]
+        file = await session.merge(file)
+        file.name = "yearly report.xml"
+        await session.execute(text("DELETE FROM files WHERE numdos = 'NF13001'"))
+        await session.commit()
+    assert [f.name for f in (await db.search("yearly")).items] == ["yearly report.xml"]
+    assert (await db.search("annual")).items == []
+    assert [f.numdos for f in (await db.search("rapport")).items] == ["NF12001"]
+
+
+@pytest.mark.asyncio
+async def test_search_index_migration(tmp_path) -> None:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'legacy.sqlite'}"
+    engine: AsyncEngine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade, 2)
+        await conn.execute(text("DROP TABLE files_fts"))
+        for name in ("insert", "update", "delete"):
+            await conn.execute(text(f"DROP TRIGGER IF EXISTS files_fts_{name}"))
+        await conn.execute(text("INSERT INTO standards VALUES ('AB1')"))
+        await conn.execute(
+            text("INSERT INTO files VALUES (1, 'guide.pdf', 'AV1', 'AB1', 3, 2)")
+        )
+        await conn.run_sync(upgrade)
+    await engine.dispose()
+    db: MyDb = await MyDb.start(db_url)
+    assert [file.name for file in (await db.search("guide")).items] == ["guide.pdf"]
+    await db.close()
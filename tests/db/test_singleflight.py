@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from standards.db.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_concurrent_calls() -> None:
+    group: SingleFlight = SingleFlight()
+    executions: list[str] = []
+
+    async def call(key: str) -> str:
+        executions.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    results = await asyncio.gather(
+        group.do("a", lambda: call("a")),
+        group.do("a", lambda: call("a")),
+        group.do("b", lambda: call("b")),
+    )
+    assert results == ["A", "A", "B"]
+    assert executions == ["a", "b"]
+    assert group.stats() == {"in_flight": 0, "calls": 3, "shared": 1}
+
+    assert await group.do("a", lambda: call("a")) == "A"
+    assert executions == ["a", "b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_exceptions() -> None:
+    group: SingleFlight = SingleFlight()
+
+    async def call() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        group.do("a", call), group.do("a", call), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(group) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancelled_caller() -> None:
+    group: SingleFlight = SingleFlight()
+    started: asyncio.Event = asyncio.Event()
+
+    async def call() -> int:
+        started.set()
+        await asyncio.sleep(0.01)
+        return 1
+
+    first: asyncio.Task = asyncio.create_task(group.do("a", call))
+    second: asyncio.Task = asyncio.create_task(group.do("a", call))
+    await started.wait()
+    first.cancel()
+    assert await second == 1
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_all_callers_cancelled() -> None:
+    group: SingleFlight = SingleFlight()
+    cancelled: asyncio.Event = asyncio.Event()
+
+    async def call() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller: asyncio.Task = asyncio.create_task(group.do("a", call))
+    await asyncio.sleep(0)
+    caller.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0)
+    assert len(group) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_call_after_all_callers_cancelled() -> None:
+    group: SingleFlight = SingleFlight()
+    calls: list[int] = []
+
+    async def call() -> int:
+        calls.append(len(calls))
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    caller: asyncio.Task = asyncio.create_task(group.do("a", call))
+    await asyncio.sleep(0)
+    caller.cancel()
+    await asyncio.sleep(0)
+    assert len(group) == 0
+    assert await group.do("a", call) == 2
+    assert group.stats() == {"in_flight": 0, "calls": 2, "shared": 0}
@@ -0,0 +1,88 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from standards._private.enum import FileFormat, FileLanguage
+from standards.db import FileStats, MyDb
+from standards.db.migrations import upgrade
+from standards.db.models import File, Standard
+from standards.db.stats import count_files
+
+
+@pytest_asyncio.fixture
+async def db(make_db, make_file) -> MyDb:
+    return await make_db(
+        [
+            Standard(numdos="NF12001"),
+            Standard(numdos="EN1"),
+            make_file("NF12001", FileFormat.PDF, FileLanguage.FR),
+            make_file("NF12001", FileFormat.XML, FileLanguage.FR),
+            make_file("EN1", FileFormat.PDF, FileLanguage.EN),
+        ]
+    )
+
+
+async def _counted(db: MyDb) -> FileStats:
+    async with db.session() as session:
+        return FileStats.from_counts((await session.execute(count_files())).all())
+
+
+def test_file_stats_from_counts() -> None:
+    stats: FileStats = FileStats.from_counts(
+        [("format", "pdf", 2), ("language", "en", 2), ("prefix", "NF", 2)]
+        + [("prefix", "EN", 0), ("prefix", "AB", 1), ("format", "xml", 1)]
+    )
+    assert stats.files == 3
+    assert stats.formats == {"xml": 1, "xmlrl": 0, "pdf": 2, "pdfrl": 0}
+    assert stats.languages == {"fr": 0, "en": 2}
+    assert stats.prefixes == {"AB": 1, "NF": 2}
+
+
+@pytest.mark.asyncio
+async def test_stats(db: MyDb) -> None:
+    stats: FileStats = await db.get_stats()
+    assert stats.files == 3
+    assert stats.formats == {"xml": 1, "xmlrl": 0, "pdf": 2, "pdfrl": 0}
+    assert stats.languages == {"fr": 2, "en": 1}
+    assert stats.prefixes == {"EN": 1, "NF": 2}
+
+
+@pytest.mark.asyncio
+async def test_stats_following_writes(db: MyDb, make_file) -> None:
+    async with db.session() as session:
+        session.add(make_file("EN1", FileFormat.PDFRL, FileLanguage.EN))
+        await session.execute(
+            update(File)
+            .where(File.format == FileFormat.XML)
+            .values(format=FileFormat.XMLRL, language=FileLanguage.EN)
+        )
+        await session.execute(delete(File).where(File.numdos == "NF12001"))
+        await session.commit()
+    stats: FileStats = await db.get_stats()
+    assert stats == await _counted(db)
+    assert stats.formats == {"xml": 0, "xmlrl": 0, "pdf": 1, "pdfrl": 1}
+    assert stats.prefixes == {"EN": 2}
+
+
+@pytest.mark.asyncio
+async def test_stats_migration(tmp_path, make_file) -> None:
+    db_url: str = f"sqlite+aiosqlite:///{tmp_path / 'legacy.sqlite'}"
+    engine: AsyncEngine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade, 4)
+        await conn.execute(text("DROP TABLE file_counts"))
+        for name in ("insert", "update", "delete"):
+            await conn.execute(text(f"DROP TRIGGER file_counts_{name}"))
+        await conn.execute(text("INSERT INTO standards VALUES ('AB1')"))
+        await conn.execute(
+            text("INSERT INTO files VALUES (1, 'guide.pdf', 'AV1', 'AB1', 3, 2)")
+        )
+        await conn.run_sync(upgrade)
+    await engine.dispose()
+    db: MyDb = await MyDb.start(db_url)
+    assert (await db.get_stats()).prefixes == {"AB": 1}
+    async with db.session() as session:
+        session.add(make_file("AB1", FileFormat.XML, FileLanguage.FR))
+        await session.commit()
+    assert (await db.get_stats()).prefixes == {"AB": 2}
+    await db.close()
@@ -0,0 +1,70 @@
+import pytest
+from graphql import parse
+from standards.graphql import CostLimits, get_schema
+from standards.graphql.cost import Cost, cost_of
+
+
+SCHEMA = get_schema()._schema
+
+
+def _cost(query: str, limits: CostLimits | None = None, **variables) -> Cost:
+    return cost_of(SCHEMA, parse(query), variables, limits=limits)
+
+
+def test_cost_of_scalars_and_objects() -> None:
+    assert _cost('{ file(numdos: "A") { id name } }') == Cost(cost=1, depth=2)
+    assert _cost("{ standard { numdos files { name } } }") == Cost(cost=11, depth=3)
+
+
+def test_cost_of_lists() -> None:
+    assert _cost("{ standards { numdos } }").cost == 1_000
+    assert _cost("{ files { id } }").cost == 10_000
+    limits: CostLimits = CostLimits(list_sizes={"Query.standards": 5})
+    assert _cost("{ standards { numdos } }", limits).cost == 5
+
+
+def test_cost_of_sized_lists() -> None:
+    query: str = (
+        "query ($first: Int!) { standardsConnection(first: $first) {"
+        " edges { node { numdos } } pageInfo { hasNextPage } } }"
+    )
+    assert _cost(query, first=50) == Cost(cost=1 + 50 * 2 + 1, depth=4)
+    assert _cost('{ standardsByNumdos(numdos: ["A", "B"]) { numdos } }').cost == 2
+    assert _cost("{ standardsConnection { edges { cursor } } }").cost == 1 + 100
+
+
+def test_cost_of_filtered_lists() -> None:
+    assert _cost("{ files(formats: []) { id } }").cost == 10_000
+    assert _cost("{ files(formats: [PDF], languages: [FR]) { id } }").cost == 10_000
+    query: str = "{ files(formats: [PDF]) { standard { files { id } } } }"
+    assert _cost(query).cost == 10_000 * (1 + 1 + 10)
+    keys: str = '[{numdos: "A", numdosvl: "FR"}, {numdos: "B", numdosvl: "FR"}]'
+    assert _cost(f"{{ filesByKeys(keys: {keys}) {{ id }} }}").cost == 2
+    assert _cost("{ standardsByNumdos(numdos: []) { numdos } }").cost == 0
+
+
+def test_cost_of_fragments_and_weights() -> None:
+    query: str = (
+        "query Q { ...F ... on Query { file { id } } __schema { types { name } } }"
+        " fragment F on Query { standard { numdos } }"
+    )
+    assert _cost(query) == Cost(cost=2, depth=2)
+    limits: CostLimits = CostLimits(weights={"StandardType.numdos": 3})
+    assert _cost(query, limits).cost == 5
+
+
+@pytest.mark.asyncio
+async def test_query_cost_rejects_over_the_limits() -> None:
+    schema = get_schema(cost_limits=CostLimits(max_cost=1_000, max_depth=3))
+    result = await schema.execute("{ standards { files { standard { numdos } } } }")
+    assert result.data is None
+    assert result.errors[0].message == "Query depth 4 exceeds the maximum of 3"
+    assert result.errors[0].extensions == {"code": "QUERY_TOO_COMPLEX"}
+    result = await schema.execute("{ files { name } }")
+    assert result.errors[0].message == "Query cost 10000 exceeds the maximum of 1000"
+    assert result.extensions["cost"] == {
+        "requestedQueryCost": 10_000,
+        "maximumAvailable": 1_000,
+        "depth": 2,
+        "maximumDepth": 3,
+    }
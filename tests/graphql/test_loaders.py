@@ -0,0 +1,93 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from standards._private.enum import FileFormat, FileLanguage
+from standards.db import MyDb
+from standards.db.models import Base, File, Standard
+from standards.graphql import CostLimits, get_schema
+from standards.graphql.loaders import Loaders, get_loaders
+
+
+# The cyclic queries below are over the default cost limit
+UNLIMITED: CostLimits = CostLimits(max_cost=None)
+
+
+@pytest_asyncio.fixture
+async def db() -> MyDb:
+    db: MyDb = await MyDb.start("sqlite+aiosqlite://")
+    async with db.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with db.session() as session:
+        for numdos in ("AB1", "AB2"):
+            session.add(
+                Standard(
+                    numdos=numdos,
+                    files=[
+                        File(
+                            name=f"{numdos}.{format.value}",
+                            numdosvl=numdos,
+                            format=format,
+                            language=FileLanguage.FR,
+                        )
+                        for format in (FileFormat.PDF, FileFormat.XML)
+                    ],
+                )
+            )
+        await session.commit()
+    yield db
+    await db.close()
+
+
+@pytest.fixture
+def statements(db: MyDb) -> list[str]:
+    statements: list[str] = []
+
+    @event.listens_for(db.engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    return statements
+
+
+def test_get_loaders_creates_them_once() -> None:
+    context = {"db": MyDb(db_url="sqlite+aiosqlite://")}
+    loaders: Loaders = get_loaders(context)
+    assert get_loaders(context) is loaders
+
+
+@pytest.mark.asyncio
+async def test_loaders_skip_unselected_relationships(
+    db: MyDb, statements: list[str]
+) -> None:
+    result = await get_schema().execute(
+        "{ standards { numdos } }", context_value={"db": db}
+    )
+    assert result.data == {"standards": [{"numdos": "AB1"}, {"numdos": "AB2"}]}
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_loaders_batch_nested_relationships(
+    db: MyDb, statements: list[str]
+) -> None:
+    result = await get_schema(cost_limits=UNLIMITED).execute(
+        "{ standards { files { name standard { numdos files { id } } } } }",
+        context_value={"db": db},
+    )
+    assert result.errors is None
+    assert result.data["standards"][1]["files"][0] == {
+        "name": "AB2.pdf",
+        "standard": {"numdos": "AB2", "files": [{"id": 3}, {"id": 4}]},
+    }
+    assert len(statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_loaders_batch_file_standards(db: MyDb, statements: list[str]) -> None:
+    result = await get_schema(cost_limits=UNLIMITED).execute(
+        "{ files { standard { files { name } } } }", context_value={"db": db}
+    )
+    assert result.errors is None
+    assert len(result.data["files"]) == 4
+    assert result.data["files"][3]["standard"]["files"][0] == {"name": "AB2.pdf"}
+    assert len(statements) == 3
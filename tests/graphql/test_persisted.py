@@ -0,0 +1,49 @@
+import hashlib
+import pytest
+from standards.graphql.persisted import PersistedQueries, PersistedQueryNotFound
+
+
+QUERY: str = "{ standards { numdos } }"
+SHA256: str = hashlib.sha256(QUERY.encode()).hexdigest()
+
+
+def _request(sha256: str = SHA256, query: str | None = None) -> dict:
+    extensions: dict = {"persistedQuery": {"version": 1, "sha256Hash": sha256}}
+    return {"query": query, "extensions": extensions}
+
+
+def test_resolve_without_persisted_query() -> None:
+    queries: PersistedQueries = PersistedQueries()
+    assert queries.resolve({"query": QUERY}) == {"query": QUERY}
+    assert len(queries) == 0
+
+
+def test_resolve_registers_then_uses_the_query() -> None:
+    queries: PersistedQueries = PersistedQueries()
+    with pytest.raises(PersistedQueryNotFound):
+        queries.resolve(_request())
+    queries.resolve(_request(query=QUERY))
+    assert queries.resolve(_request())["query"] == QUERY
+    assert queries.resolve(_request(SHA256.upper()))["query"] == QUERY
+
+
+def test_resolve_invalid() -> None:
+    queries: PersistedQueries = PersistedQueries()
+    with pytest.raises(ValueError, match="does not match"):
+        queries.resolve(_request("0" * 64, QUERY))
+    with pytest.raises(ValueError, match="version"):
+        queries.resolve({"extensions": {"persistedQuery": {"version": 2}}})
+    with pytest.raises(ValueError, match="sha256Hash"):
+        queries.resolve({"extensions": {"persistedQuery": {"version": 1}}})
+
+
+def test_register_evicts_the_least_recently_used() -> None:
+    queries: PersistedQueries = PersistedQueries(maxsize=2)
+    hashes: list[str] = []
+    for query in ("{ a }", "{ b }", "{ c }"):
+        hashes.append(hashlib.sha256(query.encode()).hexdigest())
+        queries.register(hashes[-1], query)
+        queries.get(hashes[0])
+    assert len(queries) == 2
+    assert queries.get(hashes[0]) == "{ a }"
+    assert queries.get(hashes[1]) is None
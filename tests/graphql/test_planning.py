@@ -0,0 +1,131 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from standards._private.enum import FileFormat, FileLanguage
+from standards.db import MyDb, SingleFlight
+from standards.db.models import Base, File, Standard
+from standards.graphql import get_schema
+from standards.graphql.planning import file_options, selections_of, standard_options
+
+
+@pytest_asyncio.fixture
+async def db() -> MyDb:
+    db: MyDb = await MyDb.start("sqlite+aiosqlite://")
+    async with db.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with db.session() as session:
+        session.add(
+            Standard(
+                numdos="AB1",
+                files=[
+                    File(
+                        name="AB1.pdf",
+                        numdosvl="AB1",
+                        format=FileFormat.PDF,
+                        language=FileLanguage.FR,
+                    )
+                ],
+            )
+        )
+        await session.commit()
+    yield db
+    await db.close()
+
+
+@pytest.fixture
+def statements(db: MyDb) -> list[str]:
+    statements: list[str] = []
+
+    @event.listens_for(db.engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, *args) -> None:
+        statements.append(" ".join(statement.split()))
+
+    return statements
+
+
+def test_unknown_selections() -> None:
+    assert selections_of(object()) is None
+    assert standard_options(None) == []
+    assert file_options(None) == []
+
+
+@pytest.mark.asyncio
+async def test_narrow_file_query(db: MyDb, statements: list[str]) -> None:
+    result = await get_schema().execute("{ files { name } }", context_value={"db": db})
+    assert result.data == {"files": [{"name": "AB1.pdf"}]}
+    assert statements == [
+        "SELECT files.id, files.name, files.numdosvl, files.numdos FROM files"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_narrow_standard_query(db: MyDb, statements: list[str]) -> None:
+    result = await get_schema().execute(
+        "{ standardsConnection { edges { node { numdos } } } }",
+        context_value={"db": db},
+    )
+    assert result.data["standardsConnection"]["edges"] == [{"node": {"numdos": "AB1"}}]
+    assert len(statements) == 1
+    assert "files" not in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_selected_relationships(db: MyDb, statements: list[str]) -> None:
+    result = await get_schema().execute(
+        """
+        {
+          file(numdos: "AB1", numdosvl: "AB1") {
+            ...Language
+            standard { files { format } }
+          }
+        }
+        fragment Language on FileType { language }
+        """,
+        context_value={"db": db},
+    )
+    assert result.data == {
+        "file": {"language": "FR", "standard": {"files": [{"format": "PDF"}]}}
+    }
+    assert len(statements) == 3
+    assert "files.language" in statements[0]
+    assert "files.name" not in statements[0]
+    assert "files.format" in statements[2]
+    assert "files.language" not in statements[2]
+
+
+@pytest.mark.asyncio
+async def test_filtered_file_query(db: MyDb, statements: list[str]) -> None:
+    result = await get_schema().execute(
+        """
+        {
+            pdf: files(formats: [PDF, PDFRL], numdosPrefix: "AB") { name }
+            english: files(languages: [EN]) { name }
+        }
+        """,
+        context_value={"db": db},
+    )
+    assert result.data == {"pdf": [{"name": "AB1.pdf"}], "english": []}
+    assert len(statements) == 2
+    assert (
+        "WHERE files.format IN (?, ?) AND files.numdos >= ? AND files.numdos < ?"
+        in (statements[0])
+    )
+    assert "WHERE files.language IN (?)" in statements[1]
+
+
+@pytest.mark.asyncio
+async def test_identical_plans_share_a_query(db: MyDb, statements: list[str]) -> None:
+    db.single_flight = SingleFlight()
+    result = await get_schema().execute(
+        """
+        {
+            a: file(numdos: "AB1", numdosvl: "AB1") { name }
+            b: file(numdos: "AB1", numdosvl: "AB1") { name }
+            c: file(numdos: "AB1", numdosvl: "AB1") { language }
+        }
+        """,
+        context_value={"db": db},
+    )
+    assert result.data["a"] == result.data["b"] == {"name": "AB1.pdf"}
+    assert len(statements) == 2
+    assert db.single_flight.shared == 1
@@ -6,24 +6,57 @@ import pytest
 import pytest_asyncio
 from strawberry.types import ExecutionContext
 from standards.graphql import Query, get_schema
-from standards.graphql.types import FileType, StandardType
-from standards.db import MyDb
+from standards.graphql.types import (
+    Connection,
+    FileKeyInput,
+    FileType,
+    StandardType,
+    StatsType,
+)
+from standards.db import FileStats, MyDb, Page
+from standards.db.pagination import decode_cursor, encode_cursor
 from standards.db.models import File, Standard
 
 
 class MockDb(MyDb):
-    async def get_standard(self, numdos: str) -> Standard | None:
+    async def get_standard(self, numdos: str, **kwargs) -> Standard | None:
         return Standard(numdos="numdos")
 
-    async def get_file(self, numdos: str, numdosvl: str) -> File | None:
+    async def get_file(self, numdos: str, numdosvl: str, **kwargs) -> File | None:
         return File(numdos="numdos", numdosvl="numdosvl")
 
-    async def get_standards(self) -> list[Standard]:
+    async def get_standards(self, **kwargs) -> list[Standard]:
         return [Standard(numdos="A"), Standard(numdos="B")]
 
-    async def get_files(self) -> list[File]:
+    async def get_files(self, **kwargs) -> list[File]:
         return [File(numdos="A", numdosvl="1"), File(numdos="B", numdosvl="2")]
 
+    async def get_standards_by_numdos(self, numdos, **kwargs) -> list:
+        return [Standard(numdos=numdos[0]), None]
+
+    async def get_files_by_keys(self, keys, **kwargs) -> list:
+        return [None, File(numdos=keys[1][0], numdosvl=keys[1][1])]
+
+    async def get_standards_page(
+        self, limit: int, cursor: str | None, **kwargs
+    ) -> Page:
+        return Page(items=[Standard(numdos="A")], next_cursor="next")
+
+    async def get_files_page(self, limit: int, cursor: str | None, **kwargs) -> Page:
+        return Page(items=[File(id=1, numdos="A", numdosvl="1")])
+
+    async def get_stats(self) -> FileStats:
+        return FileStats.from_counts([("format", "pdf", 2), ("prefix", "AB", 2)])
+
+    async def search(self, query: str, **kwargs) -> Page:
+        return Page(
+            items=[
+                File(id=7, numdos="A", numdosvl="1", search_rank=-2.5),
+                File(id=3, numdos="B", search_rank=-1.0),
+            ],
+            next_cursor="next",
+        )
+
 
 @pytest_asyncio.fixture
 async def mock_db() -> MockDb:
@@ -71,3 +104,90 @@ async def test_query_files(mock_db):
     context = {"db": mock_db}
     result = await query.files(ExecutionContext(r"{ files }", get_schema(), context))
     assert isinstance(result, list)
+
+
+@pytest.mark.asyncio
+async def test_query_standards_connection(mock_db):
+    query = Query()
+    context = {"db": mock_db}
+    result = await query.standards_connection(
+        ExecutionContext(r"{ standardsConnection }", get_schema(), context)
+    )
+    assert isinstance(result, Connection)
+    assert result.edges[0].node.numdos == "A"
+    assert result.page_info.has_next_page
+    assert result.page_info.end_cursor == result.edges[0].cursor
+
+
+@pytest.mark.asyncio
+async def test_query_files_connection(mock_db):
+    query = Query()
+    context = {"db": mock_db}
+    result = await query.files_connection(
+        ExecutionContext(r"{ filesConnection }", get_schema(), context)
+    )
+    assert isinstance(result, Connection)
+    assert result.edges[0].node.id == 1
+    assert not result.page_info.has_next_page
+
+
+@pytest.mark.asyncio
+async def test_query_search(mock_db):
+    query = Query()
+    context = {"db": mock_db}
+    result = await query.search(
+        ExecutionContext(r"{ search }", get_schema(), context),
+        query="A*",
+        after=encode_cursor([-3.0, 10]),
+    )
+    assert isinstance(result, Connection)
+    assert [edge.node.id for edge in result.edges] == [7, 3]
+    # The cursor of a file is its rank and id
+    assert [decode_cursor(edge.cursor, list) for edge in result.edges] == [
+        [-2.5, 7],
+        [-1.0, 3],
+    ]
+    assert result.page_info.has_next_page
+
+
+@pytest.mark.asyncio
+async def test_query_standards_by_numdos(mock_db):
+    query = Query()
+    context = {"db": mock_db}
+    result = await query.standards_by_numdos(
+        ExecutionContext(r"{ standardsByNumdos }", get_schema(), context),
+        numdos=["A", "B"],
+    )
+    assert result[0].numdos == "A"
+    assert result[1] is None
+
+
+@pytest.mark.asyncio
+async def test_query_files_by_keys(mock_db):
+    query = Query()
+    context = {"db": mock_db}
+    result = await query.files_by_keys(
+        ExecutionContext(r"{ filesByKeys }", get_schema(), context),
+        keys=[
+            FileKeyInput(numdos="A", numdosvl="1"),
+            FileKeyInput(numdos="B", numdosvl="2"),
+        ],
+    )
+    assert result[0] is None
+    assert result[1].numdosvl == "2"
+
+
+@pytest.mark.asyncio
+async def test_query_stats(mock_db):
+    query = Query()
+    context = {"db": mock_db}
+    result = await query.stats(ExecutionContext(r"{ stats }", get_schema(), context))
+    assert isinstance(result, StatsType)
+    assert result.files == 2
+    assert [(c.value, c.count) for c in result.formats] == [
+        ("xml", 0),
+        ("xmlrl", 0),
+        ("pdf", 2),
+        ("pdfrl", 0),
+    ]
+    assert [(c.value, c.count) for c in result.prefixes] == [("AB", 2)]
@@ -4,6 +4,7 @@ MAINLY DEVELOPED BY CHATGPT
 
 import pytest
 from standards._private.enum import FileFormat, FileLanguage
+from standards.db.models import File, Standard
 from standards.graphql.types import FileType, StandardType
 
 
@@ -88,3 +89,37 @@ async def test_file_type_async():
     assert isinstance(file_type.standard, StandardType)
     assert file_type.format == FileFormat.PDF
     assert file_type.language == FileLanguage.EN
+
+
+def test_standard_type_from_model():
+    standard = Standard(
+        numdos="AB1",
+        files=[
+            File(
+                id=1,
+                name="file.pdf",
+                numdosvl="AB1",
+                numdos="AB1",
+                format=FileFormat.PDF,
+                language=FileLanguage.FR,
+            )
+        ],
+    )
+    standard_type = StandardType.from_model(standard)
+    assert standard_type.numdos == "AB1"
+    assert standard_type.files[0].name == "file.pdf"
+    assert standard_type.files[0].standard is standard_type
+
+
+def test_file_type_from_model_unloaded_standard():
+    file = File(
+        id=1,
+        name="file.pdf",
+        numdosvl="AB1",
+        numdos="AB1",
+        format=FileFormat.PDF,
+        language=FileLanguage.FR,
+    )
+    file_type = FileType.from_model(file)
+    assert file_type.numdos == "AB1"
+    assert file_type.standard is None
@@ -1,3 +1,6 @@
+import asyncio
+import hashlib
+import json
 from unittest.mock import MagicMock
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -6,8 +9,9 @@ import pytest
 import pytest_asyncio
 from pytest_mock import MockerFixture
 from standards.app import MyApp
-from standards.db import MyDb
-from standards.db.models import Base, Standard
+from standards.db import LRUCache, MyDb, Page, QueryAccounting
+from standards._private.enum import FileFormat, FileLanguage
+from standards.db.models import Base, File, Standard
 from standards.graphql import get_schema
 
 
@@ -44,7 +48,7 @@ class TestMyApp:
             "standards.db.MyDb.get_standards", return_value=values
         )
         resp: Response = client.get("/standards")
-        mock.assert_called_once_with()
+        mock.assert_called_once_with(numdos_prefix=None)
         assert resp.json() == [{**values[0]}]
 
     def test_api_file(self, mocker: MockerFixture, client: TestClient) -> None:
@@ -55,5 +59,413 @@ class TestMyApp:
     def test_api_files(self, mocker: MockerFixture, client: TestClient) -> None:
         mock: MagicMock = mocker.patch("standards.db.MyDb.get_files", return_value=[])
         resp: Response = client.get("/files")
-        mock.assert_called_once_with()
+        mock.assert_called_once_with(formats=None, languages=None, numdos_prefix=None)
         assert resp.json() == []
+
+    def test_api_files_filters(self, mocker: MockerFixture, client: TestClient) -> None:
+        mock: MagicMock = mocker.patch("standards.db.MyDb.get_files", return_value=[])
+        client.get("/files?format=pdf&format=xml&language=fr&numdos_prefix=NF12")
+        mock.assert_called_once_with(
+            formats=[FileFormat.PDF, FileFormat.XML],
+            languages=[FileLanguage.FR],
+            numdos_prefix="NF12",
+        )
+        assert client.get("/files?format=doc").status_code == 422
+
+    def test_api_files_filtered(self, app: MyApp, client: TestClient) -> None:
+        async def populate() -> None:
+            async with app.db.session() as session:
+                for numdos, format, language in (
+                    ("NF12001", FileFormat.PDF, FileLanguage.FR),
+                    ("NF12002", FileFormat.XML, FileLanguage.FR),
+                    ("NF13001", FileFormat.PDF, FileLanguage.EN),
+                ):
+                    session.add(
+                        File(
+                            name=f"{numdos}.{format.value}",
+                            numdos=numdos,
+                            numdosvl=numdos,
+                            standard=Standard(numdos=numdos),
+                            format=format,
+                            language=language,
+                        )
+                    )
+                await session.commit()
+
+        asyncio.run(populate())
+        resp: Response = client.get("/files?format=pdf")
+        assert [file["name"] for file in resp.json()] == [
+            "NF12001.pdf",
+            "NF13001.pdf",
+        ]
+        resp = client.get("/files?numdos_prefix=NF12&language=fr&limit=1")
+        assert [file["name"] for file in resp.json()] == ["NF12001.pdf"]
+        resp = client.get(
+            f"/files?numdos_prefix=NF12&cursor={resp.headers['X-Next-Cursor']}"
+        )
+        assert [file["name"] for file in resp.json()] == ["NF12002.xml"]
+        resp = client.get("/standards?numdos_prefix=NF13")
+        assert [standard["numdos"] for standard in resp.json()] == ["NF13001"]
+
+    def test_api_conditional_get(
+        self, mocker: MockerFixture, client: TestClient
+    ) -> None:
+        mock: MagicMock = mocker.patch(
+            "standards.db.MyDb.get_standards", return_value=[]
+        )
+        etag: str = client.get("/standards").headers["ETag"]
+        resp: Response = client.get("/standards", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["ETag"] == etag
+        assert resp.content == b""
+        mock.assert_called_once_with(numdos_prefix=None)
+
+        resp = client.get("/standards?limit=1", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+
+        resp = client.get("/standards?limit=1", headers={"If-None-Match": "*"})
+        assert resp.status_code == 304
+        assert resp.headers["ETag"] == client.get("/standards?limit=1").headers["ETag"]
+        resp = client.get("/standards", headers={"If-None-Match": '"other", *'})
+        assert resp.status_code == 304
+        mock.assert_called_once_with(numdos_prefix=None)
+
+    def test_api_conditional_get_changed(self, app: MyApp, client: TestClient) -> None:
+        etag: str = client.get("/file?numdos=AB1&numdosvl=AB1").headers["ETag"]
+        resp: Response = client.get(
+            "/file?numdos=AB1&numdosvl=AB1", headers={"If-None-Match": f"W/{etag}"}
+        )
+        assert resp.status_code == 304
+
+        async def add_standard() -> None:
+            async with app.db.session() as session:
+                session.add(Standard(numdos="AB1"))
+                await session.commit()
+
+        asyncio.run(add_standard())
+        resp = client.get(
+            "/file?numdos=AB1&numdosvl=AB1", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+
+    def test_api_serialization(self, app: MyApp, client: TestClient) -> None:
+        async def add_standard() -> None:
+            async with app.db.session() as session:
+                session.add(
+                    Standard(
+                        numdos="AB1",
+                        files=[
+                            File(
+                                id=1,
+                                name="file.pdf",
+                                numdosvl="AE1",
+                                format=FileFormat.PDF,
+                                language=FileLanguage.EN,
+                            )
+                        ],
+                    )
+                )
+                await session.commit()
+
+        asyncio.run(add_standard())
+        file: dict = {
+            "id": 1,
+            "name": "file.pdf",
+            "numdos": "AB1",
+            "numdosvl": "AE1",
+            "format": "pdf",
+            "language": "en",
+        }
+        resp: Response = client.get("/standard/AB1")
+        assert resp.headers["content-type"] == "application/json"
+        assert "ETag" in resp.headers
+        assert resp.json() == {"numdos": "AB1", "files": [file]}
+        assert client.get("/standards").json() == [{"numdos": "AB1", "files": [file]}]
+        resp = client.get("/files?limit=1")
+        assert resp.json() == [{**file, "standard": {"numdos": "AB1"}}]
+        assert "ETag" in resp.headers
+        assert client.get("/file?numdos=AB1&numdosvl=AE1").json() == resp.json()[0]
+        assert client.get("/file?numdos=AB1&numdosvl=AB1").json() == {}
+
+    def test_api_pool(self, client: TestClient) -> None:
+        resp: Response = client.get("/pool")
+        assert resp.status_code == 200
+        assert resp.json() == {}
+
+    def test_api_cache(self, app: MyApp, client: TestClient) -> None:
+        assert client.get("/cache").json() == {}
+        app.db.cache = LRUCache(maxsize=10)
+        assert client.get("/cache").json()["maxsize"] == 10
+
+    def test_api_request_session(self, app: MyApp, client: TestClient) -> None:
+        resp: Response = client.get("/standards")
+        assert resp.status_code == 200
+        assert app.db._current_session.get() is None
+
+    def test_api_standards_page(
+        self, mocker: MockerFixture, client: TestClient
+    ) -> None:
+        page: Page[Standard] = Page(items=[Standard(numdos="A")], next_cursor="next")
+        mock: MagicMock = mocker.patch(
+            "standards.db.MyDb.get_standards_page", return_value=page
+        )
+        resp: Response = client.get("/standards?limit=1&cursor=abc")
+        mock.assert_called_once_with(numdos_prefix=None, limit=1, cursor="abc")
+        assert resp.headers["X-Next-Cursor"] == "next"
+        assert resp.json() == [{**page.items[0]}]
+
+    def test_api_files_page(self, mocker: MockerFixture, client: TestClient) -> None:
+        mock: MagicMock = mocker.patch(
+            "standards.db.MyDb.get_files_page", return_value=Page(items=[])
+        )
+        resp: Response = client.get("/files?limit=5")
+        mock.assert_called_once_with(
+            formats=None, languages=None, numdos_prefix=None, limit=5, cursor=None
+        )
+        assert "X-Next-Cursor" not in resp.headers
+        assert resp.json() == []
+
+    def test_api_page_invalid(self, client: TestClient) -> None:
+        assert client.get("/files?cursor=invalid").status_code == 400
+        # Cursors decoding to null, a list and a dict
+        for cursor in ("bnVsbA==", "WzFd", "eyJpZCI6IDF9"):
+            assert client.get(f"/files?cursor={cursor}").status_code == 400
+            assert client.get(f"/standards?cursor={cursor}").status_code == 400
+        assert client.get("/standards?limit=0").status_code == 422
+
+    def test_api_standards_ndjson(
+        self, mocker: MockerFixture, client: TestClient
+    ) -> None:
+        async def stream_standards(yield_per: int):
+            yield Standard(numdos="AB1", files=[])
+            yield Standard(numdos="AB2", files=[])
+
+        mock: MagicMock = mocker.patch(
+            "standards.db.MyDb.stream_standards", side_effect=stream_standards
+        )
+        resp: Response = client.get("/standards.ndjson?batch_size=10")
+        mock.assert_called_once_with(yield_per=10)
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line) for line in resp.text.splitlines()] == [
+            {"numdos": "AB1", "files": []},
+            {"numdos": "AB2", "files": []},
+        ]
+
+    def test_api_files_ndjson(self, mocker: MockerFixture, client: TestClient) -> None:
+        async def stream_files(yield_per: int):
+            yield File(
+                id=1,
+                name="file.pdf",
+                numdos="AB1",
+                numdosvl="AB1",
+                format=FileFormat.PDF,
+                language=FileLanguage.FR,
+            )
+
+        mocker.patch("standards.db.MyDb.stream_files", side_effect=stream_files)
+        resp: Response = client.get("/files.ndjson")
+        assert [json.loads(line) for line in resp.text.splitlines()] == [
+            {
+                "id": 1,
+                "name": "file.pdf",
+                "numdos": "AB1",
+                "numdosvl": "AB1",
+                "format": "pdf",
+                "language": "fr",
+                "standard": {"numdos": "AB1"},
+            }
+        ]
+
+    def test_api_standards_batch(
+        self, mocker: MockerFixture, client: TestClient
+    ) -> None:
+        values: list[Standard | None] = [Standard(numdos="AB1"), None]
+        mock: MagicMock = mocker.patch(
+            "standards.db.MyDb.get_standards_by_numdos", return_value=values
+        )
+        resp: Response = client.post("/standards/batch", json=["AB1", "AB2"])
+        mock.assert_called_once_with(["AB1", "AB2"])
+        assert resp.json() == [{**values[0]}, None]
+
+    def test_api_files_batch(self, mocker: MockerFixture, client: TestClient) -> None:
+        mock: MagicMock = mocker.patch(
+            "standards.db.MyDb.get_files_by_keys", return_value=[None]
+        )
+        resp: Response = client.post(
+            "/files/batch", json=[{"numdos": "AB1", "numdosvl": "AE1"}]
+        )
+        mock.assert_called_once_with([("AB1", "AE1")])
+        assert resp.json() == [None]
+
+    def test_api_search(self, mocker: MockerFixture, client: TestClient) -> None:
+        mock: MagicMock = mocker.patch(
+            "standards.db.MyDb.search", return_value=Page(items=[], next_cursor="n")
+        )
+        resp: Response = client.get(
+            "/search?q=NF12*&format=pdf&format=xml&language=fr&limit=5"
+        )
+        mock.assert_called_once_with(
+            "NF12*",
+            formats=[FileFormat.PDF, FileFormat.XML],
+            languages=[FileLanguage.FR],
+            limit=5,
+            cursor=None,
+        )
+        assert resp.headers["X-Next-Cursor"] == "n"
+        assert resp.json() == []
+
+    def test_api_search_files(self, app: MyApp, client: TestClient) -> None:
+        async def populate() -> None:
+            async with app.db.session() as session:
+                session.add(Standard(numdos="NF12001"))
+                session.add(
+                    File(
+                        name="rapport annuel.pdf",
+                        numdos="NF12001",
+                        numdosvl="NV12001",
+                        format=FileFormat.PDF,
+                        language=FileLanguage.FR,
+                    )
+                )
+                await session.commit()
+
+        asyncio.run(populate())
+        resp: Response = client.get("/search?q=nf12*")
+        assert [file["name"] for file in resp.json()] == ["rapport annuel.pdf"]
+        assert client.get("/search?q=rapport&language=en").json() == []
+        assert client.get("/search?q=*").status_code == 400
+        assert client.get("/search?q=rapport&format=doc").status_code == 422
+
+    def test_api_stats(self, app: MyApp, client: TestClient) -> None:
+        async def populate() -> None:
+            async with app.db.session() as session:
+                session.add(
+                    File(
+                        name="NF12001.pdf",
+                        numdos="NF12001",
+                        numdosvl="NF12001",
+                        standard=Standard(numdos="NF12001"),
+                        format=FileFormat.PDF,
+                        language=FileLanguage.FR,
+                    )
+                )
+                await session.commit()
+
+        assert client.get("/stats").json()["files"] == 0
+        asyncio.run(populate())
+        resp: Response = client.get("/stats")
+        assert resp.json() == {
+            "files": 1,
+            "formats": {"xml": 0, "xmlrl": 0, "pdf": 1, "pdfrl": 0},
+            "languages": {"fr": 1, "en": 0},
+            "prefixes": {"NF": 1},
+        }
+        etag: str = resp.headers["ETag"]
+        assert client.get("/stats", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_api_batch_invalid(self, client: TestClient) -> None:
+        assert client.post("/files/batch", json=["AB1"]).status_code == 422
+        assert client.post("/standards/batch", json=["AB1"] * 1001).status_code == 422
+
+    def test_api_metrics(self, app: MyApp, client: TestClient) -> None:
+        client.get("/standard/AB1")
+        client.get("/hello/me")
+        client.post(
+            "/graphql", json={"query": '{ standard(numdos: "AB1") { numdos } }'}
+        )
+        resp: Response = client.get("/metrics")
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert app.metrics.requests.count(("GET", "/standard/{numdos}", "200")) == 1
+        assert app.metrics.requests.count(("GET", "/hello/{name}", "200")) == 1
+        assert app.metrics.requests.count(("POST", "/graphql", "200")) == 1
+        assert app.metrics.resolvers.count(("standard",)) == 1
+        assert app.metrics.statements.count(("SELECT", "standards")) >= 1
+        assert (
+            'http_request_duration_seconds_count{method="GET",'
+            'route="/standard/{numdos}",status="200"} 1'
+        ) in resp.text
+        assert "http_requests_in_flight 1" in resp.text
+
+    def test_api_graphql_persisted_query(self, client: TestClient) -> None:
+        query: str = '{ standard(numdos: "AB1") { numdos } }'
+        persisted: dict = {
+            "version": 1,
+            "sha256Hash": hashlib.sha256(query.encode()).hexdigest(),
+        }
+        extensions: dict = {"persistedQuery": persisted}
+        resp: Response = client.post("/graphql", json={"extensions": extensions})
+        assert resp.status_code == 200
+        assert resp.json()["errors"][0]["extensions"] == {
+            "code": "PERSISTED_QUERY_NOT_FOUND"
+        }
+        resp = client.post("/graphql", json={"query": query, "extensions": extensions})
+        assert resp.json()["data"] == {"standard": None}
+        resp = client.post("/graphql", json={"extensions": extensions})
+        assert resp.json()["data"] == {"standard": None}
+        resp = client.get("/graphql", params={"extensions": json.dumps(extensions)})
+        assert resp.json()["data"] == {"standard": None}
+        persisted["sha256Hash"] = "0" * 64
+        resp = client.post("/graphql", json={"query": query, "extensions": extensions})
+        assert resp.status_code == 400
+
+    def test_api_graphql_cost(self, client: TestClient) -> None:
+        query: str = '{ standard(numdos: "AB1") { numdos files { name } } }'
+        resp: Response = client.post("/graphql", json={"query": query})
+        assert resp.json()["extensions"]["cost"]["requestedQueryCost"] == 11
+        query = "{ standards { files { standard { files { name } } } } }"
+        resp = client.post("/graphql", json={"query": query})
+        assert resp.json()["data"] is None
+        assert resp.json()["errors"][0]["extensions"]["code"] == "QUERY_TOO_COMPLEX"
+
+    @pytest.mark.asyncio
+    async def test_api_query_accounting(self) -> None:
+        db: MyDb = await MyDb.start(
+            db_url="sqlite+aiosqlite://",
+            accounting=QueryAccounting(max_queries=4, max_repeats=2),
+        )
+        async with db.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        app: MyApp = await MyApp.start(fastapi=FastAPI(), db=db, schema=get_schema())
+
+        @app.api.get("/n_plus_one")
+        async def n_plus_one() -> None:
+            for numdos in ("AB1", "AB2", "AB3"):
+                await db.get_standard(numdos)
+
+        client: TestClient = TestClient(app.api)
+        resp: Response = client.get("/standard/AB1")
+        assert resp.headers["X-DB-Queries"] == "2"
+        assert float(resp.headers["X-DB-Time"]) > 0
+        assert "X-DB-Warnings" not in resp.headers
+        assert client.get("/hello/me").headers["X-DB-Queries"] == "0"
+
+        resp = client.get("/n_plus_one")
+        assert resp.headers["X-DB-Queries"] == "3"
+        assert resp.headers["X-DB-Warnings"].startswith(
+            "3 times the same query: SELECT standards.numdos"
+        )
+        await db.close()
+
+    @pytest.mark.asyncio
+    async def test_api_graphql_concurrent_root_fields(self, make_db, make_file) -> None:
+        db: MyDb = await make_db(
+            [
+                Standard(numdos="AB1"),
+                Standard(numdos="AB2"),
+                make_file("AB1", FileFormat.PDF, FileLanguage.FR),
+                make_file("AB2", FileFormat.XML, FileLanguage.EN),
+            ]
+        )
+        app: MyApp = await MyApp.start(fastapi=FastAPI(), db=db, schema=get_schema())
+        query: str = (
+            '{ a: standard(numdos: "AB1") { numdos files { name } }'
+            ' b: standard(numdos: "AB2") { numdos files { name } } }'
+        )
+        resp: Response = TestClient(app.api).post("/graphql", json={"query": query})
+        assert "errors" not in resp.json()
+        assert resp.json()["data"] == {
+            "a": {"numdos": "AB1", "files": [{"name": "AB1.pdf"}]},
+            "b": {"numdos": "AB2", "files": [{"name": "AB2.xml"}]},
+        }
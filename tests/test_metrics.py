@@ -0,0 +1,75 @@
+import gc
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from standards.metrics import Histogram, Metrics, _statement_labels
+
+
+def test_histogram() -> None:
+    histogram: Histogram = Histogram(
+        name="latency",
+        documentation="Latency.",
+        label_names=("route",),
+        buckets=(0.1, 1),
+    )
+    histogram.observe(("/a",), 0.05)
+    histogram.observe(("/a",), 0.5)
+    histogram.observe(("/a",), 5)
+    histogram.observe(('/"b"',), 0.1)
+    assert histogram.count(("/a",)) == 3
+    assert histogram.count(("/c",)) == 0
+    assert list(histogram.render()) == [
+        "# HELP latency Latency.",
+        "# TYPE latency histogram",
+        'latency_bucket{route="/a",le="0.1"} 1',
+        'latency_bucket{route="/a",le="1"} 2',
+        'latency_bucket{route="/a",le="+Inf"} 3',
+        'latency_sum{route="/a"} 5.550000',
+        'latency_count{route="/a"} 3',
+        'latency_bucket{route="/\\"b\\"",le="0.1"} 1',
+        'latency_bucket{route="/\\"b\\"",le="1"} 1',
+        'latency_bucket{route="/\\"b\\"",le="+Inf"} 1',
+        'latency_sum{route="/\\"b\\""} 0.100000',
+        'latency_count{route="/\\"b\\""} 1',
+    ]
+
+
+def test_statement_labels() -> None:
+    assert _statement_labels(
+        "SELECT standards.numdos \nFROM standards \nWHERE standards.numdos = ?"
+    ) == ("SELECT", "standards")
+    assert _statement_labels('INSERT INTO "files" (name) VALUES (?)') == (
+        "INSERT",
+        "files",
+    )
+    assert _statement_labels("UPDATE table_versions SET version=?") == (
+        "UPDATE",
+        "table_versions",
+    )
+    assert _statement_labels("SELECT count(*) FROM (SELECT 1)") == (
+        "SELECT",
+        "(subquery)",
+    )
+    assert _statement_labels("PRAGMA table_info(files)") == ("PRAGMA", "")
+
+
+def test_metrics_render_gauges() -> None:
+    text: str = Metrics().render({"db_pool_size": 5})
+    assert "# TYPE http_requests_in_flight gauge\nhttp_requests_in_flight 0\n" in text
+    assert text.endswith("# TYPE db_pool_size gauge\ndb_pool_size 5\n")
+
+
+@pytest.mark.asyncio
+async def test_metrics_failed_statement() -> None:
+    metrics: Metrics = Metrics()
+    engine: AsyncEngine = create_async_engine("sqlite+aiosqlite://")
+    metrics.instrument_engine(engine)
+    async with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            await conn.execute(text("SELECT * FROM missing"))
+        await conn.execute(text("SELECT 1"))
+    await engine.dispose()
+    gc.collect()
+    assert not metrics._started
+    assert metrics.statements.count(("SELECT", "")) == 1